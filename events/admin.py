@@ -1,13 +1,82 @@
 from django.contrib import admin
+from django.contrib.admin.views.main import ChangeList
 from django.urls import reverse
 from django.utils.html import format_html
 
 from .models import RSVP, Event
+from .paginators import KeysetPaginator
+from .secret_utils import secrets_for
+
+CURSOR_VAR = "cursor"
+
+
+class KeysetChangeList(ChangeList):
+    """A change list that pages with a KeysetPaginator, only loads the columns
+    it displays, and derives the secrets for a page all at once."""
+
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        if self.model_admin.list_only:
+            queryset = queryset.only(*self.model_admin.list_only)
+        return queryset
+
+    def get_results(self, request):
+        super().get_results(request)
+        self.result_list = list(self.result_list)
+        self.secrets = secrets_for(obj.id for obj in self.result_list)
+        # The columns only get to see the row, so hand each one its secret
+        # for edit_link.
+        for obj in self.result_list:
+            obj.list_secret = self.secrets[obj.id]
+
+    def _cursor_url(self, cursor):
+        return cursor and self.get_query_string({CURSOR_VAR: cursor})
+
+    def next_page_url(self):
+        page = self.paginator.current_page
+        return page and self._cursor_url(page.next_cursor)
+
+    def previous_page_url(self):
+        page = self.paginator.current_page
+        return page and self._cursor_url(page.previous_cursor)
+
+
+class KeysetPaginationAdmin(admin.ModelAdmin):
+    """Admin for big tables ordered by created_at. See KeysetPaginator."""
+
+    paginator = KeysetPaginator
+    show_full_result_count = False
+    # The keyset only works with the default ordering, so don't allow sorting
+    # by the other columns.
+    sortable_by: list = []
+    list_only: list = []
+    """The fields to load for the change list."""
+
+    def get_changelist(self, request, **kwargs):
+        return KeysetChangeList
+
+    def get_paginator(self, request, queryset, per_page, orphans=0, allow_empty_first_page=True):
+        return self.paginator(
+            queryset,
+            per_page,
+            cursor=getattr(request, "keyset_cursor", None),
+            orphans=orphans,
+            allow_empty_first_page=allow_empty_first_page,
+        )
+
+    def changelist_view(self, request, extra_context=None):
+        # The change list treats query params it doesn't know about as filters,
+        # so take the cursor out before it sees it.
+        if CURSOR_VAR in request.GET:
+            request.GET = request.GET.copy()
+            request.keyset_cursor = request.GET.pop(CURSOR_VAR)[-1]
+        return super().changelist_view(request, extra_context)
 
 
 @admin.register(Event)
-class EventAdmin(admin.ModelAdmin):
+class EventAdmin(KeysetPaginationAdmin):
     list_display = ["title", "details_link", "edit_link"]
+    list_only = ["id", "title", "created_at"]
     ordering = ["-created_at"]
 
     class Meta:
@@ -21,13 +90,17 @@ class EventAdmin(admin.ModelAdmin):
 
     def edit_link(self, event):
         """Link to the event detail page."""
-        url = reverse("events:update", kwargs={"pk": event.id}) + "?" + "secret=" + event.secret()
+        url = (
+            reverse("events:update", kwargs={"pk": event.id}) + "?" + "secret=" + event.list_secret
+        )
         return format_html('<a href="{}">Edit</a>', url)
 
 
 @admin.register(RSVP)
-class RSVPAdmin(admin.ModelAdmin):
+class RSVPAdmin(KeysetPaginationAdmin):
     list_display = ["name", "event_link", "edit_link"]
+    list_select_related = ["event"]
+    list_only = ["id", "name", "created_at", "event__id", "event__title"]
     ordering = ["-created_at"]
 
     class Meta:
@@ -36,15 +109,15 @@ class RSVPAdmin(admin.ModelAdmin):
 
     def event_link(self, rsvp):
         """Link to the event detail page."""
-        url = reverse("events:detail", kwargs={"pk": rsvp.event.id})
+        url = reverse("events:detail", kwargs={"pk": rsvp.event_id})
         return format_html('<a href="{}">{}</a>', url, rsvp.event.title)
 
     def edit_link(self, rsvp):
         """Link to the rsvp detail page."""
         url = (
-            reverse("events:rsvp_update", kwargs={"event_id": rsvp.event.id, "pk": rsvp.id})
+            reverse("events:rsvp_update", kwargs={"event_id": rsvp.event_id, "pk": rsvp.id})
             + "?"
             + "secret="
-            + rsvp.secret()
+            + rsvp.list_secret
         )
         return format_html('<a href="{}">Edit</a>', url)
@@ -0,0 +1,150 @@
+"""Serializing events for the read-only JSON API.
+
+Events are read with `.values()` and turned straight into plain dicts, without
+building model instances. The links are stored on each event when it's saved,
+so they're read from their columns like everything else, and only the columns
+a request actually needs are loaded.
+"""
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set
+from uuid import UUID
+
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from .converters import ShortUUID
+from .models import RSVP, Event
+
+MAX_BATCH_SIZE = 100
+"""The most events that can be fetched at once."""
+
+MAX_RSVP_NAMES = 100
+"""The most names listed under "rsvps" for each event. Everyone else is on the
+event's paginated RSVP list, /<id>/rsvps/, and still counted in "rsvp_count"."""
+
+COLUMN_FIELDS = [
+    "title",
+    "tagline",
+    "description",
+    "description_html",
+    "start_time",
+    "end_time",
+    "location",
+    "has_confetti",
+    "confetti_emojis",
+    "confetti_amount",
+    "created_at",
+    "updated_at",
+]
+
+LINK_FIELDS = {
+    "add_to_gcal_link": "gcal_link",
+    "google_maps_url": "google_maps_link",
+    "apple_maps_url": "apple_maps_link",
+}
+"""The links, named after the Event methods that build them, and the columns
+they're stored in."""
+
+RSVP_FIELDS = ["rsvps", "rsvp_count"]
+
+FIELDS = ["id", *COLUMN_FIELDS, *LINK_FIELDS, *RSVP_FIELDS]
+"""Everything that can be asked for with ?fields=. The default is all of them."""
+
+
+def parse_fields(value: Optional[str]) -> List[str]:
+    """Parse a comma separated list of fields, raising a ValueError for any we
+    don't know about."""
+    if not value:
+        return list(FIELDS)
+    fields = [field.strip() for field in value.split(",") if field.strip()]
+    unknown = [field for field in fields if field not in FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    return fields
+
+
+def parse_ids(value: Optional[str]) -> List[UUID]:
+    """Parse a comma separated list of event ids in either the short or the
+    long form, raising a ValueError for anything that isn't one."""
+    converter = ShortUUID()
+    ids = [converter.to_python(id.strip()) for id in (value or "").split(",") if id.strip()]
+    if not ids:
+        raise ValueError("No ids given")
+    if len(ids) > MAX_BATCH_SIZE:
+        raise ValueError(f"At most {MAX_BATCH_SIZE} ids can be fetched at once")
+    return ids
+
+
+def serialize_events(event_ids: Sequence[UUID], fields: Sequence[str]) -> List[Dict[str, Any]]:
+    """Load the events with a single IN query and return them in the order
+    they were asked for, skipping any that don't exist."""
+    columns = {"id"}
+    for field in fields:
+        if field in LINK_FIELDS:
+            columns.add(LINK_FIELDS[field])
+        elif field in COLUMN_FIELDS:
+            columns.add(field)
+    rendered = columns.intersection(Event.RENDERED_FIELDS)
+    if rendered:
+        columns.add("rendered_hash")
+    annotations = {}
+    if "rsvp_count" in fields:
+        annotations["rsvp_count"] = rsvp_count()
+    events = Event.objects.filter(pk__in=event_ids).values(*columns, **annotations)
+    rows = {row["id"]: row for row in events}
+    if rendered:
+        render_stale(rows, rendered)
+
+    rsvps: Dict[UUID, List[str]] = {}
+    if "rsvps" in fields:
+        rsvps = rsvp_names(rows)
+    converter = ShortUUID()
+    serialized = []
+    for event_id in dict.fromkeys(event_ids):
+        row = rows.get(event_id)
+        if row is None:
+            continue
+        event: Dict[str, Any] = {}
+        for field in fields:
+            if field == "id":
+                event["id"] = converter.to_url(event_id)
+            elif field in LINK_FIELDS:
+                event[field] = row[LINK_FIELDS[field]]
+            elif field == "rsvps":
+                event["rsvps"] = rsvps.get(event_id, [])
+            else:
+                event[field] = row[field]
+        serialized.append(event)
+    return serialized
+
+
+def render_stale(rows: Dict[UUID, Dict[str, Any]], columns: Set[str]) -> None:
+    """Fill in the rendered columns for any events that were saved before they
+    existed, and haven't been backfilled by `manage.py render_events` yet."""
+    stale = [event_id for event_id, row in rows.items() if not row["rendered_hash"]]
+    if not stale:
+        return
+    for event in Event.objects.filter(pk__in=stale):
+        event.render()
+        for column in columns:
+            rows[event.id][column] = getattr(event, column)
+
+
+def rsvp_names(event_ids: Iterable[UUID]) -> Dict[UUID, List[str]]:
+    """Get the names of the first MAX_RSVP_NAMES people to RSVP to each event,
+    in the order they RSVP'd, with one query."""
+    names: Dict[UUID, List[str]] = defaultdict(list)
+    first = RSVP.objects.filter(event_id=OuterRef("event_id")).order_by("created_at", "id")
+    rsvps = RSVP.objects.filter(
+        event_id__in=list(event_ids), pk__in=Subquery(first.values("pk")[:MAX_RSVP_NAMES])
+    ).order_by("event", "created_at", "id")
+    for event_id, name in rsvps.values_list("event_id", "name"):
+        names[event_id].append(name)
+    return names
+
+
+def rsvp_count() -> Coalesce:
+    """Count an event's RSVPs as part of the query that loads it. The names are
+    capped at MAX_RSVP_NAMES, so they can't be counted instead."""
+    rsvps = RSVP.objects.filter(event_id=OuterRef("pk")).order_by().values("event_id")
+    return Coalesce(Subquery(rsvps.annotate(count=Count("id")).values("count")), 0)
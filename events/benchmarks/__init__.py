@@ -0,0 +1,18 @@
+"""Micro-benchmarks for the hot paths in this app. Run them with:
+
+    python manage.py benchmark <name>
+
+Each benchmark is a module in this package with a `run(stdout)` function.
+Ones that return their results can be saved with `--json` and compared
+against an earlier run with `--compare`, see results.py.
+"""
+BENCHMARKS = {
+    "concurrency": "events.benchmarks.concurrency",
+    "db_connections": "events.benchmarks.db_connections",
+    "lifecycle": "events.benchmarks.lifecycle",
+    "rsvp_burst": "events.benchmarks.rsvp_burst",
+    "secrets": "events.benchmarks.secrets",
+    "settings_import": "events.benchmarks.settings_import",
+    "sqlite_writes": "events.benchmarks.sqlite_writes",
+    "urls": "events.benchmarks.urls",
+}
@@ -0,0 +1,84 @@
+"""Compare requests per second and latency between the WSGI and ASGI entry
+points at 1, 50 and 500 concurrent clients.
+
+WSGI gets a thread per client, like a threaded server would. The ASGI handlers
+run every client as a task on one event loop: Django's stock handler, and the
+thread pool one from planner/asgi.py. Each client loads the home page, an
+event, and its RSVP form in turn.
+"""
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Tuple
+
+from django.core.handlers.asgi import ASGIHandler
+from django.core.wsgi import get_wsgi_application
+from django.urls import reverse
+
+from events.benchmarks.fixtures import make_event, test_database
+from events.benchmarks.servers import asgi_get, wsgi_get
+from events.benchmarks.timing import percentile
+from planner.handlers import ThreadPoolASGIHandler
+
+CLIENT_COUNTS = [1, 50, 500]
+REQUESTS_PER_CLIENT = 6
+RSVP_COUNT = 50
+
+Results = List[Tuple[int, float]]
+
+
+def run(stdout):
+    with test_database():
+        event = make_event(RSVP_COUNT)
+        paths = [
+            reverse("index"),
+            reverse("events:detail", kwargs={"pk": event.id}),
+            reverse("events:rsvp", kwargs={"event_id": event.id}),
+        ]
+        benchmarks = [
+            ("wsgi", run_wsgi),
+            ("asgi (stock)", lambda paths, clients: run_asgi(ASGIHandler(), paths, clients)),
+            ("asgi", lambda paths, clients: run_asgi(ThreadPoolASGIHandler(), paths, clients)),
+        ]
+        stdout.write(f"{'entry point':<14}{'clients':>8}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}")
+        for clients in CLIENT_COUNTS:
+            for name, bench in benchmarks:
+                elapsed, results = bench(paths, clients)
+                errors = sum(1 for status, _ in results if status != 200)
+                latencies = [latency * 1000 for _, latency in results]
+                stdout.write(
+                    f"{name:<14}{clients:>8}{len(results) / elapsed:>10.0f}"
+                    f"{percentile(latencies, 50):>10.1f}{percentile(latencies, 99):>10.1f}"
+                    + (f"  ({errors} errors)" if errors else "")
+                )
+
+
+def client_paths(paths: List[str], client: int) -> List[str]:
+    # Start each client at a different page so they don't all hit the same one at once.
+    return [paths[(client + i) % len(paths)] for i in range(REQUESTS_PER_CLIENT)]
+
+
+def run_wsgi(paths: List[str], clients: int) -> Tuple[float, Results]:
+    app = get_wsgi_application()
+    wsgi_get(app, paths[0])
+
+    def client(n: int) -> Results:
+        return [wsgi_get(app, path) for path in client_paths(paths, n)]
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as executor:
+        results = [result for results in executor.map(client, range(clients)) for result in results]
+    return time.perf_counter() - start, results
+
+
+def run_asgi(app: ASGIHandler, paths: List[str], clients: int) -> Tuple[float, Results]:
+    async def client(n: int) -> Results:
+        return [await asgi_get(app, path) for path in client_paths(paths, n)]
+
+    async def main() -> Tuple[float, Results]:
+        await asgi_get(app, paths[0])
+        start = time.perf_counter()
+        results = await asyncio.gather(*(client(n) for n in range(clients)))
+        return time.perf_counter() - start, [result for r in results for result in r]
+
+    return asyncio.run(main())
@@ -0,0 +1,97 @@
+"""Compare per-request latency with a new database connection for every
+request, persistent connections, and a shared connection pool.
+
+Needs PostgreSQL, since that's the backend that supports pooling. It uses
+BENCHMARK_DATABASE_URL if it's set, e.g.
+
+    BENCHMARK_DATABASE_URL=postgres://localhost/smolparty python manage.py benchmark db_connections
+
+and the default database otherwise. Each request only runs `SELECT 1`, so no
+tables are needed.
+"""
+import os
+import threading
+import time
+from typing import Any, Dict, List
+
+import environ
+from django.conf import settings
+from django.db.utils import ConnectionHandler
+
+from events.benchmarks.timing import percentile
+from planner.db.pooling import pool_metrics
+
+CLIENTS = 8
+REQUESTS_PER_CLIENT = 50
+
+MODES: Dict[str, Dict[str, Any]] = {
+    "new connection per request": {"CONN_MAX_AGE": 0},
+    "persistent, health checks": {"CONN_MAX_AGE": 600, "HEALTH_CHECKS": True},
+    "pool of 4, health checks": {
+        "CONN_MAX_AGE": 0,
+        "HEALTH_CHECKS": True,
+        "POOL": {"SIZE": 4, "MAX_OVERFLOW": 0, "TIMEOUT": 10},
+    },
+}
+
+
+def database_settings() -> Dict[str, Any]:
+    url = os.environ.get("BENCHMARK_DATABASE_URL")
+    database = environ.Env.db_url_config(url) if url else dict(settings.DATABASES["default"])
+    if database["ENGINE"] in ("django.db.backends.postgresql", "planner.db.postgresql"):
+        database["ENGINE"] = "planner.db.postgresql"
+        return database
+    return {}
+
+
+def request(connections: ConnectionHandler, alias: str) -> None:
+    """Use the database the way a request would."""
+    connection = connections[alias]
+    # What the request_started and request_finished signals do.
+    connection.close_if_unusable_or_obsolete()
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1")
+    connection.close_if_unusable_or_obsolete()
+
+
+def run_mode(connections: ConnectionHandler, alias: str) -> List[float]:
+    """Make requests from CLIENTS threads at once and return how long each took."""
+    timings: List[float] = []
+
+    def client():
+        for _ in range(REQUESTS_PER_CLIENT):
+            start = time.perf_counter()
+            request(connections, alias)
+            timings.append(time.perf_counter() - start)
+        connections[alias].close()
+
+    threads = [threading.Thread(target=client) for _ in range(CLIENTS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return timings
+
+
+def run(stdout):
+    database = database_settings()
+    if not database:
+        stdout.write("Skipped: set BENCHMARK_DATABASE_URL to a PostgreSQL database.")
+        return
+
+    # A separate alias per mode, since pools are shared by alias.
+    aliases = {name: f"benchmark_{i}" for i, name in enumerate(MODES)}
+    databases = {aliases[name]: {**database, **options} for name, options in MODES.items()}
+    connections = ConnectionHandler({"default": database, **databases})
+    stdout.write(f"{CLIENTS} clients making {REQUESTS_PER_CLIENT} requests each:")
+    for name, alias in aliases.items():
+        timings = [seconds * 1000 for seconds in run_mode(connections, alias)]
+        stdout.write(
+            f"{name:<28} p50 {percentile(timings, 50):>7.2f} ms"
+            f"  p95 {percentile(timings, 95):>7.2f} ms"
+            f"  p99 {percentile(timings, 99):>7.2f} ms"
+        )
+        metrics = pool_metrics().get(alias)
+        if metrics:
+            stdout.write(f"{'':<28} pool: {metrics}")
+            connections[alias].pool.close_idle()
@@ -0,0 +1,49 @@
+"""Helpers for setting up data to benchmark against."""
+import os
+import tempfile
+from contextlib import contextmanager
+from typing import Iterator
+
+from django.db import connection
+from django.utils import timezone
+
+from events.models import RSVP, Event
+
+
+@contextmanager
+def test_database(on_disk: bool = False) -> Iterator[None]:
+    """Run the block against a freshly migrated throwaway database, the same
+    way the test runner would.
+
+    SQLite test databases live in memory, where concurrent writers fail with
+    "database table is locked" instead of waiting their turn. Pass `on_disk`
+    for benchmarks that write from several threads at once.
+    """
+    test_settings = connection.settings_dict["TEST"]
+    old_test_name = test_settings.get("NAME")
+    if on_disk and connection.vendor == "sqlite":
+        fd, test_settings["NAME"] = tempfile.mkstemp(suffix=".sqlite3")
+        os.close(fd)
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        test_settings["NAME"] = old_test_name
+
+
+def make_event(rsvp_count: int = 0, **kwargs) -> Event:
+    """Create an event with `rsvp_count` RSVPs."""
+    now = timezone.now()
+    fields = {
+        "title": "Benchmark Party",
+        "tagline": "A party for measuring things",
+        "description": "",
+        "start_time": now,
+        "end_time": now,
+        "location": "Somewhere",
+        **kwargs,
+    }
+    event = Event.objects.create(**fields)
+    RSVP.objects.bulk_create([RSVP(event=event, name=f"Guest {i}") for i in range(rsvp_count)])
+    return event
@@ -0,0 +1,225 @@
+"""Time the whole life of an event over HTTP: creating one, viewing it, and
+adding, changing and cancelling an RSVP. Every step runs through the WSGI
+handler and the ASGI one from planner/asgi.py, against events with 0, 10,
+1,000 and 10,000 RSVPs.
+
+Requests are made one at a time, so the latencies are for a request with
+nothing else going on. For each step and event size it also counts the
+queries one request makes and the most memory it allocates at once.
+
+Save the results with `--json` and check a later run against them with
+`--compare`, e.g.
+
+    python manage.py benchmark lifecycle --json baseline.json
+    python manage.py benchmark lifecycle --compare baseline.json
+"""
+import asyncio
+import time
+import tracemalloc
+import uuid
+from dataclasses import dataclass
+from importlib import import_module
+from typing import Any, Callable, Dict, List, Tuple
+
+from django.conf import settings
+from django.core.wsgi import get_wsgi_application
+from django.db import connection
+from django.http import HttpRequest
+from django.middleware.csrf import get_token
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from events import ownership
+from events.benchmarks.fixtures import make_event, test_database
+from events.benchmarks.servers import asgi_request, build_environ, wsgi_request
+from events.benchmarks.timing import percentile
+from events.models import RSVP, Event
+from planner.handlers import ThreadPoolASGIHandler
+
+RSVP_COUNTS = [0, 10, 1000, 10000]
+REQUESTS = 100
+"""Requests per step, event size and handler."""
+WARMUP = 5
+"""Requests made before timing starts, to fill caches and open connections."""
+NAME = "Benchmark guest"
+"""The name of every RSVP the steps add, so they can be cleared away after each one."""
+TITLE = "Benchmark lifecycle party"
+
+Environ = Dict[str, Any]
+Results = List[Tuple[int, float]]
+
+
+@dataclass
+class Step:
+    name: str
+    status: int
+    """The status code of a successful request."""
+    requests: Callable[[Event, int], List[Environ]]
+    """Build the given number of requests against an event, and set up anything they need."""
+
+
+def post_headers(**cookies: str) -> Dict[str, str]:
+    """Headers for a form POST that gets past the CSRF check."""
+    token = get_token(HttpRequest())
+    cookies = {settings.CSRF_COOKIE_NAME: token, **cookies}
+    return {
+        "HTTP_COOKIE": "; ".join(f"{name}={value}" for name, value in cookies.items()),
+        settings.CSRF_HEADER_NAME: token,
+    }
+
+
+def add_rsvps(event: Event, count: int) -> List[RSVP]:
+    return RSVP.objects.bulk_create([RSVP(event=event, name=NAME) for _ in range(count)])
+
+
+def rsvp_url(name: str, rsvp: RSVP) -> str:
+    url = reverse(name, kwargs={"event_id": rsvp.event_id, "pk": rsvp.id})
+    return f"{url}?secret={rsvp.secret()}"
+
+
+def create_requests(event: Event, count: int) -> List[Environ]:
+    start = event.start_time.strftime("%Y-%m-%dT%H:%M")
+    data = {
+        "title": TITLE,
+        "tagline": event.tagline,
+        "description": "",
+        "start_time": start,
+        "end_time": start,
+        "location": event.location,
+        "confetti_emojis": "🎉",
+        "confetti_amount": 100,
+    }
+    path = reverse("events:create")
+    return [build_environ("POST", path, data, headers=post_headers()) for _ in range(count)]
+
+
+def detail_requests(event: Event, count: int) -> List[Environ]:
+    path = reverse("events:detail", kwargs={"pk": event.id})
+    return [build_environ("GET", path) for _ in range(count)]
+
+
+def guest_detail_requests(event: Event, count: int) -> List[Environ]:
+    """The page as seen by someone who has RSVP'd, which is never cached."""
+    (rsvp,) = add_rsvps(event, 1)
+    session = import_module(settings.SESSION_ENGINE).SessionStore()
+    ownership.add_rsvp(session, event.id, rsvp.id, rsvp.secret())
+    session.save()
+    cookie = f"{settings.SESSION_COOKIE_NAME}={session.session_key}"
+    path = reverse("events:detail", kwargs={"pk": event.id})
+    return [build_environ("GET", path, headers={"HTTP_COOKIE": cookie}) for _ in range(count)]
+
+
+def rsvp_requests(event: Event, count: int) -> List[Environ]:
+    path = reverse("events:rsvp", kwargs={"event_id": event.id})
+    return [
+        build_environ(
+            "POST", path, {"name": NAME, "idempotency_key": uuid.uuid4()}, headers=post_headers()
+        )
+        for _ in range(count)
+    ]
+
+
+def rsvp_update_requests(event: Event, count: int) -> List[Environ]:
+    return [
+        build_environ(
+            "POST", rsvp_url("events:rsvp_update", rsvp), {"name": NAME}, headers=post_headers()
+        )
+        for rsvp in add_rsvps(event, count)
+    ]
+
+
+def rsvp_delete_requests(event: Event, count: int) -> List[Environ]:
+    return [
+        build_environ("POST", rsvp_url("events:rsvp_delete", rsvp), headers=post_headers())
+        for rsvp in add_rsvps(event, count)
+    ]
+
+
+STEPS = [
+    Step("create", 302, create_requests),
+    Step("detail", 200, detail_requests),
+    Step("detail (guest)", 200, guest_detail_requests),
+    Step("rsvp", 302, rsvp_requests),
+    Step("rsvp_update", 302, rsvp_update_requests),
+    Step("rsvp_delete", 302, rsvp_delete_requests),
+]
+
+
+def run(stdout):
+    wsgi = get_wsgi_application()
+    asgi = ThreadPoolASGIHandler()
+    results: Dict[str, Any] = {}
+    stdout.write(f"{REQUESTS} requests per step, one at a time:")
+    stdout.write(
+        f"{'step':<16}{'RSVPs':>7}{'handler':>9}{'req/s':>8}{'p50 ms':>8}{'p95 ms':>8}"
+        f"{'p99 ms':>8}{'queries':>9}{'peak KB':>9}"
+    )
+    with test_database(on_disk=True):
+        for rsvp_count in RSVP_COUNTS:
+            event = make_event(rsvp_count)
+            for step in STEPS:
+                result: Dict[str, Any] = {}
+                for handler, bench in [("wsgi", run_wsgi), ("asgi", run_asgi)]:
+                    app = wsgi if handler == "wsgi" else asgi
+                    bench(app, step.requests(event, WARMUP))
+                    elapsed, timings = bench(app, step.requests(event, REQUESTS))
+                    result[handler] = summarize(step, elapsed, timings)
+                    clean_up(event)
+                result.update(profile(wsgi, step.requests(event, 1)[0]))
+                clean_up(event)
+                results[f"{step.name} @ {rsvp_count}"] = result
+                for handler in ["wsgi", "asgi"]:
+                    stats = result[handler]
+                    stdout.write(
+                        f"{step.name:<16}{rsvp_count:>7}{handler:>9}{stats['req_per_s']:>8.0f}"
+                        f"{stats['p50_ms']:>8.1f}{stats['p95_ms']:>8.1f}{stats['p99_ms']:>8.1f}"
+                        f"{result['queries']:>9}{result['peak_kb']:>9.0f}"
+                        + (f"  ({stats['errors']} errors)" if stats["errors"] else "")
+                    )
+    return results
+
+
+def run_wsgi(app, environs: List[Environ]) -> Tuple[float, Results]:
+    start = time.perf_counter()
+    results = [wsgi_request(app, environ) for environ in environs]
+    return time.perf_counter() - start, results
+
+
+def run_asgi(app, environs: List[Environ]) -> Tuple[float, Results]:
+    async def requests():
+        start = time.perf_counter()
+        results = [await asgi_request(app, environ) for environ in environs]
+        return time.perf_counter() - start, results
+
+    return asyncio.run(requests())
+
+
+def summarize(step: Step, elapsed: float, results: Results) -> Dict[str, Any]:
+    latencies = [seconds * 1000 for _, seconds in results]
+    return {
+        "requests": len(results),
+        "errors": sum(1 for status, _ in results if status != step.status),
+        "req_per_s": round(len(results) / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p95_ms": round(percentile(latencies, 95), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+    }
+
+
+def profile(app, environ: Environ) -> Dict[str, Any]:
+    """Count the queries one request through WSGI makes, and the most memory
+    it has allocated at any one time."""
+    with CaptureQueriesContext(connection) as queries:
+        tracemalloc.start()
+        try:
+            wsgi_request(app, environ)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    return {"queries": len(queries), "peak_kb": round(peak / 1024, 1)}
+
+
+def clean_up(event: Event) -> None:
+    """Remove what the last step added, so every run starts from the same data."""
+    RSVP.objects.filter(event=event, name=NAME).delete()
+    Event.objects.filter(title=TITLE).delete()
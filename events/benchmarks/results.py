@@ -0,0 +1,47 @@
+"""Saving benchmark results and comparing them against a baseline.
+
+Benchmarks that return results from `run` give a nested dict of numbers, e.g.
+{"detail @ 1000": {"wsgi": {"p50_ms": 2.1}, "queries": 4}}. Each number is
+compared by the last key in its path.
+"""
+from typing import Any, Dict, List
+
+HIGHER_IS_BETTER = {"req_per_s"}
+EXACT = {"queries", "errors"}
+"""Metrics that don't vary between runs, so any increase is a regression."""
+IGNORED = {"requests"}
+
+
+def flatten(results: Dict[str, Any], prefix: str = "") -> Dict[str, float]:
+    """Flatten nested results into {"detail @ 1000 / wsgi / p50_ms": 2.1}."""
+    flat = {}
+    for key, value in results.items():
+        path = f"{prefix} / {key}" if prefix else key
+        if isinstance(value, dict):
+            flat.update(flatten(value, path))
+        else:
+            flat[path] = value
+    return flat
+
+
+def compare(baseline: Dict[str, Any], results: Dict[str, Any], tolerance: float) -> List[str]:
+    """Describe every metric in `results` that's worse than in `baseline` by
+    more than `tolerance`, as a fraction of the baseline. Metrics that are
+    missing from either are skipped."""
+    old_values = flatten(baseline)
+    regressions = []
+    for path, new in flatten(results).items():
+        metric = path.rsplit(" / ", 1)[-1]
+        old = old_values.get(path)
+        if old is None or metric in IGNORED:
+            continue
+        if metric in EXACT:
+            worse = new > old
+        elif metric in HIGHER_IS_BETTER:
+            worse = new < old * (1 - tolerance)
+        else:
+            worse = new > old * (1 + tolerance)
+        if worse:
+            change = f" ({(new - old) / old:+.0%})" if old else ""
+            regressions.append(f"{path}: {old:g} -> {new:g}{change}")
+    return regressions
@@ -0,0 +1,72 @@
+"""Simulate a burst of 1,000 guests RSVPing to one event at once, with and
+without RSVP_WRITE_COALESCING.
+
+Every tenth guest double taps, submitting the same form twice, so the
+idempotency keys should keep the number of RSVPs at exactly 1,000.
+"""
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Tuple
+
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from events.benchmarks.fixtures import make_event, test_database
+from events.benchmarks.timing import percentile
+from events.models import RSVP
+
+GUEST_COUNT = 1000
+CLIENT_COUNT = 50
+DOUBLE_TAP_EVERY = 10
+
+
+def run(stdout):
+    # Failed requests are counted below. Logging each one would bury the results.
+    logging.disable(logging.ERROR)
+    try:
+        compare(stdout)
+    finally:
+        logging.disable(logging.NOTSET)
+
+
+def compare(stdout):
+    stdout.write(f"{'mode':<14}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'rsvps':>8}{'errors':>8}")
+    for name, coalescing in [("one by one", False), ("coalesced", True)]:
+        with test_database(on_disk=True), override_settings(RSVP_WRITE_COALESCING=coalescing):
+            event = make_event()
+            elapsed, results = burst(reverse("events:rsvp", kwargs={"event_id": event.id}))
+            errors = sum(1 for status, _ in results if status != 302)
+            latencies = [latency * 1000 for _, latency in results]
+            stdout.write(
+                f"{name:<14}{len(results) / elapsed:>10.0f}{percentile(latencies, 50):>10.1f}"
+                f"{percentile(latencies, 99):>10.1f}"
+                f"{RSVP.objects.filter(event=event).count():>8}{errors:>8}"
+            )
+
+
+def burst(url: str) -> Tuple[float, List[Tuple[int, float]]]:
+    """POST an RSVP for every guest from a pool of clients. Returns how long it
+    took and the status code and latency of every request."""
+    local = threading.local()
+
+    def rsvp(guest: int) -> List[Tuple[int, float]]:
+        if not hasattr(local, "client"):
+            local.client = Client(raise_request_exception=False)
+        data = {"name": f"Guest {guest}", "idempotency_key": uuid.uuid4()}
+        submissions = 2 if guest % DOUBLE_TAP_EVERY == 0 else 1
+        results = []
+        for _ in range(submissions):
+            start = time.perf_counter()
+            status = local.client.post(url, data).status_code
+            results.append((status, time.perf_counter() - start))
+        return results
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=CLIENT_COUNT) as executor:
+        results = [
+            result for results in executor.map(rsvp, range(GUEST_COUNT)) for result in results
+        ]
+    return time.perf_counter() - start, results
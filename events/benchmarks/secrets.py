@@ -0,0 +1,39 @@
+"""Compare the per-call cost of the old SHA-256 secrets with the HMAC ones.
+
+The HMAC ones are only faster when they come out of the cache. Deriving one
+from scratch costs more than the old hash, so the cold numbers are the ones to
+compare like for like, and the warm ones show what a cache hit saves.
+"""
+import uuid
+
+from django.conf import settings
+
+from events import secret_utils
+from events.benchmarks.timing import per_call_ns
+
+
+def run(stdout):
+    ids = [uuid.uuid4() for _ in range(100)]
+    one_id = ids[0]
+    secret = secret_utils.uuid_to_secret(one_id)
+    derive = secret_utils._derive_secret.__wrapped__
+
+    def secrets_for_cold():
+        secret_utils._derive_secret.cache_clear()
+        secret_utils.secrets_for(ids)
+
+    results = [
+        ("legacy sha256 uuid_to_secret", lambda: secret_utils.legacy_uuid_to_secret(one_id)),
+        ("hmac derivation (cold)", lambda: derive(one_id, settings.SECRET_KEY)),
+        ("hmac uuid_to_secret (warm)", lambda: secret_utils.uuid_to_secret(one_id)),
+        ("secret_is_correct (warm)", lambda: secret_utils.secret_is_correct(one_id, secret)),
+    ]
+    for name, func in results:
+        stdout.write(f"{name:<40} {per_call_ns(func):>10.0f} ns/call")
+
+    legacy = per_call_ns(lambda: [secret_utils.legacy_uuid_to_secret(i) for i in ids], 100)
+    cold = per_call_ns(secrets_for_cold, 100)
+    warm = per_call_ns(lambda: secret_utils.secrets_for(ids), 100)
+    stdout.write(f"{'legacy sha256 x100':<40} {legacy:>10.0f} ns/call")
+    stdout.write(f"{'secrets_for x100 (cold)':<40} {cold:>10.0f} ns/call")
+    stdout.write(f"{'secrets_for x100 (warm)':<40} {warm:>10.0f} ns/call")
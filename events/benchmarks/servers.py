@@ -0,0 +1,91 @@
+"""Driving the app through its real WSGI and ASGI entry points in-process,
+without a server or the test client in the way."""
+import time
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+from django.core.handlers.asgi import ASGIHandler
+from django.core.handlers.wsgi import WSGIHandler
+from django.test import RequestFactory
+
+
+def build_environ(
+    method: str,
+    path: str,
+    data: Optional[Mapping[str, Any]] = None,
+    headers: Optional[Mapping[str, str]] = None,
+) -> Dict[str, Any]:
+    """Build the WSGI environ for a GET or a form POST. `headers` are given the
+    way they appear in the environ, e.g. HTTP_COOKIE."""
+    factory = RequestFactory(**(headers or {}))
+    if method == "POST":
+        return factory.post(path, data or {}).environ
+    return factory.generic(method, path).environ
+
+
+def wsgi_request(app: WSGIHandler, environ: Dict[str, Any]) -> Tuple[int, float]:
+    """Make a request through the WSGI app. Returns the status code and how
+    long it took, in seconds, including reading the whole body."""
+    status = []
+    start = time.perf_counter()
+    body = app(environ, lambda code, headers, *args: status.append(code))
+    for _ in body:
+        pass
+    if hasattr(body, "close"):
+        body.close()
+    return int(status[0].split()[0]), time.perf_counter() - start
+
+
+def wsgi_get(app: WSGIHandler, path: str) -> Tuple[int, float]:
+    """Make a GET request through the WSGI app."""
+    return wsgi_request(app, build_environ("GET", path))
+
+
+def asgi_scope(environ: Dict[str, Any]) -> Tuple[Dict[str, Any], bytes]:
+    """Turn a WSGI environ into the equivalent ASGI scope and request body."""
+    headers: List[Tuple[bytes, bytes]] = [(b"host", b"testserver")]
+    for key, value in environ.items():
+        if key.startswith("HTTP_"):
+            name = key[5:]
+        elif key in ("CONTENT_TYPE", "CONTENT_LENGTH"):
+            name = key
+        else:
+            continue
+        if value:
+            headers.append((name.replace("_", "-").lower().encode(), str(value).encode("latin1")))
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": environ["REQUEST_METHOD"],
+        "scheme": "http",
+        "path": environ["PATH_INFO"],
+        "query_string": environ["QUERY_STRING"].encode(),
+        "headers": headers,
+        "server": ("testserver", 80),
+        "client": ("127.0.0.1", 12345),
+    }
+    return scope, environ["wsgi.input"].read()
+
+
+async def asgi_request(app: ASGIHandler, environ: Dict[str, Any]) -> Tuple[int, float]:
+    """Make the request described by a WSGI environ through the ASGI app.
+    Returns the status code and how long it took, in seconds, including
+    reading the whole body."""
+    scope, body = asgi_scope(environ)
+    status = []
+
+    async def receive():
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            status.append(message["status"])
+
+    start = time.perf_counter()
+    await app(scope, receive, send)
+    return status[0], time.perf_counter() - start
+
+
+async def asgi_get(app: ASGIHandler, path: str) -> Tuple[int, float]:
+    """Make a GET request through the ASGI app."""
+    return await asgi_request(app, build_environ("GET", path))
@@ -0,0 +1,72 @@
+"""Measure how long `import planner.settings` takes in production mode with
+and without the settings cache from planner/bootstrap.py.
+
+Each import runs in a fresh interpreter, the way a new instance would start.
+Secret Manager is replaced with `stub_provider`, which imports the real client
+and then waits out a typical round trip, so no credentials are needed.
+"""
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from django.conf import settings
+
+RUNS = 5
+
+ROUND_TRIP = 0.1
+"""How long, in seconds, `stub_provider` pretends to wait on Secret Manager."""
+
+PAYLOAD = "SECRET_KEY=benchmark\nDATABASE_URL=sqlite:////tmp/benchmark.sqlite3\n"
+
+IMPORT_SETTINGS = (
+    "import time; start = time.perf_counter(); import planner.settings; "
+    "print(time.perf_counter() - start)"
+)
+
+
+def stub_provider(name: str) -> str:
+    from google.cloud import secretmanager  # noqa: F401
+
+    time.sleep(ROUND_TRIP)
+    return PAYLOAD
+
+
+def import_time(cache_path: str, ttl: int) -> float:
+    """Import the settings in a new interpreter and return how long it took, in seconds."""
+    env = dict(
+        os.environ,
+        GOOGLE_CLOUD_PROJECT="benchmark",
+        SETTINGS_PROVIDER=f"{__name__}.stub_provider",
+        SETTINGS_CACHE_PATH=cache_path,
+        SETTINGS_CACHE_TTL=str(ttl),
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", IMPORT_SETTINGS],
+        cwd=settings.BASE_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    return float(output.strip().splitlines()[-1])
+
+
+def run(stdout):
+    with tempfile.TemporaryDirectory() as directory:
+        cache_path = os.path.join(directory, "settings.json")
+
+        uncached = [import_time(cache_path, ttl=0) for _ in range(RUNS)]
+        misses = []
+        hits = []
+        for _ in range(RUNS):
+            if os.path.exists(cache_path):
+                os.remove(cache_path)
+            misses.append(import_time(cache_path, ttl=300))
+            hits.append(import_time(cache_path, ttl=300))
+
+    stdout.write(f"Median of {RUNS} imports, with a {ROUND_TRIP * 1000:.0f} ms round trip:")
+    for name, times in [("no cache", uncached), ("cache miss", misses), ("cache hit", hits)]:
+        stdout.write(f"{name:<12} {statistics.median(times) * 1000:>8.1f} ms")
@@ -0,0 +1,113 @@
+"""Load test SQLite with writers and readers hitting one event at once, with
+plain SQLite settings and with the tuned ones from planner/db/sqlite3/base.py.
+
+Each write is a transaction that reads the event and then adds an RSVP, the
+pattern that deadlocks when two transactions both try to upgrade their read
+lock. Writers are paced to add up to TARGET_WRITES_PER_SECOND between them.
+"""
+import logging
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, List
+
+from django.db import DatabaseError, connection, transaction
+
+from events.benchmarks.fixtures import make_event, test_database
+from events.benchmarks.timing import percentile
+from events.models import RSVP, Event
+
+TARGET_WRITES_PER_SECOND = 200
+WRITERS = 16
+READERS = 8
+DURATION = 5
+
+PLAIN: Dict[str, Any] = {"PRAGMAS": {"journal_mode": "DELETE"}, "TRANSACTION_MODE": None}
+
+
+def run(stdout):
+    if connection.settings_dict["ENGINE"] != "planner.db.sqlite3":
+        stdout.write("Skipped: needs the tuned SQLite backend, planner.db.sqlite3.")
+        return
+    tuned = {key: connection.settings_dict.get(key) for key in PLAIN}
+
+    stdout.write(
+        f"{WRITERS} writers aiming for {TARGET_WRITES_PER_SECOND} writes/s "
+        f"and {READERS} readers, for {DURATION}s:"
+    )
+    stdout.write(
+        f"{'mode':<8}{'writes/s':>10}{'reads/s':>10}{'write p50':>11}"
+        f"{'write p99':>11}{'read p99':>10}{'errors':>8}"
+    )
+    logging.disable(logging.WARNING)
+    try:
+        for name, options in [("plain", PLAIN), ("tuned", tuned)]:
+            connection.settings_dict.update(options)
+            try:
+                results = load_test()
+            finally:
+                connection.settings_dict.update(tuned)
+            write_ms = [seconds * 1000 for seconds in results["writes"]]
+            read_ms = [seconds * 1000 for seconds in results["reads"]]
+            errors: Counter = results["errors"]
+            stdout.write(
+                f"{name:<8}{len(write_ms) / DURATION:>10.0f}{len(read_ms) / DURATION:>10.0f}"
+                f"{percentile(write_ms or [0], 50):>9.1f}ms{percentile(write_ms or [0], 99):>9.1f}ms"
+                f"{percentile(read_ms or [0], 99):>8.1f}ms{sum(errors.values()):>8}"
+            )
+            for message, count in errors.most_common():
+                stdout.write(f"    {count} x {message}")
+    finally:
+        logging.disable(logging.NOTSET)
+
+
+def load_test() -> Dict[str, Any]:
+    """Run the writers and readers against a fresh on-disk database. Returns
+    the latency of every successful write and read, and a count of errors."""
+    writes: List[float] = []
+    reads: List[float] = []
+    errors: Counter = Counter()
+
+    with test_database(on_disk=True):
+        event_id = make_event().id
+        connection.close()
+        deadline = time.monotonic() + DURATION
+        interval = WRITERS / TARGET_WRITES_PER_SECOND
+
+        def timed(func, timings):
+            start = time.perf_counter()
+            try:
+                func()
+            except DatabaseError as e:
+                errors[str(e)] += 1
+            else:
+                timings.append(time.perf_counter() - start)
+
+        def write():
+            with transaction.atomic():
+                Event.objects.only("id").get(pk=event_id)
+                RSVP.objects.create(event_id=event_id, name="Guest")
+
+        def read():
+            list(RSVP.objects.filter(event_id=event_id).order_by("created_at", "id")[:50])
+
+        def writer():
+            next_write = time.monotonic()
+            while next_write < deadline:
+                time.sleep(max(next_write - time.monotonic(), 0))
+                timed(write, writes)
+                next_write += interval
+            connection.close()
+
+        def reader():
+            while time.monotonic() < deadline:
+                timed(read, reads)
+            connection.close()
+
+        threads = [threading.Thread(target=writer) for _ in range(WRITERS)]
+        threads += [threading.Thread(target=reader) for _ in range(READERS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    return {"writes": writes, "reads": reads, "errors": errors}
@@ -0,0 +1,16 @@
+"""Shared helpers for timing things in the benchmarks."""
+import math
+import timeit
+from typing import Callable, Sequence
+
+
+def per_call_ns(func: Callable[[], object], number: int = 10000, repeat: int = 5) -> float:
+    """Return the best-of-`repeat` time for a single call of `func`, in nanoseconds."""
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number * 1e9
+
+
+def percentile(values: Sequence[float], pct: float) -> float:
+    """Return the `pct` percentile of `values` by the nearest-rank method."""
+    ordered = sorted(values)
+    rank = max(math.ceil(pct / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
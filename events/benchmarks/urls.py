@@ -0,0 +1,75 @@
+"""Compare the base58 ShortUUID converter against the old base58-library one,
+both per call and while rendering a list of 1,000 RSVPs that all need edit
+links. The detail page only shows the first page of RSVPs now, so the list
+template is rendered on its own."""
+import time
+import uuid
+from unittest import mock
+
+from base58 import b58encode
+from django.template.loader import render_to_string
+from django.urls import reverse
+
+from events import converters
+from events.benchmarks.fixtures import make_event, test_database
+from events.benchmarks.timing import per_call_ns
+
+RSVP_COUNT = 1000
+
+
+def legacy_to_url(value: uuid.UUID) -> str:
+    return b58encode(value.bytes).decode("utf-8").zfill(22)
+
+
+def uncached_to_url(value: uuid.UUID) -> str:
+    return converters.b58encode_uuid(value).zfill(22)
+
+
+def run(stdout):
+    one_id = uuid.uuid4()
+    short = legacy_to_url(one_id)
+    results = [
+        ("legacy to_url", lambda: legacy_to_url(one_id)),
+        ("to_url (uncached)", lambda: uncached_to_url(one_id)),
+        ("to_url (cached)", lambda: converters._to_url(one_id)),
+        ("to_python (uncached)", lambda: converters.b58decode_uuid(short)),
+        ("to_python (cached)", lambda: converters._to_python(short)),
+    ]
+    for name, func in results:
+        stdout.write(f"{name:<40} {per_call_ns(func):>10.0f} ns/call")
+
+    with test_database():
+        event = make_event(RSVP_COUNT)
+        rsvps = list(event.rsvp_set.all())
+
+        def reverse_all():
+            for rsvp in rsvps:
+                reverse("events:rsvp_update", kwargs={"event_id": event.id, "pk": rsvp.id})
+
+        # Own every RSVP so that each row gets an edit link.
+        context = {"rsvps": rsvps, "owned_rsvp_ids": [str(rsvp.id) for rsvp in rsvps]}
+
+        def render():
+            render_to_string("events/rsvp/list.html", context)
+
+        edit_links = render_to_string("events/rsvp/list.html", context).count(">edit</a>")
+        assert edit_links == RSVP_COUNT, f"Only {edit_links} RSVPs have edit links"
+
+        for name, to_url in [("legacy", legacy_to_url), ("uncached", uncached_to_url)]:
+            with mock.patch.object(converters, "_to_url", to_url):
+                stdout.write(f"{f'reverse x{RSVP_COUNT} ({name})':<40} {timed(reverse_all)}")
+                stdout.write(f"{f'rsvp list ({name})':<40} {timed(render)}")
+        converters._to_url.cache_clear()
+        reverse_all()
+        stdout.write(f"{f'reverse x{RSVP_COUNT} (cached)':<40} {timed(reverse_all)}")
+        stdout.write(f"{'rsvp list (cached)':<40} {timed(render)}")
+
+
+def timed(func, repeat: int = 5) -> str:
+    """Best-of-`repeat` wall time for one call, formatted in milliseconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return f"{best * 1000:>10.1f} ms"
@@ -0,0 +1,41 @@
+import uuid
+
+from django import forms
+
+from . import rsvp_io
+from .models import RSVP
+
+
+class RSVPForm(forms.ModelForm):
+    class Meta:
+        model = RSVP
+        fields = ["name", "idempotency_key"]
+        widgets = {"idempotency_key": forms.HiddenInput}
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Every new RSVP form gets its own key, which comes back with the
+        # submission. Existing RSVPs keep whatever they were created with.
+        if self.instance._state.adding:
+            self.initial.setdefault("idempotency_key", uuid.uuid4())
+        else:
+            del self.fields["idempotency_key"]
+
+
+class RSVPImportForm(forms.Form):
+    file = forms.FileField(help_text="A CSV file with a name column, or a JSON lines file.")
+
+    def clean_file(self):
+        file = self.cleaned_data["file"]
+        self.cleaned_data["format"] = "jsonl" if file.name.endswith((".jsonl", ".json")) else "csv"
+        return file
+
+    def import_into(self, event) -> int:
+        """Import the uploaded RSVPs into the event, adding any problems with
+        the file to the form's errors."""
+        names = rsvp_io.read_names(self.cleaned_data["file"], self.cleaned_data["format"])
+        try:
+            return rsvp_io.import_rsvps(event, names)
+        except forms.ValidationError as e:
+            self.add_error("file", e)
+            return 0
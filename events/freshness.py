@@ -0,0 +1,68 @@
+"""Cheap validators for conditional GETs on event data.
+
+A single aggregate query over the events and their RSVPs is enough to tell
+whether anything a client has already seen has changed, so most polls can be
+answered with a 304 before loading or rendering anything.
+
+There's deliberately no Last-Modified. The newest updated_at doesn't change
+when an RSVP is deleted, so it would answer a 304 for a page that's missing
+the deletion. The ETag covers the counts as well, so it does change.
+"""
+import hashlib
+from typing import Iterable, NamedTuple, Optional, Union
+from uuid import UUID
+
+from django.db.models import Count, Max
+from django.http import HttpRequest
+from django.http.response import HttpResponseBase
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
+
+from .models import Event
+
+
+class Freshness(NamedTuple):
+    etag: str
+    event_count: int
+    rsvp_count: int = 0
+    """How many RSVPs the events have between them."""
+
+
+def event_freshness(
+    event_ids: Iterable[Union[str, UUID]], variant: str = "", allow_empty: bool = False
+) -> Optional[Freshness]:
+    """Work out the validators for a set of events and all of their RSVPs.
+
+    `variant` goes into the ETag so that different renderings of the same data
+    (say, the page an owner sees versus the one a guest sees) never share one.
+    Returns None if there aren't any matching events, unless `allow_empty`.
+    """
+    ids = sorted(str(event_id) for event_id in event_ids)
+    state = Event.objects.filter(pk__in=ids).aggregate(
+        event_count=Count("id", distinct=True),
+        event_updated=Max("updated_at"),
+        rsvp_count=Count("rsvp"),
+        rsvp_updated=Max("rsvp__updated_at"),
+    )
+    if not state["event_count"] and not allow_empty:
+        return None
+
+    state_keys = ["event_count", "event_updated", "rsvp_count", "rsvp_updated"]
+    fingerprint = "|".join([variant, *ids, *(str(state[key]) for key in state_keys)])
+    return Freshness(
+        etag=quote_etag(hashlib.md5(fingerprint.encode("utf-8")).hexdigest()),
+        event_count=state["event_count"],
+        rsvp_count=state["rsvp_count"],
+    )
+
+
+def not_modified(request: HttpRequest, freshness: Freshness) -> Optional[HttpResponseBase]:
+    """Return a 304 response if the client already has the current version."""
+    return get_conditional_response(request, etag=freshness.etag)
+
+
+def set_validators(response: HttpResponseBase, freshness: Freshness) -> HttpResponseBase:
+    """Add the ETag header, and ask clients to revalidate."""
+    response["ETag"] = freshness.etag
+    response["Cache-Control"] = "private, no-cache"
+    return response
@@ -0,0 +1,93 @@
+"""Rendering events as iCalendar (RFC 5545).
+
+Everything here yields lines one at a time so a feed with hundreds of events
+can be streamed without building one big string.
+"""
+from html import unescape
+from typing import Callable, Iterable, Iterator
+
+from django.utils.html import strip_tags
+
+from .models import Event
+
+PRODID = "-//Smol Party//smol.party//EN"
+LINE_LIMIT = 75
+"""The most octets allowed on a line before it has to be folded."""
+
+
+def escape_text(value: str) -> str:
+    """Escape a value for use in a TEXT property."""
+    return (
+        value.replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\r\n", "\\n")
+        .replace("\n", "\\n")
+    )
+
+
+def fold(line: str) -> str:
+    """Fold a content line so no line is longer than 75 octets, without
+    splitting a multi-byte character."""
+    if len(line.encode("utf-8")) <= LINE_LIMIT:
+        return line + "\r\n"
+    parts = []
+    current = ""
+    current_size = 0
+    limit = LINE_LIMIT
+    for char in line:
+        size = len(char.encode("utf-8"))
+        if current_size + size > limit:
+            parts.append(current)
+            current, current_size = "", 0
+            # Continuation lines start with a space, which counts against them.
+            limit = LINE_LIMIT - 1
+        current += char
+        current_size += size
+    parts.append(current)
+    return "\r\n ".join(parts) + "\r\n"
+
+
+def format_floating(value) -> str:
+    # Same hack as Event.add_to_gcal_link: the times are stored as UTC but
+    # meant in the creator's timezone, so treat them as floating local times.
+    return value.strftime("%Y%m%dT%H%M%S")
+
+
+def format_utc(value) -> str:
+    return value.strftime("%Y%m%dT%H%M%SZ")
+
+
+def vevent(event: Event, url: str) -> Iterator[str]:
+    """Yield the lines for a single event."""
+    yield "BEGIN:VEVENT"
+    yield f"UID:{event.id}@smol.party"
+    yield f"DTSTAMP:{format_utc(event.updated_at)}"
+    yield f"LAST-MODIFIED:{format_utc(event.updated_at)}"
+    yield f"DTSTART:{format_floating(event.start_time)}"
+    yield f"DTEND:{format_floating(event.end_time)}"
+    yield f"SUMMARY:{escape_text(event.title)}"
+    yield f"LOCATION:{escape_text(event.location)}"
+    description = unescape(strip_tags(event.description)).strip()
+    yield f"DESCRIPTION:{escape_text(description)}"
+    yield f"URL:{url}"
+    yield "END:VEVENT"
+
+
+def calendar(
+    events: Iterable[Event], event_url: Callable[[Event], str], name: str = "Smol Party"
+) -> Iterator[str]:
+    """Yield a whole calendar, folded and ready to be written out."""
+    header = [
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        f"PRODID:{PRODID}",
+        "CALSCALE:GREGORIAN",
+        f"X-WR-CALNAME:{escape_text(name)}",
+    ]
+    for line in header:
+        yield fold(line)
+    for event in events:
+        for line in vevent(event, event_url(event)):
+            yield fold(line)
+    yield fold("END:VCALENDAR")
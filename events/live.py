@@ -0,0 +1,151 @@
+"""Pushing RSVP changes to open event pages as they happen.
+
+`hub` is an in-process publish/subscribe hub. signals.py publishes to it when
+an RSVP is created, updated or deleted, and every open event page subscribes
+through the Server-Sent Events stream in views.py. The hub lives in one process,
+so a page only hears about changes made through the same process.
+
+Each subscriber gets a bounded queue. A client that can't keep up and lets its
+queue fill is dropped instead of buffering without limit. Its stream ends, and
+the browser reconnects and reloads the list once it's caught up.
+"""
+import asyncio
+import json
+import threading
+from collections import defaultdict
+from typing import Any, AsyncIterator, Dict, Optional, Set
+from uuid import UUID
+
+from django.conf import settings
+from django.http.response import HttpResponseBase
+
+Message = Dict[str, Any]
+
+DROPPED = {"type": "dropped"}
+"""Put in place of everything queued when a subscriber falls too far behind."""
+
+
+class Subscriber:
+    """One open stream's view of an event's messages. Messages can be
+    published from any thread but are only read on the subscriber's loop."""
+
+    def __init__(self, event_id: str, maxsize: int):
+        self.event_id = event_id
+        self.loop = asyncio.get_running_loop()
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self.dropped = False
+
+    def offer(self, message: Message) -> None:
+        self.loop.call_soon_threadsafe(self._offer, message)
+
+    def _offer(self, message: Message) -> None:
+        if self.dropped:
+            return
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            self.dropped = True
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(DROPPED)
+
+    async def get(self, timeout: float) -> Optional[Message]:
+        """Wait for the next message, or return None after `timeout` seconds."""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class Hub:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers: Dict[str, Set[Subscriber]] = defaultdict(set)
+
+    def subscribe(self, event_id) -> Subscriber:
+        """Start listening to an event. Has to be called on the event loop
+        that will read the messages."""
+        subscriber = Subscriber(str(event_id), settings.LIVE_UPDATES_QUEUE_SIZE)
+        with self._lock:
+            self._subscribers[subscriber.event_id].add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        with self._lock:
+            subscribers = self._subscribers[subscriber.event_id]
+            subscribers.discard(subscriber)
+            if not subscribers:
+                del self._subscribers[subscriber.event_id]
+
+    def publish(self, event_id, message: Message) -> None:
+        """Send a message to everybody listening to the event. Never blocks."""
+        with self._lock:
+            subscribers = list(self._subscribers.get(str(event_id), ()))
+        for subscriber in subscribers:
+            subscriber.offer(message)
+
+    def subscriber_count(self, event_id=None) -> int:
+        with self._lock:
+            if event_id is not None:
+                return len(self._subscribers.get(str(event_id), ()))
+            return sum(len(subscribers) for subscribers in self._subscribers.values())
+
+
+hub = Hub()
+
+
+def rsvp_message(type: str, rsvp) -> Message:
+    return {"type": type, "id": str(rsvp.id), "name": rsvp.name}
+
+
+def reset_message() -> Message:
+    """Tells pages to reload the whole list, for when too much has changed to
+    send one message per RSVP."""
+    return {"type": "reset"}
+
+
+class EventStreamResponse(HttpResponseBase):
+    """A response streamed from an async iterator, which Django 3.2's
+    StreamingHttpResponse can't do. Only planner.handlers.ThreadPoolASGIHandler
+    knows how to send one."""
+
+    streaming = True
+
+    def __init__(self, content: AsyncIterator[bytes], *args, **kwargs):
+        kwargs.setdefault("content_type", "text/event-stream")
+        super().__init__(*args, **kwargs)
+        self.async_content = content
+        self["Cache-Control"] = "no-cache"
+        # Stop proxies from holding events back to send them in bigger chunks.
+        self["X-Accel-Buffering"] = "no"
+
+
+def format_event(message: Message) -> bytes:
+    """Format a message as a Server-Sent Event."""
+    data = {key: value for key, value in message.items() if key != "type"}
+    return f"event: {message['type']}\ndata: {json.dumps(data)}\n\n".encode("utf-8")
+
+
+async def stream(event_id: UUID) -> AsyncIterator[bytes]:
+    """Yield Server-Sent Events for the event's RSVP changes until the
+    subscriber is dropped or the stream has been open for
+    LIVE_UPDATES_MAX_AGE seconds, sending a comment now and then to keep the
+    connection open."""
+    subscriber = hub.subscribe(event_id)
+    try:
+        # Tell the browser how long to wait before reconnecting.
+        yield f"retry: {settings.LIVE_UPDATES_RETRY_MS}\n\n".encode("utf-8")
+        deadline = subscriber.loop.time() + settings.LIVE_UPDATES_MAX_AGE
+        while subscriber.loop.time() < deadline:
+            message = await subscriber.get(settings.LIVE_UPDATES_HEARTBEAT)
+            if message is None:
+                yield b": ping\n\n"
+                continue
+            if message is DROPPED:
+                # The page missed something, so it'll have to reload the list
+                # when it reconnects.
+                yield format_event(reset_message())
+                return
+            yield format_event(message)
+    finally:
+        hub.unsubscribe(subscriber)
@@ -0,0 +1,62 @@
+import json
+from importlib import import_module
+
+from django.core.management.base import BaseCommand, CommandError
+
+from events.benchmarks import BENCHMARKS
+from events.benchmarks.results import compare
+
+
+class Command(BaseCommand):
+    help = "Run one or more of the micro-benchmarks in events/benchmarks."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "names",
+            nargs="*",
+            help=f"Which benchmarks to run ({', '.join(sorted(BENCHMARKS))}). Defaults to all.",
+        )
+        parser.add_argument(
+            "--json",
+            metavar="FILE",
+            help="Write the results of the benchmarks that have them here.",
+        )
+        parser.add_argument(
+            "--compare",
+            metavar="FILE",
+            help="Fail if any result is worse than in this file, written by an earlier --json.",
+        )
+        parser.add_argument(
+            "--tolerance",
+            type=float,
+            default=0.3,
+            help="How much worse a timing can be before it counts, as a fraction (default 0.3).",
+        )
+
+    def handle(self, *args, **options):
+        names = options["names"] or sorted(BENCHMARKS)
+        unknown = set(names) - set(BENCHMARKS)
+        if unknown:
+            raise CommandError(f"Unknown benchmarks: {', '.join(sorted(unknown))}")
+        baseline = {}
+        if options["compare"]:
+            with open(options["compare"]) as f:
+                baseline = json.load(f)
+
+        results = {}
+        for name in names:
+            self.stdout.write(self.style.MIGRATE_HEADING(f"Running {name}"))
+            result = import_module(BENCHMARKS[name]).run(self.stdout)
+            if result is not None:
+                results[name] = result
+
+        if options["json"]:
+            with open(options["json"], "w") as f:
+                json.dump(results, f, indent=2, sort_keys=True)
+        if options["compare"]:
+            regressions = compare(baseline, results, options["tolerance"])
+            for regression in regressions:
+                self.stderr.write(regression)
+            if regressions:
+                raise CommandError(f"{len(regressions)} results are worse than the baseline.")
+            self.stdout.write(self.style.SUCCESS("No regressions against the baseline."))
@@ -0,0 +1,126 @@
+import os
+from html.parser import HTMLParser
+from typing import Dict, List, Optional
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from django.urls import reverse
+
+from events.benchmarks.fixtures import make_event, test_database
+
+BUDGETS = {
+    "events:detail": {"requests": 5, "blocking_scripts": 0, "iframes": 0, "local_kb": 40},
+    "events:detail with confetti": {
+        "requests": 6,
+        "blocking_scripts": 0,
+        "iframes": 0,
+        "local_kb": 40,
+    },
+    "events:create": {"requests": 7, "blocking_scripts": 0, "iframes": 0, "local_kb": 40},
+}
+"""What each page is allowed to load before anyone interacts with it.
+
+`requests` counts the scripts, stylesheets, iframes and images in the HTML.
+`blocking_scripts` are scripts that aren't deferred or async, which hold up
+the page until they've downloaded and run. `local_kb` is the HTML plus the
+static files we serve ourselves. The size of third party files isn't known
+without fetching them, so they only count as requests."""
+
+
+class ResourceParser(HTMLParser):
+    """Collect the resources a browser would load while parsing a page."""
+
+    def __init__(self):
+        super().__init__()
+        self.resources: List[str] = []
+        self.blocking_scripts: List[str] = []
+        self.iframes: List[str] = []
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        url: Optional[str] = None
+        if tag in ("script", "img", "iframe"):
+            url = attrs.get("src")
+        elif tag == "link" and attrs.get("rel") == "stylesheet":
+            url = attrs.get("href")
+        if not url:
+            return
+        self.resources.append(url)
+        if tag == "script" and "defer" not in attrs and "async" not in attrs:
+            self.blocking_scripts.append(url)
+        if tag == "iframe":
+            self.iframes.append(url)
+
+
+def local_size(url: str) -> int:
+    """The size in bytes of one of our static files, or 0 for anything else."""
+    if not url.startswith(settings.STATIC_URL):
+        return 0
+    name = url.removeprefix(settings.STATIC_URL)
+    if staticfiles_storage.exists(name):
+        return staticfiles_storage.size(name)
+    path = finders.find(name)
+    return os.path.getsize(path) if path else 0
+
+
+class Command(BaseCommand):
+    help = (
+        "Render the event pages against a throwaway database and fail if any of "
+        "them load more, or more blocking, resources than their budget allows."
+    )
+
+    def handle(self, *args, **options):
+        with test_database():
+            failures = self.check_pages()
+
+        if failures:
+            raise CommandError("\n".join(failures))
+        self.stdout.write(self.style.SUCCESS("All pages are within their weight budgets."))
+
+    def check_pages(self) -> List[str]:
+        """Check every page against its budget and return a list of failure
+        messages."""
+        event = make_event(5)
+        confetti_event = make_event(5, has_confetti=True, confetti_emojis="🎉")
+        pages = {
+            "events:detail": reverse("events:detail", kwargs={"pk": event.id}),
+            "events:detail with confetti": reverse(
+                "events:detail", kwargs={"pk": confetti_event.id}
+            ),
+            "events:create": reverse("events:create"),
+        }
+        client = Client()
+        failures = []
+        for name, url in pages.items():
+            failures += self.check_page(name, client.get(url))
+        return failures
+
+    def check_page(self, name: str, response) -> List[str]:
+        if response.status_code != 200:
+            return [f"{name} returned {response.status_code}"]
+        parser = ResourceParser()
+        parser.feed(response.content.decode())
+        local_bytes = len(response.content) + sum(map(local_size, parser.resources))
+        weight: Dict[str, float] = {
+            "requests": len(parser.resources),
+            "blocking_scripts": len(parser.blocking_scripts),
+            "iframes": len(parser.iframes),
+            "local_kb": round(local_bytes / 1024, 1),
+        }
+        self.stdout.write(
+            f"{name}: "
+            + ", ".join(f"{key} {value:g}/{BUDGETS[name][key]}" for key, value in weight.items())
+        )
+
+        failures = []
+        offenders = {"blocking_scripts": parser.blocking_scripts, "iframes": parser.iframes}
+        for key, value in weight.items():
+            if value > BUDGETS[name][key]:
+                message = f"{name} is over its budget of {BUDGETS[name][key]} {key}: {value:g}"
+                if key in offenders:
+                    message += f" ({', '.join(offenders[key])})"
+                failures.append(message)
+        return failures
@@ -0,0 +1,100 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from django.urls import reverse
+
+from events.benchmarks.fixtures import make_event, test_database
+from events.models import RSVP
+from events.query_budget import QueryBudgetExceeded, query_budget
+
+BUDGETS = {
+    "events:detail": 4,
+    "events:detail 304": 1,
+    "events:rsvps": 1,
+    "events:api_event": 3,
+    "events:api_event 304": 1,
+    "events:api_events": 3,
+    "events:rsvp GET": 1,
+    "events:rsvp POST": 1,
+    "events:rsvp_update GET": 1,
+    "events:rsvp_update POST": 2,
+    "events:rsvp_delete GET": 1,
+    "events:rsvp_delete POST": 3,
+}
+"""The most queries each view is allowed to make, no matter how many RSVPs the
+event has. The guest's session fits in its cookie, so loading and saving it
+doesn't cost any queries (see planner/sessions.py)."""
+
+RSVP_COUNTS = [5, 500]
+
+
+class Command(BaseCommand):
+    help = (
+        "Drive the event and RSVP views against a throwaway database and fail "
+        "if any of them go over their query budget."
+    )
+
+    def handle(self, *args, **options):
+        failures = []
+        with test_database():
+            for rsvp_count in RSVP_COUNTS:
+                failures += self.check_budgets(rsvp_count)
+
+        if failures:
+            raise CommandError("\n\n".join(failures))
+        self.stdout.write(self.style.SUCCESS("All views are within their query budgets."))
+
+    def check_budgets(self, rsvp_count: int):
+        """Check every view against an event with `rsvp_count` RSVPs and return
+        a list of failure messages."""
+        event = make_event(rsvp_count)
+
+        # A guest that RSVPs, looks at the page, edits their RSVP and then deletes it.
+        client = Client()
+        rsvp_url = reverse("events:rsvp", kwargs={"event_id": event.id})
+        steps = [
+            ("events:rsvp GET", lambda: client.get(rsvp_url)),
+            ("events:rsvp POST", lambda: client.post(rsvp_url, {"name": "Guest"})),
+        ]
+        failures = self.run_steps(rsvp_count, steps)
+
+        rsvp = RSVP.objects.get(event=event, name="Guest")
+        kwargs = {"event_id": event.id, "pk": rsvp.id}
+        update_url = reverse("events:rsvp_update", kwargs=kwargs) + f"?secret={rsvp.secret()}"
+        delete_url = reverse("events:rsvp_delete", kwargs=kwargs) + f"?secret={rsvp.secret()}"
+        detail_url = reverse("events:detail", kwargs={"pk": event.id})
+        rsvps_url = reverse("events:rsvps", kwargs={"pk": event.id})
+        etag = client.get(detail_url)["ETag"]
+        api_url = reverse("events:api_event", kwargs={"pk": event.id})
+        api_etag = client.get(api_url)["ETag"]
+        other_event = make_event(rsvp_count)
+        api_batch_url = reverse("events:api_events") + f"?ids={event.id},{other_event.id}"
+        steps = [
+            ("events:detail", lambda: client.get(detail_url)),
+            ("events:detail 304", lambda: client.get(detail_url, HTTP_IF_NONE_MATCH=etag)),
+            ("events:rsvps", lambda: client.get(rsvps_url)),
+            ("events:api_event", lambda: client.get(api_url)),
+            ("events:api_event 304", lambda: client.get(api_url, HTTP_IF_NONE_MATCH=api_etag)),
+            ("events:api_events", lambda: client.get(api_batch_url)),
+            ("events:rsvp_update GET", lambda: client.get(update_url)),
+            ("events:rsvp_update POST", lambda: client.post(update_url, {"name": "Guest 2"})),
+            ("events:rsvp_delete GET", lambda: client.get(delete_url)),
+            ("events:rsvp_delete POST", lambda: client.post(delete_url)),
+        ]
+        failures += self.run_steps(rsvp_count, steps)
+        return failures
+
+    def run_steps(self, rsvp_count: int, steps):
+        failures = []
+        for name, step in steps:
+            label = f"{name} with {rsvp_count} RSVPs"
+            try:
+                with query_budget(BUDGETS[name], label) as captured:
+                    response = step()
+            except QueryBudgetExceeded as e:
+                failures.append(str(e))
+                continue
+            if response.status_code >= 400:
+                failures.append(f"{label} returned {response.status_code}")
+                continue
+            self.stdout.write(f"{label}: {len(captured)}/{BUDGETS[name]} queries")
+        return failures
@@ -0,0 +1,108 @@
+import re
+from typing import Any, Callable, Dict, List
+
+from django.contrib import admin
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from events import api
+from events.benchmarks.fixtures import make_event, test_database
+from events.models import RSVP, Event
+from events.paginators import page_after
+from events.views import RSVPS_PER_PAGE
+
+FULL_SCAN_RE = re.compile(r"\bSCAN (?!\(?subquery)(?!.*\bUSING\b)")
+"""A SCAN that isn't reading through an index means the whole table is read.
+Scanning the rows a subquery produced is fine, since the subquery's own plan is
+checked too."""
+
+TEMP_SORT_RE = re.compile(r"USE TEMP B-TREE FOR (?:RIGHT PART OF )?ORDER BY")
+"""Sorting in a temporary b-tree means there wasn't an index to read in order."""
+
+
+def admin_page(model, cursor=None) -> Any:
+    """Load a page of the model's admin change list the way the admin does, and
+    return the change list."""
+    request = RequestFactory().get("/")
+    request.user = User(is_active=True, is_staff=True, is_superuser=True)
+    request.keyset_cursor = cursor
+    return admin.site._registry[model].get_changelist_instance(request)
+
+
+def important_queries() -> Dict[str, Callable[[], Any]]:
+    """The code whose queries have to stay fast as the tables grow. Each is
+    run for real against a small database, and every query it makes is
+    checked."""
+    # Enough rows for there to be a second page to seek to, everywhere.
+    per_page = max(RSVPS_PER_PAGE, admin.site._registry[Event].list_per_page) + 1
+    events = [make_event(per_page)] + [make_event() for _ in range(per_page)]
+    event_ids = [event.id for event in events[:2]]
+    rsvps = RSVP.objects.filter(event_id=event_ids[0])
+    _, rsvp_cursor = page_after(rsvps, None, RSVPS_PER_PAGE)
+    admin_cursors = {
+        model: admin_page(model).paginator.current_page.next_cursor for model in (Event, RSVP)
+    }
+    now = timezone.now()
+    return {
+        "event rsvps": lambda: page_after(rsvps, None, RSVPS_PER_PAGE),
+        "event rsvps after cursor": lambda: page_after(rsvps, rsvp_cursor, RSVPS_PER_PAGE),
+        "api events": lambda: api.serialize_events(event_ids, api.FIELDS),
+        "api event rsvp counts": lambda: api.serialize_events(event_ids, ["rsvp_count"]),
+        "admin events": lambda: admin_page(Event),
+        "admin events after cursor": lambda: admin_page(Event, admin_cursors[Event]),
+        "admin rsvps": lambda: admin_page(RSVP),
+        "admin rsvps after cursor": lambda: admin_page(RSVP, admin_cursors[RSVP]),
+        # Nothing looks these up yet, but Event(end_time) is indexed for them.
+        "upcoming events": lambda: list(
+            Event.objects.filter(end_time__gte=now).order_by("end_time")
+        ),
+        "expired events": lambda: list(Event.objects.filter(end_time__lt=now)),
+    }
+
+
+def explain(sql: str) -> List[str]:
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN QUERY PLAN {sql}")
+        return [row[-1] for row in cursor.fetchall()]
+
+
+class Command(BaseCommand):
+    help = (
+        "Run the app's most important queries on SQLite, EXPLAIN every query they "
+        "make, and fail if any of them scan a whole table or sort without an index."
+    )
+
+    def handle(self, *args, **options):
+        if connection.vendor != "sqlite":
+            raise CommandError("Query plans are only checked against SQLite.")
+
+        with test_database():
+            failures = self.check_plans()
+
+        if failures:
+            raise CommandError("These queries regressed:\n\n" + "\n\n".join(failures))
+        self.stdout.write(self.style.SUCCESS("All query plans use indexes."))
+
+    def check_plans(self) -> List[str]:
+        """EXPLAIN every query the important queries make and return a list of
+        failure messages."""
+        failures = []
+        for name, run in important_queries().items():
+            with CaptureQueriesContext(connection) as captured:
+                run()
+            problems = []
+            for query in captured.captured_queries:
+                if not query["sql"].startswith("SELECT"):
+                    continue
+                plan = explain(query["sql"])
+                if any(FULL_SCAN_RE.search(line) or TEMP_SORT_RE.search(line) for line in plan):
+                    problems.append("\n".join([query["sql"], *plan]))
+            if problems:
+                failures.append(f"{name}:\n" + "\n\n".join(problems))
+            else:
+                self.stdout.write(f"{name}: ok ({len(captured)} queries)")
+        return failures
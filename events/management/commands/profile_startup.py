@@ -0,0 +1,112 @@
+import json
+import statistics
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+MODULES = [
+    "planner.settings",
+    "events.views",
+    "arrow",
+    "base58",
+    "django.contrib.admin",
+    "planner.admin_urls",
+    "google.cloud.secretmanager",
+]
+"""Modules to time the import of, each on its own after Django is set up."""
+
+CHILD = """
+import json, os, sys, time
+from importlib import import_module
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "planner.settings")
+timings = []
+
+def timed(name, func):
+    start = time.perf_counter()
+    func()
+    timings.append((name, time.perf_counter() - start))
+
+if sys.argv[1] == "startup":
+    import uuid
+
+    timed("import planner.settings", lambda: import_module("planner.settings"))
+    import django
+    timed("django.setup()", django.setup)
+    from django.db import connection
+    from django.template.loader import get_template
+    from django.urls import reverse
+
+    timed("import planner.urls", lambda: import_module("planner.urls"))
+    timed("populate URL resolver", lambda: reverse("events:detail", args=[uuid.uuid4()]))
+    timed("compile detail.html", lambda: get_template("events/event/detail.html"))
+    timed("first DB connection", connection.ensure_connection)
+else:
+    module = sys.argv[2]
+    if module != "planner.settings":
+        import django
+        django.setup()
+    if module in sys.modules:
+        timings.append((module, None))
+    else:
+        try:
+            timed(module, lambda: import_module(module))
+        except ImportError:
+            timings.append((module, "not installed"))
+print(json.dumps(timings))
+"""
+"""Run in a fresh interpreter for every measurement, so nothing is imported yet."""
+
+
+class Command(BaseCommand):
+    help = (
+        "Report how long each step of starting the app takes, and what importing "
+        "some of the heavier modules costs, each in a fresh interpreter."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--runs", type=int, default=5, help="Take the median of this many runs."
+        )
+
+    def handle(self, *args, **options):
+        runs = options["runs"]
+        self.stdout.write(self.style.MIGRATE_HEADING(f"Startup, median of {runs} runs"))
+        total = 0.0
+        for name, seconds in self.median_timings(["startup"], runs):
+            total += seconds
+            self.stdout.write(f"{name:<28} {seconds * 1000:>8.1f} ms")
+        self.stdout.write(f"{'total':<28} {total * 1000:>8.1f} ms")
+
+        self.stdout.write(self.style.MIGRATE_HEADING("Imports after django.setup()"))
+        for module in MODULES:
+            ((name, seconds),) = self.median_timings(["import", module], runs)
+            if seconds is None:
+                result = "loaded by django.setup()"
+            elif isinstance(seconds, str):
+                result = seconds
+            else:
+                result = f"{seconds * 1000:>8.1f} ms"
+            self.stdout.write(f"{name:<28} {result}")
+
+    def median_timings(self, args, runs):
+        """Run the child script `runs` times and return the median of each timing."""
+        results = [self.run_child(args) for _ in range(runs)]
+        timings = []
+        for i, (name, seconds) in enumerate(results[0]):
+            if isinstance(seconds, float):
+                seconds = statistics.median(result[i][1] for result in results)
+            timings.append((name, seconds))
+        return timings
+
+    def run_child(self, args):
+        output = subprocess.run(
+            [sys.executable, "-c", CHILD, *args],
+            cwd=settings.BASE_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        return json.loads(output.strip().splitlines()[-1])
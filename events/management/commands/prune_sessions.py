@@ -0,0 +1,68 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.sessions.models import Session
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete expired sessions from the session table in small chunks, so the "
+        "table is never locked for long. Unlike clearsessions, this can also "
+        "delete sessions that haven't been written to in a while. Only the "
+        "session table is pruned: sessions kept in their cookie by planner.sessions "
+        "aren't stored here, and with the cached_db engine, copies of deleted "
+        "sessions stay in the cache until they expire there."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=1000,
+            help="How many sessions to delete per transaction.",
+        )
+        parser.add_argument(
+            "--sleep",
+            type=float,
+            default=0.1,
+            help="How long to pause between chunks, in seconds.",
+        )
+        parser.add_argument(
+            "--inactive-days",
+            type=int,
+            default=None,
+            help=(
+                "Also delete sessions that haven't been saved in this many days. "
+                "Sessions last for SESSION_COOKIE_AGE, so without this almost "
+                "nothing ever expires."
+            ),
+        )
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now()
+        if options["inactive_days"] is not None:
+            # A session's expiry date is pushed out to SESSION_COOKIE_AGE every
+            # time it's saved, so we can work backwards to when that was.
+            cutoff += timedelta(seconds=settings.SESSION_COOKIE_AGE)
+            cutoff -= timedelta(days=options["inactive_days"])
+
+        deleted = 0
+        while True:
+            with transaction.atomic():
+                keys = list(
+                    Session.objects.filter(expire_date__lt=cutoff).values_list(
+                        "session_key", flat=True
+                    )[: options["chunk_size"]]
+                )
+                if not keys:
+                    break
+                Session.objects.filter(session_key__in=keys).delete()
+            deleted += len(keys)
+            self.stdout.write(f"Deleted {deleted} sessions so far")
+            time.sleep(options["sleep"])
+
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} sessions"))
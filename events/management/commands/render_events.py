@@ -0,0 +1,55 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from events import page_cache
+from events.models import Event
+
+
+class Command(BaseCommand):
+    help = (
+        "Fill in the sanitized description and links stored on each event, in "
+        "chunks. Run it after the migration that added them, and again whenever "
+        "RENDER_VERSION changes. Events that are already up to date are skipped."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=500,
+            help="How many events to render per transaction.",
+        )
+        parser.add_argument(
+            "--sleep",
+            type=float,
+            default=0.1,
+            help="How long to pause between chunks, in seconds.",
+        )
+
+    def handle(self, *args, **options):
+        checked = rendered = 0
+        last_id = None
+        while True:
+            with transaction.atomic():
+                events = Event.objects.order_by("id")
+                if last_id is not None:
+                    events = events.filter(id__gt=last_id)
+                chunk = list(events[: options["chunk_size"]])
+                if not chunk:
+                    break
+                stale = [event for event in chunk if event.rendered_hash != event.content_hash()]
+                for event in stale:
+                    event.render()
+                # bulk_update skips save(), so updated_at is left alone.
+                Event.objects.bulk_update(stale, Event.RENDERED_FIELDS)
+            for event in stale:
+                page_cache.bump_version(event.id)
+            last_id = chunk[-1].id
+            checked += len(chunk)
+            rendered += len(stale)
+            self.stdout.write(f"Checked {checked} events so far, rendered {rendered}")
+            time.sleep(options["sleep"])
+
+        self.stdout.write(self.style.SUCCESS(f"Rendered {rendered} of {checked} events"))
@@ -0,0 +1,24 @@
+# Generated by Django 3.2.25 on 2026-10-18 14:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("events", "0004_calendarfeed"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="rsvp",
+            name="idempotency_key",
+            field=models.UUIDField(blank=True, null=True),
+        ),
+        migrations.AddConstraint(
+            model_name="rsvp",
+            constraint=models.UniqueConstraint(
+                fields=("event", "idempotency_key"), name="rsvp_event_idempotency_key_uniq"
+            ),
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 3.2.25 on 2026-10-18 15:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("events", "0005_rsvp_idempotency_key"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="event",
+            name="apple_maps_link",
+            field=models.TextField(default="", editable=False),
+        ),
+        migrations.AddField(
+            model_name="event",
+            name="description_html",
+            field=models.TextField(default="", editable=False),
+        ),
+        migrations.AddField(
+            model_name="event",
+            name="gcal_link",
+            field=models.TextField(default="", editable=False),
+        ),
+        migrations.AddField(
+            model_name="event",
+            name="google_maps_iframe_link",
+            field=models.TextField(default="", editable=False),
+        ),
+        migrations.AddField(
+            model_name="event",
+            name="google_maps_link",
+            field=models.TextField(default="", editable=False),
+        ),
+        migrations.AddField(
+            model_name="event",
+            name="rendered_hash",
+            field=models.CharField(default="", editable=False, max_length=64),
+        ),
+    ]
@@ -1,10 +1,16 @@
+import hashlib
 import uuid
 from urllib.parse import quote
 
 from django.db import models
 
+from .sanitize import sanitize_html
 from .secret_utils import SecretMixin
 
+RENDER_VERSION = 2
+"""Bump this when the sanitizer or any of the links change, so that
+`manage.py render_events` knows to render every event again."""
+
 
 class TimeStampMixin(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
@@ -26,9 +32,67 @@ class Event(TimeStampMixin, SecretMixin):
     confetti_emojis = models.CharField(max_length=256, default="")
     confetti_amount = models.IntegerField(default=100)
 
+    # Worked out from the fields above when the event is saved, so pages don't
+    # have to clean up the description or build the links every time they're
+    # shown. rendered_hash is a hash of what they were built from.
+    description_html = models.TextField(default="", editable=False)
+    gcal_link = models.TextField(default="", editable=False)
+    google_maps_link = models.TextField(default="", editable=False)
+    apple_maps_link = models.TextField(default="", editable=False)
+    google_maps_iframe_link = models.TextField(default="", editable=False)
+    rendered_hash = models.CharField(max_length=64, default="", editable=False)
+
+    RENDERED_FIELDS = [
+        "description_html",
+        "gcal_link",
+        "google_maps_link",
+        "apple_maps_link",
+        "google_maps_iframe_link",
+        "rendered_hash",
+    ]
+
+    class Meta:
+        indexes = [
+            # The admin lists events newest first, paging by (created_at, id).
+            models.Index(fields=["created_at", "id"], name="event_created_at_idx"),
+            # For finding upcoming and expired events.
+            models.Index(fields=["end_time"], name="event_end_time_idx"),
+        ]
+
     def __str__(self):
         return f"{self.title} ({self.start_time})"
 
+    def save(self, *args, **kwargs):
+        # The times can be given as strings, but rendering needs datetimes.
+        for name in ("start_time", "end_time"):
+            setattr(self, name, self._meta.get_field(name).to_python(getattr(self, name)))
+        if self.rendered_hash != self.content_hash():
+            self.render()
+            if kwargs.get("update_fields") is not None:
+                kwargs["update_fields"] = {*kwargs["update_fields"], *self.RENDERED_FIELDS}
+        super().save(*args, **kwargs)
+
+    def content_hash(self) -> str:
+        """A hash of everything the rendered fields are built from."""
+        content = [
+            str(RENDER_VERSION),
+            self.title,
+            self.description,
+            self.location,
+            self.start_time.isoformat(),
+            self.end_time.isoformat(),
+        ]
+        return hashlib.sha256("\0".join(content).encode("utf-8")).hexdigest()
+
+    def render(self) -> None:
+        """Fill in the rendered fields, without saving them."""
+        self.description_html = sanitize_html(self.description)
+        self.gcal_link = self.add_to_gcal_link()
+        self.google_maps_link = self.google_maps_url()
+        self.apple_maps_link = self.apple_maps_url()
+        self.google_maps_iframe_link = self.google_maps_iframe_url()
+        self.rendered_hash = self.content_hash()
+
     def google_maps_iframe_url(self):
         return (
             "https://maps.google.com/maps?"
@@ -71,6 +135,34 @@ class RSVP(TimeStampMixin, SecretMixin):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     event = models.ForeignKey(Event, on_delete=models.CASCADE)
     name = models.CharField(max_length=60)
+    idempotency_key = models.UUIDField(null=True, blank=True)
+    """Sent along with the RSVP form so that submitting it twice (say, a double
+    tap on a phone) only makes one RSVP."""
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["event", "idempotency_key"], name="rsvp_event_idempotency_key_uniq"
+            ),
+        ]
+        indexes = [
+            # An event's RSVPs in the order they came in.
+            models.Index(fields=["event", "created_at", "id"], name="rsvp_event_created_at_idx"),
+            # The admin lists RSVPs newest first, paging by (created_at, id).
+            models.Index(fields=["created_at", "id"], name="rsvp_created_at_idx"),
+        ]
 
     def __str__(self):
         return f"{self.name} RSVP'd to {self.event.title}"
+
+
+class CalendarFeed(TimeStampMixin):
+    """A calendar feed of the events a session owns or has RSVP'd to. Calendar
+    apps don't send our session cookie, so the feed's id stands in for it.
+    Like the edit links, anybody with the id can read the feed."""
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    session_key = models.CharField(max_length=40, unique=True)
+
+    def __str__(self):
+        return f"Calendar feed {self.id}"
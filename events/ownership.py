@@ -0,0 +1,138 @@
+"""Keeping track, in the session, of which events and RSVPs a user owns.
+
+Everything lives under a single session key, indexed by event id:
+
+    session["events"] = {
+        "<event_id>": {
+            "owner": "<event secret>" or None,
+            "rsvps": {"<rsvp_id>": "<rsvp secret>" or None, ...},
+        },
+        ...
+    }
+
+so looking up what a user owns for an event doesn't depend on how many other
+events they've touched.
+
+Sessions used to store this as flat keys: "<event_id>_event_secret",
+"<event_id>_<rsvp_id>_rsvp_secret", and, before that, "<event_id>" mapped to an
+RSVP id with no secret. Those are folded into the index the first time a session
+that still has them is used. RSVPs carried over from the oldest form have no
+secret, so they count towards being RSVP'd but don't grant edit access, same as
+before.
+"""
+import re
+from typing import Any, Dict, List, Optional, Union
+from uuid import UUID
+
+from .secret_utils import secret_is_correct
+
+SESSION_KEY = "events"
+
+UUID_36_REGEX = r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}"
+LEGACY_EVENT_SECRET_RE = re.compile(f"^({UUID_36_REGEX})_event_secret$")
+LEGACY_RSVP_SECRET_RE = re.compile(f"^({UUID_36_REGEX})_({UUID_36_REGEX})_rsvp_secret$")
+LEGACY_RSVP_ID_RE = re.compile(f"^{UUID_36_REGEX}$")
+
+UUIDLike = Union[str, UUID]
+EventOwnership = Dict[str, Any]
+
+
+def _empty_entry() -> EventOwnership:
+    return {"owner": None, "rsvps": {}}
+
+
+def _compact_legacy_keys(session) -> Optional[Dict[str, EventOwnership]]:
+    """Move any of the old flat keys in the session into an index. Returns None
+    if there weren't any, so we don't write to sessions that don't need it.
+    """
+    index: Dict[str, EventOwnership] = {}
+    legacy_keys = []
+    for key, value in session.items():
+        if match := LEGACY_EVENT_SECRET_RE.match(key):
+            index.setdefault(match.group(1), _empty_entry())["owner"] = value
+        elif match := LEGACY_RSVP_SECRET_RE.match(key):
+            index.setdefault(match.group(1), _empty_entry())["rsvps"][match.group(2)] = value
+        elif LEGACY_RSVP_ID_RE.match(key):
+            index.setdefault(key, _empty_entry())["rsvps"].setdefault(str(value), None)
+        else:
+            continue
+        legacy_keys.append(key)
+
+    if not legacy_keys:
+        return None
+    for key in legacy_keys:
+        del session[key]
+    return index
+
+
+def _index(session) -> Dict[str, EventOwnership]:
+    index = session.get(SESSION_KEY)
+    if index is None:
+        index = _compact_legacy_keys(session)
+        if index is None:
+            return {}
+        session[SESSION_KEY] = index
+    return index
+
+
+def _entry_for_update(session, event_id: UUIDLike) -> EventOwnership:
+    index = _index(session)
+    session[SESSION_KEY] = index
+    # The index is mutated in place, so the session won't notice on its own.
+    session.modified = True
+    return index.setdefault(str(event_id), _empty_entry())
+
+
+def get(session, event_id: UUIDLike) -> Optional[EventOwnership]:
+    """Get what the session owns for the event, or None if it's never seen it."""
+    return _index(session).get(str(event_id))
+
+
+def is_owner(session, event_id: UUIDLike) -> bool:
+    """Determine if the session owns the event."""
+    entry = get(session, event_id)
+    return entry is not None and secret_is_correct(event_id, entry["owner"])
+
+
+def owned_rsvp_ids(session, event_id: UUIDLike) -> List[str]:
+    """Return the ids of the event's RSVPs that the session owns, confirmed by
+    checking their secrets."""
+    entry = get(session, event_id)
+    if entry is None:
+        return []
+    return [
+        rsvp_id
+        for rsvp_id, secret in entry["rsvps"].items()
+        if secret is not None and secret_is_correct(rsvp_id, secret)
+    ]
+
+
+def rsvp_ids(session, event_id: UUIDLike) -> List[str]:
+    """Return the ids of every RSVP the session has made to the event,
+    including the ones from before we kept secrets for them."""
+    entry = get(session, event_id)
+    return [] if entry is None else list(entry["rsvps"])
+
+
+def set_owner(session, event_id: UUIDLike, secret: str) -> None:
+    """Record that the session owns the event."""
+    _entry_for_update(session, event_id)["owner"] = secret
+
+
+def add_rsvp(session, event_id: UUIDLike, rsvp_id: UUIDLike, secret: str) -> None:
+    """Record that the session owns the RSVP."""
+    _entry_for_update(session, event_id)["rsvps"][str(rsvp_id)] = secret
+
+
+def owned_event_ids(session) -> List[str]:
+    """Return the ids of every event the session owns."""
+    return [
+        event_id
+        for event_id, entry in _index(session).items()
+        if secret_is_correct(event_id, entry["owner"])
+    ]
+
+
+def all_rsvp_ids(session) -> List[str]:
+    """Return the ids of every RSVP the session has made, to any event."""
+    return [rsvp_id for entry in _index(session).values() for rsvp_id in entry["rsvps"]]
@@ -0,0 +1,127 @@
+"""A cache for the rendered public event detail page.
+
+Every event that has had its page cached has a version stored in the cache.
+Saving or deleting an event, or one of its RSVPs, bumps that version (see
+signals.py). A rendered page is stored
+along with the version it was rendered for, so bumping the version invalidates
+the page without having to touch it. The old copy sticks around as a "stale"
+page that can be served while somebody else rebuilds it. A bump only reaches
+the workers that share the cache, which is why pages are only kept for a few
+seconds when it's a per-process one (see EVENT_PAGE_CACHE_TIMEOUT).
+
+Rebuilds are single-flight: only the request that wins the rebuild lock renders
+the page. Everybody else gets the stale copy if there is one, or waits for the
+winner to finish.
+"""
+import time
+from typing import Any, Callable, Optional, Tuple, Union
+from uuid import UUID
+
+from django.conf import settings
+from django.core.cache import caches
+
+EventId = Union[str, UUID]
+CachedPage = Tuple[int, Any]
+
+POLL_INTERVAL = 0.05
+"""How long, in seconds, to sleep between checks while waiting on a rebuild."""
+
+PAGE_FORMAT = 2
+"""Goes into the page keys. Bump it when what's cached for a page changes shape.
+The keys also include settings.RELEASE, so a new release never picks up pages or
+versions left behind by the one before it."""
+
+
+def _cache():
+    return caches[settings.EVENT_PAGE_CACHE_ALIAS]
+
+
+def _version_key(event_id: EventId) -> str:
+    return f"event-page:{settings.RELEASE}:{event_id}:version"
+
+
+def _page_key(event_id: EventId) -> str:
+    return f"event-page:{settings.RELEASE}:{event_id}:page:{PAGE_FORMAT}"
+
+
+def _lock_key(event_id: EventId, version: int) -> str:
+    return f"event-page:{event_id}:lock:{version}"
+
+
+def get_version(event_id: EventId) -> Optional[int]:
+    """Get the current version of an event, or None if it doesn't have one.
+
+    Versions are nanosecond timestamps rather than counters so that a version
+    key that gets evicted and recreated can never collide with an older one.
+    """
+    return _cache().get(_version_key(event_id))
+
+
+def _create_version(event_id: EventId) -> Optional[int]:
+    """Give the event its first version, once its page has been built. This way
+    looking up an event that doesn't exist never leaves a version behind.
+
+    Returns None if the event got a version in the meantime, e.g. because it was
+    saved while its page was being built, in which case that page may already
+    be out of date.
+    """
+    version = time.time_ns()
+    if _cache().add(_version_key(event_id), version, timeout=None):
+        return version
+    return None
+
+
+def bump_version(event_id: EventId) -> None:
+    """Invalidate any cached pages for the event."""
+    _cache().set(_version_key(event_id), time.time_ns(), timeout=None)
+
+
+def drop(event_id: EventId) -> None:
+    """Throw away everything cached for the event, including the stale copy.
+    Used when the event is deleted so nobody gets served a page for it."""
+    _cache().delete_many([_version_key(event_id), _page_key(event_id)])
+
+
+def _get_page(event_id: EventId) -> Optional[CachedPage]:
+    return _cache().get(_page_key(event_id))
+
+
+def get_or_build(event_id: EventId, build: Callable[[], Any]) -> Any:
+    """Return the rendered page for the event, calling `build` to render it if
+    the cached copy is missing or out of date. The page can be anything that
+    can be pickled, like the content along with its headers.
+    """
+    version = get_version(event_id)
+    cached = _get_page(event_id)
+    if version is not None and cached is not None and cached[0] == version:
+        return cached[1]
+
+    lock_timeout = settings.EVENT_PAGE_CACHE_LOCK_TIMEOUT
+    lock_key = _lock_key(event_id, version or 0)
+    if _cache().add(lock_key, True, timeout=lock_timeout):
+        try:
+            content = build()
+            if version is None:
+                version = _create_version(event_id)
+            if version is not None:
+                _cache().set(
+                    _page_key(event_id),
+                    (version, content),
+                    timeout=settings.EVENT_PAGE_CACHE_TIMEOUT,
+                )
+        finally:
+            _cache().delete(lock_key)
+        return content
+
+    # Somebody else is rebuilding the page. Serve the stale copy if we have one.
+    if cached is not None:
+        return cached[1]
+
+    # Otherwise wait for them to finish, and if they never do, render it ourselves.
+    deadline = time.monotonic() + lock_timeout
+    while time.monotonic() < deadline:
+        time.sleep(POLL_INTERVAL)
+        cached = _get_page(event_id)
+        if cached is not None and cached[0] >= (version or 0):
+            return cached[1]
+    return build()
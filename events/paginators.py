@@ -0,0 +1,160 @@
+"""Pagination that stays cheap no matter how deep into a big table you go."""
+from datetime import datetime
+from typing import List, Optional, Tuple
+from uuid import UUID
+
+from django.core.paginator import InvalidPage, Page, Paginator
+from django.db import connections
+from django.db.models import Q, QuerySet
+from django.utils.functional import cached_property
+
+COUNT_LIMIT = 10000
+"""Stop counting rows past this many. Anything bigger is shown as an estimate."""
+
+
+def estimated_count(queryset: QuerySet, limit: int = COUNT_LIMIT) -> Tuple[int, bool]:
+    """Count the queryset without scanning the whole table. Returns the count and
+    whether it's an estimate.
+
+    On Postgres an unfiltered queryset uses the planner's row estimate. Otherwise
+    rows are only counted up to `limit`.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor == "postgresql" and not queryset.query.where:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class WHERE relname = %s",
+                [queryset.model._meta.db_table],
+            )
+            row = cursor.fetchone()
+        # reltuples is -1 (or 0) until the table has been analyzed.
+        if row and row[0] >= limit:
+            return row[0], True
+
+    # Counting one past the limit tells us whether we hit it.
+    head = limit + 1
+    count = queryset[:head].count()
+    return min(count, limit), count > limit
+
+
+class KeysetPage(Page):
+    """A page that knows the cursors for the pages on either side of it."""
+
+    def __init__(self, object_list, number, paginator, next_cursor, previous_cursor):
+        super().__init__(object_list, number, paginator)
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def has_next(self) -> bool:
+        return self.next_cursor is not None
+
+    def has_previous(self) -> bool:
+        return self.previous_cursor is not None
+
+
+class KeysetPaginator(Paginator):
+    """Paginates a queryset newest first on (created_at, id).
+
+    Instead of an OFFSET, each page seeks to the rows just past a cursor taken
+    from the last (or first) row of the page before it, so every page costs the
+    same to load. That means pages are reached by following next/previous
+    cursors rather than by number.
+
+    Cursors look like "<" or ">" followed by "<created_at>_<id>". "<" gets the
+    page of rows older than the cursor, ">" the page of rows newer than it.
+    """
+
+    def __init__(self, object_list, per_page, cursor: Optional[str] = None, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.cursor = cursor
+        self.current_page: Optional[KeysetPage] = None
+
+    @cached_property
+    def _count(self) -> Tuple[int, bool]:
+        return estimated_count(self.object_list)
+
+    @cached_property
+    def count(self) -> int:
+        return self._count[0]
+
+    @property
+    def count_is_estimate(self) -> bool:
+        return self._count[1]
+
+    @staticmethod
+    def make_cursor(direction: str, obj) -> str:
+        return f"{direction}{obj.created_at.isoformat()}_{obj.pk}"
+
+    @staticmethod
+    def parse_cursor(cursor: str) -> Tuple[str, datetime, UUID]:
+        try:
+            created_at, pk = cursor[1:].rsplit("_", 1)
+            if cursor[0] not in "<>":
+                raise ValueError(cursor)
+            return cursor[0], datetime.fromisoformat(created_at), UUID(pk)
+        except ValueError:
+            raise InvalidPage("Invalid cursor") from None
+
+    def page(self, number) -> KeysetPage:
+        """Return the page for the paginator's cursor. The page number is only
+        kept around for display."""
+        self.current_page = self._page(number)
+        return self.current_page
+
+    def _page(self, number) -> KeysetPage:
+        # The cursor filters are written as "created_at <= x AND (created_at < x
+        # OR pk < y)" rather than just the OR so the database can seek straight
+        # to x in the (created_at, id) index.
+        # Fetching one extra row tells us whether there's another page.
+        per_page, head = self.per_page, self.per_page + 1
+        queryset = self.object_list.order_by("-created_at", "-pk")
+        if not self.cursor:
+            rows = list(queryset[:head])
+            more, rows = len(rows) > per_page, rows[:per_page]
+            next_cursor = self.make_cursor("<", rows[-1]) if more else None
+            return KeysetPage(rows, 1, self, next_cursor, None)
+
+        direction, created_at, pk = self.parse_cursor(self.cursor)
+        if direction == "<":
+            older = Q(created_at__lte=created_at) & (Q(created_at__lt=created_at) | Q(pk__lt=pk))
+            rows = list(queryset.filter(older)[:head])
+            more, rows = len(rows) > per_page, rows[:per_page]
+        else:
+            newer = Q(created_at__gte=created_at) & (Q(created_at__gt=created_at) | Q(pk__gt=pk))
+            rows = list(queryset.filter(newer).reverse()[:head])
+            more, rows = len(rows) > per_page, rows[:per_page][::-1]
+
+        if not rows:
+            return KeysetPage(rows, number, self, None, None)
+        has_older = more if direction == "<" else True
+        has_newer = more if direction == ">" else True
+        return KeysetPage(
+            rows,
+            number,
+            self,
+            self.make_cursor("<", rows[-1]) if has_older else None,
+            self.make_cursor(">", rows[0]) if has_newer else None,
+        )
+
+
+def page_after(
+    queryset: QuerySet, cursor: Optional[str], per_page: int
+) -> Tuple[List, Optional[str]]:
+    """Get the rows after `cursor` oldest first on (created_at, id), along with
+    the cursor for the rows after those, or None if there aren't any more.
+
+    Cursors are the ">" ones from KeysetPaginator. With no cursor, starts from
+    the beginning. Raises InvalidPage for a cursor that can't be parsed.
+    """
+    queryset = queryset.order_by("created_at", "pk")
+    if cursor:
+        direction, created_at, pk = KeysetPaginator.parse_cursor(cursor)
+        if direction != ">":
+            raise InvalidPage("Invalid cursor")
+        # Same trick as KeysetPaginator for seeking into the index.
+        newer = Q(created_at__gte=created_at) & (Q(created_at__gt=created_at) | Q(pk__gt=pk))
+        queryset = queryset.filter(newer)
+    head = per_page + 1
+    rows = list(queryset[:head])
+    more, rows = len(rows) > per_page, rows[:per_page]
+    return rows, KeysetPaginator.make_cursor(">", rows[-1]) if more else None
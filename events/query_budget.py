@@ -0,0 +1,28 @@
+"""Helpers for keeping track of how many queries a block of code makes."""
+from contextlib import contextmanager
+from typing import Iterator
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Raised when a block of code makes more queries than it's allowed to."""
+
+
+@contextmanager
+def query_budget(max_queries: int, label: str = "") -> Iterator[CaptureQueriesContext]:
+    """Fail if the code inside the block runs more than `max_queries` queries.
+
+    Example:
+        with query_budget(2, "events:detail"):
+            client.get(url)
+    """
+    with CaptureQueriesContext(connection) as captured:
+        yield captured
+    if len(captured) > max_queries:
+        queries = "\n".join(f"    {query['sql']}" for query in captured.captured_queries)
+        raise QueryBudgetExceeded(
+            f"{label or 'Block'} made {len(captured)} queries, "
+            f"but its budget is {max_queries}:\n{queries}"
+        )
@@ -0,0 +1,134 @@
+"""Exporting an event's RSVPs as a guest list, and importing them in bulk.
+
+Exports are generated a row at a time from a server-side cursor so they can be
+streamed without holding the whole guest list in memory. Imports are validated
+and inserted in batches inside a single transaction, so a bad row anywhere in
+the file means nothing gets imported.
+"""
+import codecs
+import csv
+import json
+from typing import IO, Iterable, Iterator, List, Tuple
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+from . import live, page_cache
+from .models import RSVP, Event
+
+CHUNK_SIZE = 2000
+"""How many rows to fetch from the database at a time while exporting."""
+
+BATCH_SIZE = 500
+"""How many RSVPs to insert per query while importing."""
+
+MAX_ERRORS = 20
+"""Stop validating an import after this many bad rows."""
+
+FORMATS = {"csv": "text/csv", "jsonl": "application/x-ndjson"}
+EXPORT_FIELDS = ["id", "name", "created_at"]
+
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+"""Spreadsheets run a cell starting with any of these as a formula, so a guest
+called "=HYPERLINK(...)" could run one on whoever opens the CSV. Exported names
+that start with one get a "'" in front, which is taken off again on import."""
+
+
+class Echo:
+    """A file-like object that hands back whatever is written to it, so the
+    csv module can format one row at a time."""
+
+    def write(self, value: str) -> str:
+        return value
+
+
+def _rows(event: Event) -> Iterator[Tuple]:
+    rsvps = RSVP.objects.filter(event=event).order_by("created_at", "id")
+    return rsvps.values_list(*EXPORT_FIELDS).iterator(chunk_size=CHUNK_SIZE)
+
+
+def escape_formula(value: str) -> str:
+    return f"'{value}" if value.startswith(FORMULA_PREFIXES) else value
+
+
+def unescape_formula(value: str) -> str:
+    return value[1:] if value[:1] == "'" and value[1:].startswith(FORMULA_PREFIXES) else value
+
+
+def export_csv(event: Event) -> Iterator[str]:
+    """Yield the event's RSVPs as CSV lines, starting with a header."""
+    writer = csv.writer(Echo())
+    yield writer.writerow(EXPORT_FIELDS)
+    for rsvp_id, name, created_at in _rows(event):
+        yield writer.writerow([rsvp_id, escape_formula(name), created_at.isoformat()])
+
+
+def export_jsonl(event: Event) -> Iterator[str]:
+    """Yield the event's RSVPs as one JSON object per line."""
+    for rsvp_id, name, created_at in _rows(event):
+        row = {"id": str(rsvp_id), "name": name, "created_at": created_at.isoformat()}
+        yield json.dumps(row) + "\n"
+
+
+EXPORTERS = {"csv": export_csv, "jsonl": export_jsonl}
+
+
+def read_names(file: IO[bytes], format: str) -> Iterator[Tuple[int, str]]:
+    """Yield the line number and guest name for each row of an uploaded file.
+
+    CSV files need a "name" column, so an export can be imported as is. JSON
+    lines files need a "name" key on every object.
+    """
+    lines = codecs.iterdecode(file, "utf-8-sig")
+    if format == "csv":
+        reader = csv.DictReader(lines)
+        if "name" not in (reader.fieldnames or []):
+            raise ValidationError('The file needs a "name" column.')
+        for row in reader:
+            yield reader.line_num, unescape_formula(row["name"] or "")
+        return
+
+    for line_number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+            yield line_number, str(row["name"])
+        except (ValueError, TypeError, KeyError):
+            raise ValidationError(f'Line {line_number}: expected an object with a "name".')
+
+
+def import_rsvps(event: Event, rows: Iterable[Tuple[int, str]]) -> int:
+    """Create an RSVP for each row and return how many were made.
+
+    Raises a ValidationError listing the bad rows if any of them aren't valid,
+    in which case none of the RSVPs are kept.
+    """
+    errors: List[str] = []
+    batch: List[RSVP] = []
+    created = 0
+    try:
+        with transaction.atomic():
+            for line_number, name in rows:
+                rsvp = RSVP(event=event, name=name.strip())
+                try:
+                    rsvp.full_clean(exclude=["event"], validate_unique=False)
+                except ValidationError as e:
+                    errors += [f"Line {line_number}: {message}" for message in e.messages]
+                    if len(errors) >= MAX_ERRORS:
+                        break
+                    continue
+                batch.append(rsvp)
+                if len(batch) >= BATCH_SIZE:
+                    created += len(RSVP.objects.bulk_create(batch))
+                    batch = []
+            if errors:
+                raise ValidationError(errors)
+            created += len(RSVP.objects.bulk_create(batch))
+            # bulk_create doesn't send post_save, so signals.py never hears about
+            # these. There could be thousands, so pages just reload the list.
+            transaction.on_commit(lambda: page_cache.bump_version(event.id))
+            transaction.on_commit(lambda: live.hub.publish(event.id, live.reset_message()))
+    except UnicodeDecodeError:
+        raise ValidationError("The file needs to be UTF-8 encoded.")
+    return created
@@ -0,0 +1,149 @@
+"""Cleaning up the HTML that people write in event descriptions.
+
+Descriptions come from the rich text editor on the create page, but nothing
+stops anybody from posting whatever HTML they like. Only the tags and
+attributes the editor makes are kept, and links have to be http, https or
+mailto. Anything else is dropped. Unknown tags are unwrapped so their text is
+kept, except for the likes of <script>, which are dropped along with their
+contents.
+"""
+import re
+from html.parser import HTMLParser
+from typing import Dict, List, Optional, Set
+from urllib.parse import urlsplit
+
+from django.utils.html import escape
+
+ALLOWED_TAGS = {
+    "a",
+    "b",
+    "blockquote",
+    "br",
+    "code",
+    "div",
+    "em",
+    "h1",
+    "h2",
+    "h3",
+    "hr",
+    "i",
+    "img",
+    "li",
+    "ol",
+    "p",
+    "pre",
+    "s",
+    "span",
+    "strike",
+    "strong",
+    "u",
+    "ul",
+}
+ALLOWED_ATTRIBUTES: Dict[str, Set[str]] = {
+    "*": {"style"},
+    "a": {"href", "title"},
+    "img": {"src", "alt", "title"},
+}
+ALLOWED_STYLES = {
+    "font-weight",
+    "font-style",
+    "text-align",
+    "text-decoration",
+    "text-decoration-line",
+}
+"""CSS properties the editor sets when it's told to style with CSS."""
+URL_ATTRIBUTES = {"href", "src"}
+URL_SCHEMES = {"", "http", "https", "mailto"}
+DROPPED_WITH_CONTENTS = {"script", "style", "iframe", "object", "template", "textarea"}
+"""Never add void elements like <embed> here. They have no end tag, so
+everything after them would be dropped too. Leaving them out of ALLOWED_TAGS
+is enough to drop them."""
+VOID_TAGS = {"br", "hr", "img"}
+
+# Browsers ignore whitespace and control characters in a URL's scheme, so
+# "java\tscript:" is still javascript.
+IGNORED_URL_CHARS_RE = re.compile(r"[\x00-\x20\x7f]+")
+STYLE_VALUE_RE = re.compile(r"^[\w\s#%.,-]+$")
+
+
+def clean_url(value: str) -> Optional[str]:
+    try:
+        scheme = urlsplit(IGNORED_URL_CHARS_RE.sub("", value)).scheme
+    except ValueError:
+        return None
+    return value.strip() if scheme.lower() in URL_SCHEMES else None
+
+
+def clean_style(value: str) -> Optional[str]:
+    declarations = []
+    for declaration in value.split(";"):
+        name, _, style_value = declaration.partition(":")
+        name, style_value = name.strip().lower(), style_value.strip()
+        if name in ALLOWED_STYLES and STYLE_VALUE_RE.match(style_value):
+            declarations.append(f"{name}: {style_value}")
+    return "; ".join(declarations) or None
+
+
+class Sanitizer(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.output: List[str] = []
+        self.open_tags: List[str] = []
+        self.dropping = 0
+        """How deep inside tags that are being dropped with their contents we are."""
+
+    def handle_starttag(self, tag, attrs):
+        if tag in DROPPED_WITH_CONTENTS:
+            self.dropping += 1
+        if self.dropping or tag not in ALLOWED_TAGS:
+            return
+        allowed = ALLOWED_ATTRIBUTES["*"] | ALLOWED_ATTRIBUTES.get(tag, set())
+        cleaned = []
+        for name, value in attrs:
+            if name not in allowed or value is None:
+                continue
+            if name in URL_ATTRIBUTES:
+                value = clean_url(value)
+            elif name == "style":
+                value = clean_style(value)
+            if value is not None:
+                cleaned.append(f' {name}="{escape(value)}"')
+        if tag == "a":
+            cleaned.append(' rel="nofollow noopener noreferrer"')
+        self.output.append(f"<{tag}{''.join(cleaned)}>")
+        if tag not in VOID_TAGS:
+            self.open_tags.append(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_TAGS:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        if tag in DROPPED_WITH_CONTENTS:
+            self.dropping = max(self.dropping - 1, 0)
+            return
+        if self.dropping or tag not in self.open_tags:
+            return
+        # Close anything left open inside this tag too.
+        while self.open_tags:
+            open_tag = self.open_tags.pop()
+            self.output.append(f"</{open_tag}>")
+            if open_tag == tag:
+                break
+
+    def handle_data(self, data):
+        if not self.dropping:
+            self.output.append(escape(data))
+
+    def result(self) -> str:
+        self.close()
+        return "".join(self.output) + "".join(f"</{tag}>" for tag in reversed(self.open_tags))
+
+
+def sanitize_html(html: str) -> str:
+    """Return `html` with only the tags, attributes and URLs that are safe to
+    show on an event page."""
+    sanitizer = Sanitizer()
+    sanitizer.feed(html)
+    return sanitizer.result()
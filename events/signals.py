@@ -0,0 +1,36 @@
+"""Signal receivers that keep the cached event pages and live updates up to date."""
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import live, page_cache
+from .models import RSVP, Event
+
+
+@receiver(post_save, sender=Event)
+def event_saved(sender, instance, **kwargs):
+    transaction.on_commit(lambda: page_cache.bump_version(instance.id))
+
+
+@receiver(post_delete, sender=Event)
+def event_deleted(sender, instance, **kwargs):
+    transaction.on_commit(lambda: page_cache.drop(instance.id))
+
+
+@receiver(post_save, sender=RSVP)
+@receiver(post_delete, sender=RSVP)
+def rsvp_changed(sender, instance, **kwargs):
+    transaction.on_commit(lambda: page_cache.bump_version(instance.event_id))
+
+
+@receiver(post_save, sender=RSVP)
+def rsvp_saved(sender, instance, created, **kwargs):
+    # Build the message now, the instance could change before the commit.
+    message = live.rsvp_message("created" if created else "updated", instance)
+    transaction.on_commit(lambda: live.hub.publish(instance.event_id, message))
+
+
+@receiver(post_delete, sender=RSVP)
+def rsvp_deleted(sender, instance, **kwargs):
+    message = live.rsvp_message("deleted", instance)
+    transaction.on_commit(lambda: live.hub.publish(instance.event_id, message))
@@ -24,19 +24,170 @@ function splitEmojiString(str) {
 
 var jsConfetti = null;
 
-// Use this for testing the confetti.
+var CONFETTI_URL = "https://cdn.jsdelivr.net/npm/js-confetti@latest/dist/js-confetti.browser.js";
+
+// Load a script once, resolving when it's ready.
+var loadedScripts = {};
+function loadScript(src) {
+  if (!loadedScripts[src]) {
+    loadedScripts[src] = new Promise((resolve, reject) => {
+      var script = document.createElement("script");
+      script.src = src;
+      script.onload = resolve;
+      script.onerror = reject;
+      document.head.append(script);
+    });
+  }
+  return loadedScripts[src];
+}
+
+// Use this for testing the confetti. Pages that always throw confetti load the
+// library up front, the rest only fetch it the first time it's needed.
 function launchConfetti(emojisString, confettiAmount) {
-  if (jsConfetti === null) {
-    jsConfetti = new JSConfetti();
+  var ready = window.JSConfetti ? Promise.resolve() : loadScript(CONFETTI_URL);
+  ready
+    .then(() => {
+      if (jsConfetti === null) {
+        jsConfetti = new JSConfetti();
+      }
+      jsConfetti.addConfetti({
+        "emojis": splitEmojiString(emojisString),
+        "confettiNumber": confettiAmount,
+      });
+    })
+    .catch((error) => console.log("Error loading confetti", error));
+}
+
+// Maps start out as a placeholder with a link to Google Maps, since the embed
+// weighs more than the rest of the page put together. The placeholder turns
+// into the embed when it's tapped or scrolled into view.
+function loadMap(facade) {
+  if (facade.dataset.loaded) {
+    return;
   }
-  jsConfetti.addConfetti({
-    "emojis": splitEmojiString(emojisString),
-    "confettiNumber": confettiAmount,
+  facade.dataset.loaded = "true";
+  var iframe = document.createElement("iframe");
+  iframe.width = "100%";
+  iframe.height = "400";
+  iframe.frameBorder = "0";
+  iframe.scrolling = "no";
+  iframe.src = facade.dataset.src;
+  facade.replaceChildren(iframe);
+}
+
+var mapObserver = null;
+function setupMaps(root) {
+  if (mapObserver === null && window.IntersectionObserver) {
+    mapObserver = new IntersectionObserver((entries) => {
+      entries.forEach((entry) => {
+        if (entry.isIntersecting) {
+          mapObserver.unobserve(entry.target);
+          loadMap(entry.target);
+        }
+      });
+    });
+  }
+  root.querySelectorAll(".map-facade").forEach((facade) => {
+    facade.addEventListener("click", (event) => {
+      event.preventDefault();
+      loadMap(facade);
+    });
+    if (mapObserver !== null) {
+      mapObserver.observe(facade);
+    }
   });
 }
 
+// Show a map of the location being typed in, once they've stopped typing.
+var previewTimer = null;
 function previewLocation(container, location) {
-  var mapsUrl = "https://maps.google.com/maps?width=100%25&amp;height=400&amp;hl=en&amp;q=" + encodeURIComponent(location) + "&amp;t=&amp;z=14&amp;ie=UTF8&amp;iwloc=B&amp;output=embed";
-  var embedHtml = '<div class="location-preview"><iframe width="100%" height="400" frameborder="0" scrolling="no" marginheight="0" marginwidth="0" src="' + mapsUrl + '"></iframe></div>';
-  container.innerHTML = embedHtml;
+  clearTimeout(previewTimer);
+  previewTimer = setTimeout(() => {
+    var mapsUrl = "https://maps.google.com/maps?width=100%25&height=400&hl=en&q=" + encodeURIComponent(location) + "&t=&z=14&ie=UTF8&iwloc=B&output=embed";
+    var facade = document.createElement("div");
+    var link = document.createElement("a");
+    facade.className = "map-facade location-preview";
+    facade.dataset.src = mapsUrl;
+    link.href = "https://maps.google.com/?q=" + encodeURIComponent(location);
+    link.setAttribute("role", "button");
+    link.className = "secondary";
+    link.textContent = "Show map";
+    facade.append(link);
+    container.replaceChildren(facade);
+    setupMaps(container);
+  }, 500);
+}
+
+// Swap a "Show more" link in the RSVP list for the next page of RSVPs.
+function loadMoreRSVPs(link) {
+  var item = link.closest("li");
+  link.textContent = "Loading...";
+  fetch(link.href)
+    .then((response) => response.text())
+    .then((html) => {
+      item.insertAdjacentHTML("afterend", html);
+      item.remove();
+    })
+    .catch((error) => console.log("Error loading RSVPs", error));
+  return false;
+}
+
+// Keep the RSVP list on an event page up to date as guests RSVP, change their
+// name or cancel, using the Server-Sent Events stream from the server.
+function followRSVPs(url) {
+  var responses = document.querySelector(".responses");
+  if (!window.EventSource || !responses) {
+    return;
+  }
+  var list = responses.querySelector(".rsvps ul");
+  var count = responses.querySelector(".rsvp-count");
+
+  function setCount(n) {
+    count.dataset.count = n;
+    count.textContent = n + (n === 1 ? " person is" : " people are") + " attending.";
+    count.hidden = n === 0;
+    responses.querySelector(".no-rsvps").hidden = n !== 0;
+  }
+
+  function findItem(id) {
+    return list.querySelector('li[data-rsvp-id="' + id + '"]');
+  }
+
+  var source = new EventSource(url);
+  source.addEventListener("created", (event) => {
+    var rsvp = JSON.parse(event.data);
+    setCount(Number(count.dataset.count) + 1);
+    // New RSVPs go at the end, so if there's a "Show more" link they'll turn
+    // up when the rest are loaded.
+    if (findItem(rsvp.id) || list.querySelector("li.load-more")) {
+      return;
+    }
+    var item = document.createElement("li");
+    var name = document.createElement("b");
+    item.dataset.rsvpId = rsvp.id;
+    name.textContent = rsvp.name;
+    item.append(name, " is attending");
+    list.append(item);
+  });
+  source.addEventListener("updated", (event) => {
+    var rsvp = JSON.parse(event.data);
+    var item = findItem(rsvp.id);
+    if (item) {
+      item.querySelector("b").textContent = rsvp.name;
+    }
+  });
+  source.addEventListener("deleted", (event) => {
+    var rsvp = JSON.parse(event.data);
+    var item = findItem(rsvp.id);
+    if (item) {
+      item.remove();
+    }
+    setCount(Math.max(Number(count.dataset.count) - 1, 0));
+  });
+  // Sent after a bulk import, or when this page fell too far behind to be
+  // sent every change.
+  source.addEventListener("reset", () => {
+    source.close();
+    window.location.reload();
+  });
 }
@@ -0,0 +1,21 @@
+"""Helpers for setting up data to test against."""
+from django.utils import timezone
+
+from events.models import RSVP, Event
+
+
+def make_event(rsvp_count: int = 0, **kwargs) -> Event:
+    """Create an event with `rsvp_count` RSVPs."""
+    now = timezone.now()
+    fields = {
+        "title": "Test Party",
+        "tagline": "A party for testing things",
+        "description": "",
+        "start_time": now,
+        "end_time": now,
+        "location": "Somewhere",
+        **kwargs,
+    }
+    event = Event.objects.create(**fields)
+    RSVP.objects.bulk_create([RSVP(event=event, name=f"Guest {i}") for i in range(rsvp_count)])
+    return event
@@ -0,0 +1,32 @@
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from events.models import RSVP, Event
+from events.secret_utils import uuid_to_secret
+from events.tests.fixtures import make_event
+
+
+@override_settings(STATICFILES_STORAGE="django.contrib.staticfiles.storage.StaticFilesStorage")
+class KeysetChangeListTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_superuser("admin", "admin@example.com", "password")
+        cls.event = make_event(3)
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def test_edit_links_use_the_secrets_derived_for_the_page(self):
+        cases = [
+            ("admin:events_event_changelist", Event, [self.event]),
+            ("admin:events_rsvp_changelist", RSVP, list(self.event.rsvp_set.all())),
+        ]
+        for name, model, rows in cases:
+            with self.subTest(name), mock.patch.object(model, "secret") as secret:
+                response = self.client.get(reverse(name))
+                secret.assert_not_called()
+                for row in rows:
+                    self.assertContains(response, f"secret={uuid_to_secret(row.id)}")
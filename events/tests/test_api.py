@@ -0,0 +1,82 @@
+import datetime
+import uuid
+from unittest import mock
+
+from django.test import TestCase
+from django.urls import reverse
+
+from events import api
+from events.converters import ShortUUID
+from events.models import RSVP
+from events.tests.fixtures import make_event
+
+
+class EventAPITests(TestCase):
+    def setUp(self):
+        self.event = make_event(title="Picnic")
+        start = self.event.created_at
+        for i, name in enumerate(["Ann", "Bob", "Cat"]):
+            rsvp = RSVP.objects.create(event=self.event, name=name)
+            # Out of order, so the names can't come back in insertion order by accident.
+            RSVP.objects.filter(pk=rsvp.pk).update(
+                created_at=start + datetime.timedelta(minutes=(i * 2) % 3)
+            )
+        self.url = reverse("events:api_event", kwargs={"pk": self.event.id})
+
+    def test_only_asked_for_fields_are_included(self):
+        response = self.client.get(self.url, {"fields": "title, rsvp_count"})
+        self.assertEqual(response.json(), {"title": "Picnic", "rsvp_count": 3})
+
+    def test_all_fields_by_default(self):
+        self.assertEqual(list(self.client.get(self.url).json()), api.FIELDS)
+
+    def test_unknown_fields_are_a_400(self):
+        response = self.client.get(self.url, {"fields": "title,secret"})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {"error": "Unknown fields: secret"})
+
+    def test_rsvps_are_in_the_order_they_came_in(self):
+        response = self.client.get(self.url, {"fields": "rsvps"})
+        self.assertEqual(response.json(), {"rsvps": ["Ann", "Cat", "Bob"]})
+
+    def test_missing_event_is_a_404(self):
+        url = reverse("events:api_event", kwargs={"pk": uuid.uuid4()})
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+    @mock.patch("events.api.MAX_RSVP_NAMES", 2)
+    def test_rsvp_names_are_capped_but_all_counted(self):
+        other = make_event(1)
+        response = self.client.get(
+            reverse("events:api_events"),
+            {"ids": f"{self.event.id},{other.id}", "fields": "rsvps,rsvp_count"},
+        )
+        self.assertEqual(
+            response.json()["events"],
+            [{"rsvps": ["Ann", "Cat"], "rsvp_count": 3}, {"rsvps": ["Guest 0"], "rsvp_count": 1}],
+        )
+
+
+class EventBatchAPITests(TestCase):
+    def setUp(self):
+        self.events = [make_event(title=f"Party {i}") for i in range(3)]
+
+    def get(self, ids: str):
+        return self.client.get(reverse("events:api_events"), {"ids": ids, "fields": "id,title"})
+
+    def test_events_come_back_in_the_order_asked_for(self):
+        first, second, third = self.events
+        ids = [str(third.id), ShortUUID().to_url(first.id), str(uuid.uuid4()), str(third.id)]
+        response = self.get(",".join(ids))
+        self.assertEqual(
+            [event["title"] for event in response.json()["events"]], ["Party 2", "Party 0"]
+        )
+
+    def test_no_events_found_is_an_empty_list(self):
+        response = self.get(str(uuid.uuid4()))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {"events": []})
+
+    def test_bad_ids_are_a_400(self):
+        for ids in ["", "not-an-id", ",".join(str(uuid.uuid4()) for _ in range(101))]:
+            with self.subTest(ids=ids[:20]):
+                self.assertEqual(self.get(ids).status_code, 400)
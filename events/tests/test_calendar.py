@@ -0,0 +1,72 @@
+import uuid
+
+from django.test import TestCase
+from django.urls import reverse
+
+from events.models import RSVP, CalendarFeed
+from events.tests.fixtures import make_event
+
+
+def content(response) -> str:
+    return b"".join(response.streaming_content).decode("utf-8")
+
+
+class EventCalendarTests(TestCase):
+    def setUp(self):
+        self.event = make_event(title="Picnic; with snacks, and games")
+        self.url = reverse("events:calendar", kwargs={"pk": self.event.id})
+
+    def test_event_as_ics(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response["Content-Type"], "text/calendar; charset=utf-8")
+        lines = content(response).split("\r\n")
+        self.assertEqual(lines[0], "BEGIN:VCALENDAR")
+        self.assertEqual(lines[-2:], ["END:VCALENDAR", ""])
+        self.assertIn(f"UID:{self.event.id}@smol.party", lines)
+        self.assertIn("SUMMARY:Picnic\\; with snacks\\, and games", lines)
+        self.assertTrue(all(len(line.encode("utf-8")) <= 75 for line in lines))
+
+    def test_unchanged_calendar_is_not_modified(self):
+        etag = self.client.get(self.url)["ETag"]
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        RSVP.objects.create(event=self.event, name="Guest")
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_missing_event_is_a_404(self):
+        url = reverse("events:calendar", kwargs={"pk": uuid.uuid4()})
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+
+class CalendarFeedTests(TestCase):
+    def setUp(self):
+        self.event, self.other_event = make_event(), make_event()
+        self.client.post(reverse("events:rsvp", kwargs={"event_id": self.event.id}), {"name": "Me"})
+        response = self.client.get(reverse("events:calendar_subscribe"))
+        self.assertTrue(response.url.startswith("webcal://testserver/"))
+        self.url = reverse("events:calendar_feed", kwargs={"pk": CalendarFeed.objects.get().id})
+        # Calendar apps don't have the session cookie.
+        self.client.cookies.clear()
+
+    def test_feed_has_the_sessions_events(self):
+        calendar = content(self.client.get(self.url))
+        self.assertIn(f"UID:{self.event.id}@smol.party", calendar)
+        self.assertNotIn(f"UID:{self.other_event.id}@smol.party", calendar)
+        self.assertIn("X-WR-CALNAME:My Smol Parties", calendar)
+
+    def test_feed_without_events_is_an_empty_calendar(self):
+        RSVP.objects.all().delete()
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        calendar = content(response)
+        self.assertIn("BEGIN:VCALENDAR", calendar)
+        self.assertNotIn("BEGIN:VEVENT", calendar)
+
+    def test_unchanged_feed_is_not_modified(self):
+        etag = self.client.get(self.url)["ETag"]
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        RSVP.objects.all().delete()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
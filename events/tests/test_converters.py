@@ -0,0 +1,38 @@
+import uuid
+
+import base58
+from django.test import SimpleTestCase
+
+from events.converters import ShortUUID, b58decode_uuid, b58encode_uuid
+
+
+class Base58Tests(SimpleTestCase):
+    def test_matches_the_base58_package(self):
+        values = [uuid.UUID(int=0), uuid.UUID(int=1), uuid.UUID(int=2**128 - 1)]
+        values += [uuid.UUID(bytes=b"\0\0" + uuid.uuid4().bytes[2:])]
+        values += [uuid.uuid4() for _ in range(100)]
+        for value in values:
+            with self.subTest(value=value):
+                encoded = b58encode_uuid(value)
+                self.assertEqual(encoded, base58.b58encode(value.bytes).decode())
+                self.assertEqual(b58decode_uuid(encoded), value)
+
+    def test_rejects_invalid_values(self):
+        for value in ["0OIl", "abc", "z" * 30]:
+            with self.subTest(value=value):
+                with self.assertRaises(ValueError):
+                    b58decode_uuid(value)
+
+
+class ShortUUIDTests(SimpleTestCase):
+    def test_round_trips_through_urls(self):
+        converter = ShortUUID()
+        for value in [uuid.UUID(int=1), uuid.uuid4()]:
+            with self.subTest(value=value):
+                url = converter.to_url(value)
+                self.assertEqual(len(url), 22)
+                self.assertEqual(converter.to_python(url), value)
+
+    def test_accepts_the_long_form(self):
+        value = uuid.uuid4()
+        self.assertEqual(ShortUUID().to_python(str(value)), value)
@@ -0,0 +1,75 @@
+import asyncio
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from events import live
+from events.tests.fixtures import make_event
+
+
+@override_settings(LIVE_UPDATES_QUEUE_SIZE=2, LIVE_UPDATES_HEARTBEAT=60)
+class HubTests(SimpleTestCase):
+    def setUp(self):
+        self.event_id = uuid.uuid4()
+
+    def publish(self, count: int) -> None:
+        for i in range(count):
+            live.hub.publish(self.event_id, {"type": "created", "id": str(i), "name": "Guest"})
+
+    async def test_messages_reach_subscribers(self):
+        subscriber = live.hub.subscribe(self.event_id)
+        try:
+            self.publish(2)
+            await asyncio.sleep(0)
+            self.assertEqual((await subscriber.get(1))["id"], "0")
+            self.assertEqual((await subscriber.get(1))["id"], "1")
+            self.assertIsNone(await subscriber.get(0))
+        finally:
+            live.hub.unsubscribe(subscriber)
+
+    async def test_subscribers_that_fall_behind_are_dropped(self):
+        subscriber = live.hub.subscribe(self.event_id)
+        try:
+            self.publish(3)
+            await asyncio.sleep(0)
+            self.assertIs(await subscriber.get(1), live.DROPPED)
+            # Nothing more is queued once a subscriber has been dropped.
+            self.publish(1)
+            await asyncio.sleep(0)
+            self.assertIsNone(await subscriber.get(0))
+        finally:
+            live.hub.unsubscribe(subscriber)
+
+    async def test_stream_resets_and_ends_when_dropped(self):
+        stream = live.stream(self.event_id)
+        self.assertTrue((await stream.__anext__()).startswith(b"retry:"))
+        self.assertEqual(live.hub.subscriber_count(self.event_id), 1)
+
+        self.publish(3)
+        self.assertEqual(await stream.__anext__(), live.format_event(live.reset_message()))
+        with self.assertRaises(StopAsyncIteration):
+            await stream.__anext__()
+        self.assertEqual(live.hub.subscriber_count(self.event_id), 0)
+
+
+@override_settings(STATICFILES_STORAGE="django.contrib.staticfiles.storage.StaticFilesStorage")
+class LiveUpdatesOverWSGITests(TestCase):
+    def setUp(self):
+        caches[settings.EVENT_PAGE_CACHE_ALIAS].clear()
+        self.event = make_event()
+
+    def test_streams_get_a_204(self):
+        url = reverse("events:rsvp_stream", kwargs={"pk": self.event.id})
+        for enabled in [False, True]:
+            with self.subTest(enabled=enabled), self.settings(LIVE_UPDATES=enabled):
+                self.assertEqual(self.client.get(url).status_code, 204)
+
+    def test_pages_only_follow_rsvps_when_enabled(self):
+        url = reverse("events:detail", kwargs={"pk": self.event.id})
+        self.assertNotContains(self.client.get(url), "followRSVPs(")
+        caches[settings.EVENT_PAGE_CACHE_ALIAS].clear()
+        with self.settings(LIVE_UPDATES=True):
+            self.assertContains(self.client.get(url), "followRSVPs(")
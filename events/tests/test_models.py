@@ -0,0 +1,34 @@
+from datetime import datetime, timezone
+
+from django.test import TestCase
+
+from events.models import Event
+
+
+class EventRenderingTests(TestCase):
+    def test_times_can_be_given_as_strings(self):
+        event = Event.objects.create(
+            title="Party",
+            tagline="",
+            description="",
+            location="Somewhere",
+            start_time="2030-01-01T10:00Z",
+            end_time="2030-01-01T12:00Z",
+        )
+        self.assertEqual(event.start_time, datetime(2030, 1, 1, 10, tzinfo=timezone.utc))
+        self.assertIn("dates=20300101T100000/20300101T120000", event.gcal_link)
+        self.assertEqual(event.rendered_hash, Event.objects.get(pk=event.pk).content_hash())
+
+    def test_changing_the_content_renders_again(self):
+        event = Event.objects.create(
+            title="Party",
+            tagline="",
+            description="<b>Hi</b>",
+            location="Somewhere",
+            start_time="2030-01-01T10:00Z",
+            end_time="2030-01-01T12:00Z",
+        )
+        event.description = "<i>Bye</i>"
+        event.save(update_fields=["description"])
+        event.refresh_from_db()
+        self.assertEqual(event.description_html, "<i>Bye</i>")
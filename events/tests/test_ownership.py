@@ -0,0 +1,48 @@
+import uuid
+
+from django.contrib.sessions.backends.db import SessionStore
+from django.test import SimpleTestCase
+
+from events import ownership
+from events.secret_utils import uuid_to_secret
+
+
+class OwnershipTests(SimpleTestCase):
+    def setUp(self):
+        self.session = SessionStore()
+        self.event_id = str(uuid.uuid4())
+        self.rsvp_id = str(uuid.uuid4())
+
+    def test_records_owners_and_rsvps(self):
+        ownership.set_owner(self.session, self.event_id, uuid_to_secret(self.event_id))
+        ownership.add_rsvp(self.session, self.event_id, self.rsvp_id, uuid_to_secret(self.rsvp_id))
+        self.assertTrue(self.session.modified)
+        self.assertTrue(ownership.is_owner(self.session, self.event_id))
+        self.assertEqual(ownership.owned_rsvp_ids(self.session, self.event_id), [self.rsvp_id])
+        self.assertEqual(ownership.owned_event_ids(self.session), [self.event_id])
+
+    def test_wrong_secrets_dont_count(self):
+        ownership.set_owner(self.session, self.event_id, "nope")
+        ownership.add_rsvp(self.session, self.event_id, self.rsvp_id, "nope")
+        self.assertFalse(ownership.is_owner(self.session, self.event_id))
+        self.assertEqual(ownership.owned_rsvp_ids(self.session, self.event_id), [])
+        self.assertEqual(ownership.rsvp_ids(self.session, self.event_id), [self.rsvp_id])
+
+    def test_compacts_legacy_keys(self):
+        old_rsvp_id = str(uuid.uuid4())
+        self.session[f"{self.event_id}_event_secret"] = uuid_to_secret(self.event_id)
+        self.session[f"{self.event_id}_{self.rsvp_id}_rsvp_secret"] = uuid_to_secret(self.rsvp_id)
+        self.session[self.event_id] = old_rsvp_id
+        self.session["unrelated"] = 1
+
+        self.assertTrue(ownership.is_owner(self.session, self.event_id))
+        self.assertEqual(ownership.owned_rsvp_ids(self.session, self.event_id), [self.rsvp_id])
+        self.assertCountEqual(
+            ownership.rsvp_ids(self.session, self.event_id), [self.rsvp_id, old_rsvp_id]
+        )
+        self.assertCountEqual(self.session.keys(), [ownership.SESSION_KEY, "unrelated"])
+
+    def test_leaves_sessions_without_legacy_keys_alone(self):
+        self.assertIsNone(ownership.get(self.session, self.event_id))
+        self.assertNotIn(ownership.SESSION_KEY, self.session)
+        self.assertFalse(self.session.modified)
@@ -0,0 +1,72 @@
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from events import page_cache
+from events.models import RSVP
+from events.tests.fixtures import make_event
+
+
+@override_settings(STATICFILES_STORAGE="django.contrib.staticfiles.storage.StaticFilesStorage")
+class PageCacheTests(TestCase):
+    def setUp(self):
+        caches[settings.EVENT_PAGE_CACHE_ALIAS].clear()
+        self.event = make_event()
+        self.builds = 0
+
+    def build(self, content="page"):
+        self.builds += 1
+        return content
+
+    def test_pages_are_built_once_per_version(self):
+        self.assertEqual(page_cache.get_or_build(self.event.id, self.build), "page")
+        self.assertEqual(page_cache.get_or_build(self.event.id, self.build), "page")
+        self.assertEqual(self.builds, 1)
+
+    def test_saving_the_event_bumps_its_version(self):
+        page_cache.get_or_build(self.event.id, self.build)
+        version = page_cache.get_version(self.event.id)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.event.save()
+        self.assertGreater(page_cache.get_version(self.event.id), version)
+        page_cache.get_or_build(self.event.id, self.build)
+        self.assertEqual(self.builds, 2)
+
+    def test_rsvps_show_up_once_committed(self):
+        url = reverse("events:detail", kwargs={"pk": self.event.id})
+        self.assertNotContains(self.client.get(url), "Late Guest")
+        with self.captureOnCommitCallbacks(execute=True):
+            RSVP.objects.create(event=self.event, name="Late Guest")
+        self.assertContains(self.client.get(url), "Late Guest")
+
+    def test_missing_events_dont_get_a_version(self):
+        event_id = uuid.uuid4()
+        response = self.client.get(reverse("events:detail", kwargs={"pk": event_id}))
+        self.assertEqual(response.status_code, 404)
+        self.assertIsNone(page_cache.get_version(event_id))
+
+    def test_stale_page_is_served_while_it_is_rebuilt(self):
+        page_cache.get_or_build(self.event.id, lambda: "old")
+        page_cache.bump_version(self.event.id)
+
+        def rebuild():
+            # Another request arriving mid-rebuild gets the old page rather
+            # than rendering it again.
+            self.assertEqual(page_cache.get_or_build(self.event.id, self.build), "old")
+            return "new"
+
+        self.assertEqual(page_cache.get_or_build(self.event.id, rebuild), "new")
+        self.assertEqual(page_cache.get_or_build(self.event.id, self.build), "new")
+        self.assertEqual(self.builds, 0)
+
+    def test_page_built_during_a_save_is_not_kept(self):
+        def build_while_saving():
+            page_cache.bump_version(self.event.id)
+            return self.build("outdated")
+
+        page_cache.get_or_build(self.event.id, build_while_saving)
+        self.assertEqual(page_cache.get_or_build(self.event.id, self.build), "page")
+        self.assertEqual(self.builds, 2)
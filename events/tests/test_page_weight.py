@@ -0,0 +1,43 @@
+from io import StringIO
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from events.management.commands import check_page_weight
+from events.tests.fixtures import make_event
+
+
+# The pages link to static files, which won't be in a manifest until
+# collectstatic has run.
+@override_settings(STATICFILES_STORAGE="django.contrib.staticfiles.storage.StaticFilesStorage")
+class PageWeightTests(TestCase):
+    """The same checks as `manage.py check_page_weight`, as part of the tests."""
+
+    def setUp(self):
+        caches[settings.EVENT_PAGE_CACHE_ALIAS].clear()
+        self.command = check_page_weight.Command(stdout=StringIO())
+
+    def test_pages_stay_within_their_budgets(self):
+        self.assertEqual(self.command.check_pages(), [])
+
+    def test_iframes_and_blocking_scripts_are_over_budget(self):
+        page = HttpResponse('<script src="/a.js"></script><iframe src="https://maps/"></iframe>')
+        self.assertEqual(
+            self.command.check_page("events:detail", page),
+            [
+                "events:detail is over its budget of 0 blocking_scripts: 1 (/a.js)",
+                "events:detail is over its budget of 0 iframes: 1 (https://maps/)",
+            ],
+        )
+
+    def test_the_map_loads_behind_a_facade(self):
+        event = make_event(location="1 Main St")
+        response = self.client.get(reverse("events:detail", kwargs={"pk": event.id}))
+        self.assertContains(
+            response, f'class="map-facade" data-src="{event.google_maps_iframe_link}"'
+        )
+        self.assertContains(response, f'href="{event.google_maps_link}" role="button"')
+        self.assertNotContains(response, "<iframe")
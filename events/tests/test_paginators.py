@@ -0,0 +1,59 @@
+from django.core.paginator import InvalidPage
+from django.test import TestCase
+from django.utils import timezone
+
+from events.models import RSVP
+from events.paginators import KeysetPaginator, page_after
+from events.query_budget import query_budget
+from events.tests.fixtures import make_event
+
+
+class KeysetPaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.event = make_event(25)
+        # Half of them share a created_at, so the id has to break the ties.
+        tied = RSVP.objects.filter(event=cls.event).order_by("pk")[:12]
+        RSVP.objects.filter(pk__in=list(tied.values_list("pk", flat=True))).update(
+            created_at=timezone.now()
+        )
+        cls.queryset = RSVP.objects.filter(event=cls.event).order_by("-created_at", "-pk")
+        cls.oldest_first = list(cls.queryset.order_by("created_at", "pk"))
+
+    def test_page_after_walks_every_row_once(self):
+        rows, cursor = [], None
+        while True:
+            with query_budget(1, "page_after"):
+                page, cursor = page_after(self.queryset, cursor, 10)
+            rows += page
+            if cursor is None:
+                break
+        self.assertEqual(rows, self.oldest_first)
+
+    def test_page_after_rejects_bad_cursors(self):
+        older = KeysetPaginator.make_cursor("<", self.oldest_first[0])
+        for cursor in ["garbage", "?2020-01-01_1", older]:
+            with self.subTest(cursor=cursor):
+                with self.assertRaises(InvalidPage):
+                    page_after(self.queryset, cursor, 10)
+
+    def test_paginator_walks_forwards_and_back(self):
+        newest_first = self.oldest_first[::-1]
+        pages, cursor = [], None
+        while True:
+            page = KeysetPaginator(self.queryset, 10, cursor=cursor).page(len(pages) + 1)
+            pages.append(page)
+            if not page.has_next():
+                break
+            cursor = page.next_cursor
+        self.assertEqual([row for page in pages for row in page], newest_first)
+        self.assertEqual([len(page) for page in pages], [10, 10, 5])
+        self.assertFalse(pages[0].has_previous())
+
+        previous = KeysetPaginator(self.queryset, 10, cursor=pages[-1].previous_cursor).page(2)
+        self.assertEqual(list(previous), list(pages[1]))
+
+    def test_paginator_counts_up_to_a_limit(self):
+        paginator = KeysetPaginator(self.queryset, 10)
+        self.assertEqual(paginator.count, 25)
+        self.assertFalse(paginator.count_is_estimate)
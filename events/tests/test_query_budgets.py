@@ -0,0 +1,41 @@
+import re
+from io import StringIO
+
+from django.conf import settings
+from django.db import connection
+from django.test import TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from events.management.commands import check_query_budgets
+from events.tests.fixtures import make_event
+
+TABLE_RE = re.compile(r'(?:FROM|JOIN) "(\w+)"')
+
+
+# The pages link to static files, which won't be in a manifest until
+# collectstatic has run.
+@override_settings(STATICFILES_STORAGE="django.contrib.staticfiles.storage.StaticFilesStorage")
+class QueryBudgetTests(TransactionTestCase):
+    """The same checks as `manage.py check_query_budgets`, as part of the tests.
+    Not a TestCase, since its savepoints would count against the budgets."""
+
+    def test_views_stay_within_their_budgets(self):
+        command = check_query_budgets.Command(stdout=StringIO())
+        for rsvp_count in check_query_budgets.RSVP_COUNTS:
+            with self.subTest(rsvp_count=rsvp_count):
+                self.assertEqual(command.check_budgets(rsvp_count), [])
+
+    def test_guests_with_a_session_only_load_the_event(self):
+        event, other_event = make_event(5), make_event()
+        self.client.post(
+            reverse("events:rsvp", kwargs={"event_id": other_event.id}), {"name": "Guest"}
+        )
+        self.assertIn(settings.SESSION_COOKIE_NAME, self.client.cookies)
+
+        url = reverse("events:detail", kwargs={"pk": event.id})
+        for attempt in ["uncached", "cached"]:
+            with self.subTest(attempt), CaptureQueriesContext(connection) as captured:
+                self.assertEqual(self.client.get(url).status_code, 200)
+            tables = {table for query in captured for table in TABLE_RE.findall(query["sql"])}
+            self.assertEqual(tables - {"events_event", "events_rsvp"}, set())
@@ -0,0 +1,16 @@
+from io import StringIO
+from unittest import skipUnless
+
+from django.db import connection
+from django.test import TransactionTestCase
+
+from events.management.commands import check_query_plans
+
+
+@skipUnless(connection.vendor == "sqlite", "Query plans are only checked against SQLite.")
+class QueryPlanTests(TransactionTestCase):
+    """The same checks as `manage.py check_query_plans`, as part of the tests."""
+
+    def test_important_queries_use_indexes(self):
+        command = check_query_plans.Command(stdout=StringIO())
+        self.assertEqual(command.check_plans(), [])
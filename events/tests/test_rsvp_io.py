@@ -0,0 +1,35 @@
+import csv
+import io
+
+from django.test import TestCase
+
+from events import rsvp_io
+from events.models import RSVP
+from events.tests.fixtures import make_event
+
+NAMES = ["Ada", '=HYPERLINK("http://x")', "+1", "-1", "@SUM(A1)", "'quoted", "O'Brien"]
+
+
+class CSVTests(TestCase):
+    def test_escapes_formulas_on_export(self):
+        event = make_event()
+        for name in NAMES:
+            RSVP.objects.create(event=event, name=name)
+        exported = [row[1] for row in csv.reader(rsvp_io.export_csv(event))][1:]
+        self.assertEqual(
+            exported,
+            ["Ada", '\'=HYPERLINK("http://x")', "'+1", "'-1", "'@SUM(A1)", "'quoted", "O'Brien"],
+        )
+
+    def test_export_imports_as_is(self):
+        event = make_event()
+        for name in NAMES:
+            RSVP.objects.create(event=event, name=name)
+        exported = "".join(rsvp_io.export_csv(event)).encode()
+
+        other = make_event()
+        rows = rsvp_io.read_names(io.BytesIO(exported), "csv")
+        self.assertEqual(rsvp_io.import_rsvps(other, rows), len(NAMES))
+        self.assertCountEqual(
+            RSVP.objects.filter(event=other).values_list("name", flat=True), NAMES
+        )
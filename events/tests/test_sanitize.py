@@ -0,0 +1,44 @@
+from django.test import SimpleTestCase
+
+from events.sanitize import sanitize_html
+
+
+class SanitizeHTMLTests(SimpleTestCase):
+    def test_keeps_what_the_editor_makes(self):
+        html = '<p style="text-align: center">Hi <b>there</b>, <a href="https://x.com">link</a></p>'
+        self.assertEqual(
+            sanitize_html(html),
+            '<p style="text-align: center">Hi <b>there</b>, '
+            '<a href="https://x.com" rel="nofollow noopener noreferrer">link</a></p>',
+        )
+
+    def test_drops_scripts_with_their_contents(self):
+        self.assertEqual(sanitize_html("<script>alert(1)</script>after"), "after")
+        self.assertEqual(sanitize_html("<style>p {}</style><p>after</p>"), "<p>after</p>")
+
+    def test_drops_void_tags_without_losing_what_follows(self):
+        self.assertEqual(sanitize_html("<embed src=x><p>after</p>"), "<p>after</p>")
+        self.assertEqual(sanitize_html("<p>a<embed src=x/>b</p>"), "<p>ab</p>")
+
+    def test_unwraps_unknown_tags(self):
+        self.assertEqual(sanitize_html("<blink>text</blink>"), "text")
+
+    def test_drops_unsafe_attributes_and_urls(self):
+        self.assertEqual(sanitize_html("<img src=x onerror=alert(1)>"), '<img src="x">')
+        self.assertEqual(
+            sanitize_html('<a href="java\tscript:alert(1)">x</a>'),
+            '<a rel="nofollow noopener noreferrer">x</a>',
+        )
+
+    def test_drops_styles_that_arent_allowed(self):
+        self.assertEqual(
+            sanitize_html('<p style="font-weight: bold; color: red">x</p>'),
+            '<p style="font-weight: bold">x</p>',
+        )
+
+    def test_escapes_text(self):
+        self.assertEqual(sanitize_html("1 < 2 & 3"), "1 &lt; 2 &amp; 3")
+
+    def test_closes_unclosed_tags(self):
+        self.assertEqual(sanitize_html("<ul><li>one"), "<ul><li>one</li></ul>")
+        self.assertEqual(sanitize_html("<div>a<b>b</div>c"), "<div>a<b>b</b></div>c")
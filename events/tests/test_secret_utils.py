@@ -0,0 +1,58 @@
+import hashlib
+import hmac
+import uuid
+
+from django.test import SimpleTestCase, override_settings
+
+from events import secret_utils
+from events.models import RSVP
+
+
+class SecretTests(SimpleTestCase):
+    def setUp(self):
+        self.id = uuid.uuid4()
+
+    def test_secrets_are_hmacs_of_the_id(self):
+        secret = secret_utils.uuid_to_secret(self.id)
+        expected = hmac.new(b"test-key", str(self.id).encode(), hashlib.sha256).hexdigest()
+        with self.settings(SECRET_KEY="test-key"):
+            self.assertEqual(secret_utils.uuid_to_secret(self.id), expected)
+        self.assertNotEqual(secret, expected)
+        self.assertEqual(secret_utils.uuid_to_secret(str(self.id)), secret)
+
+    def test_secrets_round_trip(self):
+        secret = secret_utils.uuid_to_secret(self.id)
+        self.assertTrue(secret_utils.secret_is_correct(self.id, secret))
+        self.assertTrue(secret_utils.secret_is_correct(str(self.id), secret))
+        self.assertFalse(secret_utils.secret_is_correct(uuid.uuid4(), secret))
+        self.assertFalse(secret_utils.secret_is_correct(self.id, secret[:-1]))
+        self.assertFalse(secret_utils.secret_is_correct(self.id, None))
+
+    def test_legacy_secrets_only_work_while_accepted(self):
+        legacy = secret_utils.legacy_uuid_to_secret(self.id)
+        with self.settings(SECRETS_ACCEPT_LEGACY=True):
+            self.assertTrue(secret_utils.secret_is_correct(self.id, legacy))
+        with self.settings(SECRETS_ACCEPT_LEGACY=False):
+            self.assertFalse(secret_utils.secret_is_correct(self.id, legacy))
+            self.assertTrue(
+                secret_utils.secret_is_correct(self.id, secret_utils.uuid_to_secret(self.id))
+            )
+
+    def test_secrets_for_matches_one_at_a_time(self):
+        ids = [uuid.uuid4() for _ in range(5)] + [str(uuid.uuid4())]
+        secrets = secret_utils.secrets_for(ids)
+        self.assertEqual(list(secrets), ids)
+        self.assertEqual(secrets, {id: secret_utils.uuid_to_secret(id) for id in ids})
+
+    def test_secrets_for_matches_the_models(self):
+        rsvps = [RSVP(id=uuid.uuid4()) for _ in range(3)]
+        secrets = secret_utils.secrets_for(rsvp.id for rsvp in rsvps)
+        self.assertEqual([secrets[rsvp.id] for rsvp in rsvps], [rsvp.secret() for rsvp in rsvps])
+        self.assertTrue(all(rsvp.secret_is_correct(secrets[rsvp.id]) for rsvp in rsvps))
+
+    @override_settings(SECRET_KEY="one-key")
+    def test_changing_the_secret_key_changes_the_secrets(self):
+        secret = secret_utils.uuid_to_secret(self.id)
+        with self.settings(SECRET_KEY="another-key"):
+            self.assertNotEqual(secret_utils.uuid_to_secret(self.id), secret)
+            self.assertFalse(secret_utils.secret_is_correct(self.id, secret))
@@ -0,0 +1,62 @@
+import uuid
+
+from django.db import IntegrityError
+from django.test import TransactionTestCase, override_settings
+from django.urls import reverse
+
+from events import write_buffer
+from events.models import RSVP
+from events.tests.fixtures import make_event
+
+
+# Foreign keys are only checked when the transaction commits, which never
+# happens inside a TestCase.
+@override_settings(RSVP_COALESCE_WINDOW=0)
+class WriteBufferTests(TransactionTestCase):
+    def setUp(self):
+        self.event = make_event()
+
+    def rsvp(self, event_id=None, key=None) -> RSVP:
+        return RSVP(event_id=event_id or self.event.id, name="Guest", idempotency_key=key)
+
+    def test_add_stores_the_rsvp(self):
+        rsvp = self.rsvp(key=uuid.uuid4())
+        self.assertEqual(write_buffer.add(rsvp), rsvp.id)
+        self.assertTrue(RSVP.objects.filter(pk=rsvp.id).exists())
+
+    def test_flush_writes_a_batch_and_drops_duplicates(self):
+        key = uuid.uuid4()
+        first, duplicate, other = self.rsvp(key=key), self.rsvp(key=key), self.rsvp()
+        futures = [write_buffer.submit(rsvp) for rsvp in (first, duplicate, other)]
+        write_buffer.flush()
+        self.assertEqual([future.result() for future in futures], [first.id, first.id, other.id])
+        self.assertEqual(RSVP.objects.filter(event=self.event).count(), 2)
+
+    def test_only_the_bad_rsvp_fails(self):
+        good, bad = self.rsvp(key=uuid.uuid4()), self.rsvp(event_id=uuid.uuid4())
+        good_future, bad_future = write_buffer.submit(good), write_buffer.submit(bad)
+        write_buffer.flush()
+        self.assertEqual(good_future.result(), good.id)
+        self.assertIsInstance(bad_future.exception(), IntegrityError)
+        self.assertEqual(list(RSVP.objects.values_list("pk", flat=True)), [good.id])
+
+    @override_settings(RSVP_WRITE_COALESCING=True)
+    def test_view_turns_away_rsvps_for_missing_events(self):
+        url = reverse("events:rsvp", kwargs={"event_id": uuid.uuid4()})
+        response = self.client.post(url, {"name": "Guest", "idempotency_key": uuid.uuid4()})
+        self.assertEqual(response.status_code, 404)
+        write_buffer.flush()
+        self.assertFalse(RSVP.objects.exists())
+
+    def test_view_turns_away_resubmissions_for_deleted_events(self):
+        url = reverse("events:rsvp", kwargs={"event_id": uuid.uuid4()})
+        response = self.client.post(url, {"name": "Guest", "idempotency_key": uuid.uuid4()})
+        self.assertEqual(response.status_code, 404)
+
+    def test_view_treats_resubmissions_as_the_first_submission(self):
+        url = reverse("events:rsvp", kwargs={"event_id": self.event.id})
+        data = {"name": "Guest", "idempotency_key": uuid.uuid4()}
+        first, second = self.client.post(url, data), self.client.post(url, data)
+        self.assertEqual(first.status_code, 302)
+        self.assertEqual(second.url, first.url)
+        self.assertEqual(RSVP.objects.filter(event=self.event).count(), 1)
@@ -11,6 +11,24 @@ urlpatterns = [
     path("create/", views.CreateUpdateEventView.as_view(), name="create"),
     # ex: /123/
     path("<shortuuid:pk>/", views.EventDetailView.as_view(), name="detail"),
+    # ex: /api/events/?ids=123,456&fields=title,start_time
+    path("api/events/", views.EventBatchAPIView.as_view(), name="api_events"),
+    # ex: /api/events/123/?fields=title,rsvps
+    path("api/events/<shortuuid:pk>/", views.EventAPIView.as_view(), name="api_event"),
+    # ex: /123/rsvps/?after=>2022-06-01T12:00:00+00:00_456
+    path("<shortuuid:pk>/rsvps/", views.EventRSVPListView.as_view(), name="rsvps"),
+    # ex: /123/rsvps/live/
+    path("<shortuuid:pk>/rsvps/live/", views.rsvp_stream, name="rsvp_stream"),
+    # ex: /123/rsvps.csv?secret=abc
+    path("<shortuuid:pk>/rsvps.<str:format>", views.ExportRSVPsView.as_view(), name="export"),
+    # ex: /123/rsvps/import/?secret=abc
+    path("<shortuuid:pk>/rsvps/import/", views.ImportRSVPsView.as_view(), name="import"),
+    # ex: /123/calendar.ics
+    path("<shortuuid:pk>/calendar.ics", views.EventCalendarView.as_view(), name="calendar"),
+    # ex: /calendar/
+    path("calendar/", views.SubscribeCalendarView.as_view(), name="calendar_subscribe"),
+    # ex: /calendar/123.ics
+    path("calendar/<shortuuid:pk>.ics", views.CalendarFeedView.as_view(), name="calendar_feed"),
     # ex: /123/update/
     path("<shortuuid:pk>/update/", views.CreateUpdateEventView.as_view(), name="update"),
     # ex: /123/delete/
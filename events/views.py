@@ -1,15 +1,48 @@
-import re
-from typing import List
-
+import abc
+import json
+from importlib import import_module
+from typing import List, Optional, Tuple
+from uuid import UUID
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
 from django.core.exceptions import PermissionDenied
+from django.core.handlers.asgi import ASGIRequest
+from django.core.paginator import InvalidPage
+from django.db import IntegrityError, transaction
+from django.db.models import Q
 from django.forms.widgets import DateTimeInput
+from django.http import (
+    Http404,
+    HttpResponse,
+    HttpResponseRedirect,
+    JsonResponse,
+    StreamingHttpResponse,
+)
+from django.shortcuts import get_object_or_404
 from django.urls import reverse
+from django.utils.http import urlencode
 from django.views import generic
 
-from .models import RSVP, Event
-from .secret_utils import secret_is_correct
+from planner.sessions import STABLE_KEY
+
+from . import api, ical, live, ownership, page_cache, rsvp_io, write_buffer
+from .forms import RSVPForm, RSVPImportForm
+from .freshness import Freshness, event_freshness, not_modified, set_validators
+from .models import RSVP, CalendarFeed, Event
+from .paginators import page_after
+
+RSVPS_PER_PAGE = 50
+"""How many RSVPs to show at a time. The rest of a big event's RSVPs are
+loaded a page at a time from EventRSVPListView."""
 
-UUID_36_REGEX = r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}"
+
+def next_rsvps_url(event_id, cursor: Optional[str]) -> Optional[str]:
+    """Get the URL for the next page of an event's RSVPs, if there is one."""
+    if cursor is None:
+        return None
+    url = reverse("events:rsvps", kwargs={"pk": event_id})
+    return f"{url}?{urlencode({'after': cursor})}"
 
 
 class CreateOrUpdateView(generic.UpdateView):
@@ -28,7 +61,7 @@ class CreateOrUpdateView(generic.UpdateView):
         # Now that we have the object, we should confirm they're allowed to
         # update it via the secret param.
         secret = self.request.GET.get("secret")
-        if secret == object.secret():
+        if object.secret_is_correct(secret):
             return object
         else:
             raise PermissionDenied
@@ -38,46 +71,125 @@ class EventDetailView(generic.DetailView):
     model = Event
     template_name = "events/event/detail.html"
 
+    def get(self, request, *args, **kwargs):
+        """Serve the page from the cache unless it's personalized for this user.
+        Either way, answer with a 304 if the client's ETag is still current.
+        There's no Last-Modified, since deleting an RSVP doesn't change it."""
+        if not self.has_session_for_event():
+            freshness, content = page_cache.get_or_build(self.kwargs["pk"], self.render_page)
+            response = not_modified(request, freshness) or HttpResponse(content)
+            return set_validators(response, freshness)
+
+        freshness = self.get_freshness()
+        response = not_modified(request, freshness) or super().get(request, *args, **kwargs)
+        return set_validators(response, freshness)
+
+    def render_page(self) -> Tuple[Freshness, bytes]:
+        """Render the page for someone who doesn't own the event or any RSVPs,
+        along with its validators."""
+        freshness = self.get_freshness()
+        self.object = self.get_object()
+        context = self.get_context_data(object=self.object)
+        return freshness, self.render_to_response(context).render().content
+
+    def get_freshness(self) -> Freshness:
+        """Get the validators for the event, which vary with what the session
+        owns so that a personalized page is never served to somebody else.
+        They're kept on the view since they also know how many RSVPs there are."""
+        entry = ownership.get(self.request.session, self.kwargs["pk"])
+        variant = f"{settings.RELEASE}|{json.dumps(entry, sort_keys=True)}"
+        freshness = event_freshness([self.kwargs["pk"]], variant=variant)
+        if freshness is None:
+            raise Http404("No event found")
+        self.freshness = freshness
+        return freshness
+
+    def has_session_for_event(self) -> bool:
+        """Determine if the session owns anything for this event, in which case
+        the page might need to be personalized."""
+        return ownership.get(self.request.session, self.kwargs["pk"]) is not None
+
     def is_event_owner(self) -> bool:
         """Determine, based on the session, if the user is the owner of the event."""
-        return self.object.secret() == self.request.session.get(f"{self.object.id}_event_secret")
+        return ownership.is_owner(self.request.session, self.object.id)
 
     def owned_rsvp_ids(self) -> List[str]:
         """Return the RSVP IDs for the user and confirm they own them by
         checking the secret. A user should only have one of these but..."""
-        rsvp_ids = []
-        for key, rsvp_secret in self.request.session.items():
-            if not re.match(f"^{UUID_36_REGEX}_{UUID_36_REGEX}_rsvp_secret$", key):
-                continue
-            event_id, rsvp_id, _ = key.split("_", maxsplit=2)
-            if event_id == str(self.object.id) and secret_is_correct(rsvp_id, rsvp_secret):
-                rsvp_ids.append(rsvp_id)
-        return rsvp_ids
-
-    def is_rsvped(self) -> bool:
-        """Determine if the user owns an active RSVP."""
+        return ownership.owned_rsvp_ids(self.request.session, self.object.id)
+
+    def own_rsvps(self, shown: List[RSVP], has_more: bool) -> List[RSVP]:
+        """Get the user's active RSVPs to the event. Only looks past the RSVPs
+        already being shown if there are more than fit on the page."""
+        rsvp_ids = set(ownership.rsvp_ids(self.request.session, self.object.id))
+        own = [rsvp for rsvp in shown if str(rsvp.id) in rsvp_ids]
+        missing = rsvp_ids.difference(str(rsvp.id) for rsvp in own)
+        if missing and has_more:
+            own += self.object.rsvp_set.filter(pk__in=missing)
+        return own
+
+    def get_context_data(self, *args, **kwargs):
+        if not self.object.rendered_hash:
+            # Saved before the rendered fields existed, and not backfilled yet
+            # by `manage.py render_events`.
+            self.object.render()
+        context = super(EventDetailView, self).get_context_data(*args, **kwargs)
+        # Only the first page of RSVPs goes on the page, the rest are loaded
+        # as the user asks for them.
+        rsvps, cursor = page_after(self.object.rsvp_set.all(), None, RSVPS_PER_PAGE)
+        own_rsvps = self.own_rsvps(rsvps, has_more=cursor is not None)
         owned_rsvp_ids = self.owned_rsvp_ids()
-        all_rsvp_ids = [str(rsvp.id) for rsvp in self.object.rsvp_set.all()]
+        context["rsvps"] = rsvps
+        context["rsvp_count"] = self.freshness.rsvp_count
+        context["next_rsvps_url"] = next_rsvps_url(self.object.id, cursor)
+        context["is_event_owner"] = self.is_event_owner()
+        context["owned_rsvp_ids"] = owned_rsvp_ids
+        context["is_rsvped"] = bool(own_rsvps)
+        context["live_updates"] = settings.LIVE_UPDATES
+        # RSVPs the user can edit that aren't on the first page are shown
+        # separately so they don't have to go looking for them.
+        shown = {rsvp.id for rsvp in rsvps}
+        context["hidden_owned_rsvps"] = [
+            rsvp for rsvp in own_rsvps if rsvp.id not in shown and str(rsvp.id) in owned_rsvp_ids
+        ]
+        return context
 
-        # New method for checking if the user has an active RSVP.
-        for rsvp_id in all_rsvp_ids:
-            if rsvp_id in owned_rsvp_ids:
-                return True
 
-        # For backwards compatibility with the old method.
-        if self.request.session.get(str(self.object.id)) in all_rsvp_ids:
-            return True
+class EventRSVPListView(generic.TemplateView):
+    """A page of an event's RSVPs after a cursor, as list items to be added to
+    the list on the detail page."""
 
-        return False
+    template_name = "events/rsvp/list.html"
 
     def get_context_data(self, *args, **kwargs):
-        context = super(EventDetailView, self).get_context_data(*args, **kwargs)
-        context["is_event_owner"] = self.is_event_owner()
-        context["owned_rsvp_ids"] = self.owned_rsvp_ids()
-        context["is_rsvped"] = self.is_rsvped()
+        context = super().get_context_data(*args, **kwargs)
+        event_id = self.kwargs["pk"]
+        try:
+            rsvps, cursor = page_after(
+                RSVP.objects.filter(event_id=event_id),
+                self.request.GET.get("after"),
+                RSVPS_PER_PAGE,
+            )
+        except InvalidPage:
+            raise Http404("Invalid cursor")
+        context["rsvps"] = rsvps
+        context["owned_rsvp_ids"] = ownership.owned_rsvp_ids(self.request.session, event_id)
+        context["next_rsvps_url"] = next_rsvps_url(event_id, cursor)
         return context
 
 
+async def rsvp_stream(request, pk):
+    """Stream changes to an event's RSVPs as Server-Sent Events. Written as a
+    coroutine so an open stream doesn't hold on to a thread."""
+    if not settings.LIVE_UPDATES or not isinstance(request, ASGIRequest):
+        # WSGI servers would have to give every open stream a thread of its
+        # own. A 204 tells the browser to stop trying.
+        return HttpResponse(status=204)
+    if not await sync_to_async(Event.objects.filter(pk=pk).exists)():
+        raise Http404("No event found")
+    return live.EventStreamResponse(live.stream(pk))
+
+
 class CreateUpdateEventView(CreateOrUpdateView):
     model = Event
     fields = "__all__"
@@ -98,7 +210,7 @@ class CreateUpdateEventView(CreateOrUpdateView):
     def set_event_owner(self) -> None:
         """Set the secret for the event to the session. This way we can confirm
         that the user is the owner of the event later."""
-        self.request.session[f"{self.object.id}_event_secret"] = self.object.secret()
+        ownership.set_owner(self.request.session, self.object.id, self.object.secret())
 
     def get_success_url(self):
         """Set that this event was created by this user and redirect to the event detail page."""
@@ -114,7 +226,7 @@ class DeleteEventView(generic.DeleteView):
     def get_object(self, queryset=None):
         object = super().get_object(queryset)
         # Confirm they're allowed to delete the object via the "secret" param.
-        if self.request.GET.get("secret") == object.secret():
+        if object.secret_is_correct(self.request.GET.get("secret")):
             return object
         else:
             raise PermissionDenied
@@ -122,27 +234,56 @@ class DeleteEventView(generic.DeleteView):
 
 class CreateUpdateRSVPView(CreateOrUpdateView):
     model = RSVP
-    fields = ["name"]
+    form_class = RSVPForm
     template_name = "events/rsvp/create_update.html"
 
     def form_valid(self, form):
         form.instance.event_id = self.kwargs["event_id"]
-        return super().form_valid(form)
+        key = form.instance.idempotency_key
+        if self.object is not None or not key:
+            return super().form_valid(form)
+
+        if settings.RSVP_WRITE_COALESCING:
+            # An RSVP for an event that doesn't exist would fail everyone else's
+            # RSVPs in the same batch, so turn it away before it's queued.
+            if not Event.objects.filter(pk=form.instance.event_id).exists():
+                raise Http404("No event found")
+            self.object = form.save(commit=False)
+            self.object.id = write_buffer.add(self.object)
+            return HttpResponseRedirect(self.get_success_url())
+
+        try:
+            with transaction.atomic():
+                return super().form_valid(form)
+        except IntegrityError:
+            # The form was already submitted, so carry on as if this was that
+            # submission. If it wasn't, the event must have been deleted.
+            self.object = get_object_or_404(
+                RSVP, event_id=form.instance.event_id, idempotency_key=key
+            )
+            return HttpResponseRedirect(self.get_success_url())
 
     def set_rsvp_owner(self) -> None:
         """Store the rsvp_id in the session with the event_id and secret so we know we've RSVP'd."""
-        event_id = self.kwargs["event_id"]
-        rsvp_id = self.object.id
-        self.request.session[f"{event_id}_{rsvp_id}_rsvp_secret"] = self.object.secret()
+        ownership.add_rsvp(
+            self.request.session, self.kwargs["event_id"], self.object.id, self.object.secret()
+        )
 
     def get_success_url(self):
         """Set that this event was RSVP'd by this user and redirect to the event detail page."""
         self.set_rsvp_owner()
         return reverse("events:detail", kwargs={"pk": self.kwargs["event_id"]})
 
+    def get_queryset(self):
+        return super().get_queryset().select_related("event")
+
     def get_context_data(self, *args, **kwargs):
         context = super(CreateUpdateRSVPView, self).get_context_data(*args, **kwargs)
-        context["event"] = Event.objects.get(pk=self.kwargs["event_id"])
+        if self.object:
+            # The event was already joined in when we looked up the RSVP.
+            context["event"] = self.object.event
+        else:
+            context["event"] = Event.objects.get(pk=self.kwargs["event_id"])
         return context
 
 
@@ -153,7 +294,7 @@ class DeleteRSVPView(generic.DeleteView):
     def get_object(self, queryset=None):
         object = super().get_object(queryset)
         # Confirm they're allowed to delete the object via the "secret" param.
-        if self.request.GET.get("secret") == object.secret():
+        if object.secret_is_correct(self.request.GET.get("secret")):
             return object
         else:
             raise PermissionDenied
@@ -161,7 +302,179 @@ class DeleteRSVPView(generic.DeleteView):
     def get_success_url(self):
         return reverse("events:detail", kwargs={"pk": self.kwargs["event_id"]})
 
+    def get_queryset(self):
+        return super().get_queryset().select_related("event")
+
     def get_context_data(self, *args, **kwargs):
         context = super(DeleteRSVPView, self).get_context_data(*args, **kwargs)
-        context["event"] = Event.objects.get(pk=self.kwargs["event_id"])
+        # The event was already joined in when we looked up the RSVP.
+        context["event"] = self.object.event
         return context
+
+
+class EventOwnerMixin:
+    """Only lets in the event's owner, checked via the "secret" param the same
+    way as CreateOrUpdateView."""
+
+    def dispatch(self, request, *args, **kwargs):
+        self.event = get_object_or_404(Event, pk=self.kwargs["pk"])
+        if not self.event.secret_is_correct(request.GET.get("secret")):
+            raise PermissionDenied
+        return super().dispatch(request, *args, **kwargs)
+
+
+class ExportRSVPsView(EventOwnerMixin, generic.View):
+    """Stream the event's guest list as CSV or JSON lines."""
+
+    def get(self, request, *args, **kwargs):
+        format = self.kwargs["format"]
+        if format not in rsvp_io.EXPORTERS:
+            raise Http404("Unknown format")
+        lines = rsvp_io.EXPORTERS[format](self.event)
+        response = StreamingHttpResponse(lines, content_type=rsvp_io.FORMATS[format])
+        response["Content-Disposition"] = f'attachment; filename="smol-party-rsvps.{format}"'
+        return response
+
+
+class ImportRSVPsView(EventOwnerMixin, generic.FormView):
+    """Add RSVPs to the event in bulk from an uploaded file."""
+
+    form_class = RSVPImportForm
+    template_name = "events/rsvp/import.html"
+
+    def form_valid(self, form):
+        form.import_into(self.event)
+        if form.errors:
+            return self.form_invalid(form)
+        return super().form_valid(form)
+
+    def get_success_url(self):
+        return reverse("events:detail", kwargs={"pk": self.event.id})
+
+    def get_context_data(self, *args, **kwargs):
+        context = super().get_context_data(*args, **kwargs)
+        context["event"] = self.event
+        return context
+
+
+class EventAPIView(generic.View):
+    """A single event as JSON. Pick what to include with ?fields=title,rsvps."""
+
+    many = False
+
+    def get_event_ids(self) -> List[UUID]:
+        return [self.kwargs["pk"]]
+
+    def get(self, request, *args, **kwargs):
+        try:
+            fields = api.parse_fields(request.GET.get("fields"))
+            event_ids = self.get_event_ids()
+        except ValueError as e:
+            return JsonResponse({"error": str(e)}, status=400)
+
+        freshness = event_freshness(event_ids, variant=f"api|{','.join(fields)}")
+        if freshness is None:
+            return self.not_found()
+        response = not_modified(request, freshness)
+        if response is None:
+            events = api.serialize_events(event_ids, fields)
+            if not events:
+                return self.not_found()
+            response = JsonResponse({"events": events} if self.many else events[0])
+        return set_validators(response, freshness)
+
+    def not_found(self) -> JsonResponse:
+        if self.many:
+            return JsonResponse({"events": []})
+        return JsonResponse({"error": "No event found"}, status=404)
+
+
+class EventBatchAPIView(EventAPIView):
+    """Up to 100 events as JSON, from ?ids=<id>,<id>,... Events that don't
+    exist are left out."""
+
+    many = True
+
+    def get_event_ids(self) -> List[UUID]:
+        return api.parse_ids(self.request.GET.get("ids"))
+
+
+class CalendarView(generic.View, metaclass=abc.ABCMeta):
+    """Base view for streaming events as an iCalendar file."""
+
+    calendar_name = "Smol Party"
+    allow_empty = False
+    """Whether to send a calendar without any events in it rather than a 404."""
+
+    @abc.abstractmethod
+    def get_event_ids(self) -> List[str]:
+        """The ids of the events to put in the calendar."""
+
+    def get(self, request, *args, **kwargs):
+        event_ids = self.get_event_ids()
+        freshness = event_freshness(event_ids, variant="ics", allow_empty=self.allow_empty)
+        if freshness is None:
+            raise Http404("No events found")
+
+        # Calendar apps poll often, so most of the time this is all we need to do.
+        response = not_modified(request, freshness)
+        if response is None:
+            events = Event.objects.filter(pk__in=event_ids).order_by("start_time").iterator()
+            lines = ical.calendar(events, self.event_url, name=self.calendar_name)
+            response = StreamingHttpResponse(lines, content_type="text/calendar; charset=utf-8")
+            response["Content-Disposition"] = 'inline; filename="smol-party.ics"'
+        return set_validators(response, freshness)
+
+    def event_url(self, event: Event) -> str:
+        return self.request.build_absolute_uri(reverse("events:detail", kwargs={"pk": event.id}))
+
+
+class EventCalendarView(CalendarView):
+    """A single event as an iCalendar file, for adding it to a calendar app."""
+
+    def get_event_ids(self) -> List[str]:
+        return [self.kwargs["pk"]]
+
+
+class CalendarFeedView(CalendarView):
+    """A subscribable feed of the events a session owns or has RSVP'd to.
+    It's never a 404 just for being empty, since calendar apps drop feeds that
+    stop working."""
+
+    calendar_name = "My Smol Parties"
+    allow_empty = True
+
+    def get_event_ids(self) -> List[str]:
+        feed = get_object_or_404(CalendarFeed, pk=self.kwargs["pk"])
+        session = import_module(settings.SESSION_ENGINE).SessionStore(session_key=feed.session_key)
+        owned = ownership.owned_event_ids(session)
+        rsvped = ownership.all_rsvp_ids(session)
+        if not owned and not rsvped:
+            return []
+        # Only count RSVPs that still exist.
+        events = Event.objects.filter(Q(pk__in=owned) | Q(rsvp__in=rsvped))
+        return [str(event_id) for event_id in events.values_list("id", flat=True).distinct()]
+
+
+class HttpResponseWebcalRedirect(HttpResponseRedirect):
+    """A redirect to a webcal:// URL, which tells the browser to hand the feed
+    to a calendar app as a subscription."""
+
+    allowed_schemes = ["webcal"]
+
+
+class SubscribeCalendarView(generic.View):
+    """Get (or make) the calendar feed for this session and send the user's
+    calendar app to it."""
+
+    def get(self, request, *args, **kwargs):
+        if not request.session.session_key:
+            raise Http404("Nothing to subscribe to yet")
+        # The feed finds the session by its key, so it can't be one that changes
+        # every time the session is saved.
+        if STABLE_KEY not in request.session:
+            request.session[STABLE_KEY] = True
+            request.session.save()
+        feed, _ = CalendarFeed.objects.get_or_create(session_key=request.session.session_key)
+        url = request.build_absolute_uri(reverse("events:calendar_feed", kwargs={"pk": feed.id}))
+        return HttpResponseWebcalRedirect("webcal://" + url.split("://", 1)[1])
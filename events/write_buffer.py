@@ -0,0 +1,123 @@
+"""Coalescing bursts of new RSVPs into batched inserts.
+
+When RSVP_WRITE_COALESCING is on, the RSVP view hands new RSVPs to `add`
+rather than saving them itself. The first request to arrive waits
+RSVP_COALESCE_WINDOW seconds for others to join it, then writes everything that
+has queued up with one `bulk_create`. Every request blocks until the batch with
+its RSVP has been committed, so a guest is never redirected to an event page
+that doesn't show their RSVP yet.
+
+Duplicate submissions (same event and idempotency key) are dropped by the
+database's unique constraint. `add` returns the id of the RSVP that actually
+got stored, which for a duplicate is the one from the first submission. If a
+batch can't be stored, its RSVPs are retried one at a time, so only the ones
+that can't be stored fail.
+"""
+import threading
+import time
+from concurrent.futures import Future
+from typing import Dict, List, Tuple
+from uuid import UUID
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+
+from . import live, page_cache
+from .models import RSVP
+
+WAIT_TIMEOUT = 30
+"""How long, in seconds, a request will wait for its batch to be written."""
+
+_lock = threading.Lock()
+_pending: List[Tuple[RSVP, Future]] = []
+
+
+def add(rsvp: RSVP) -> UUID:
+    """Queue the RSVP to be inserted and wait until it has been. Returns the
+    id of the stored RSVP. Raises whatever the insert raised if it failed."""
+    future, queued = _queue(rsvp)
+    if queued >= settings.RSVP_COALESCE_MAX_BATCH:
+        flush()
+    elif queued == 1:
+        time.sleep(settings.RSVP_COALESCE_WINDOW)
+        flush()
+    return future.result(timeout=WAIT_TIMEOUT)
+
+
+def submit(rsvp: RSVP) -> Future:
+    """Queue the RSVP to be inserted by the next `flush`, without waiting for
+    it. The future gets what `add` would have returned or raised."""
+    future, _ = _queue(rsvp)
+    return future
+
+
+def _queue(rsvp: RSVP) -> Tuple[Future, int]:
+    """Queue the RSVP, returning its future and how many RSVPs are queued."""
+    future: Future = Future()
+    with _lock:
+        _pending.append((rsvp, future))
+        return future, len(_pending)
+
+
+def flush() -> None:
+    """Write everything that's queued up."""
+    with _lock:
+        batch = _pending[:]
+        del _pending[:]
+    if not batch:
+        return
+
+    try:
+        stored_ids = _write([rsvp for rsvp, _ in batch])
+    except IntegrityError:
+        # Something in the batch can't be stored, e.g. its event was deleted
+        # while it was queued. Write them one at a time so only that one fails.
+        for rsvp, future in batch:
+            _write_one(rsvp, future)
+        return
+    except Exception as e:
+        for _, future in batch:
+            future.set_exception(e)
+        return
+    for rsvp, future in batch:
+        future.set_result(stored_ids.get((rsvp.event_id, rsvp.idempotency_key), rsvp.id))
+
+
+def _write_one(rsvp: RSVP, future: Future) -> None:
+    try:
+        stored_ids = _write([rsvp])
+    except Exception as e:
+        future.set_exception(e)
+    else:
+        future.set_result(stored_ids.get((rsvp.event_id, rsvp.idempotency_key), rsvp.id))
+
+
+def _write(rsvps: List[RSVP]) -> Dict[Tuple[UUID, UUID], UUID]:
+    """Insert the RSVPs, skipping duplicates, and return the stored ids of the
+    ones that had an idempotency key, keyed by event and key."""
+    keyed = [rsvp for rsvp in rsvps if rsvp.idempotency_key]
+    stored_ids = {}
+    with transaction.atomic():
+        RSVP.objects.bulk_create(rsvps, ignore_conflicts=True)
+        if keyed:
+            stored = RSVP.objects.filter(
+                event_id__in={rsvp.event_id for rsvp in keyed},
+                idempotency_key__in=[rsvp.idempotency_key for rsvp in keyed],
+            ).values_list("event_id", "idempotency_key", "id")
+            stored_ids = {(event_id, key): rsvp_id for event_id, key, rsvp_id in stored}
+        # bulk_create doesn't send post_save, so signals.py never hears about
+        # these. Duplicates weren't stored, so there's nothing to announce.
+        created = [
+            rsvp
+            for rsvp in rsvps
+            if stored_ids.get((rsvp.event_id, rsvp.idempotency_key), rsvp.id) == rsvp.id
+        ]
+        transaction.on_commit(lambda: _announce(created))
+    return stored_ids
+
+
+def _announce(rsvps: List[RSVP]) -> None:
+    for event_id in {rsvp.event_id for rsvp in rsvps}:
+        page_cache.bump_version(event_id)
+    for rsvp in rsvps:
+        live.hub.publish(rsvp.event_id, live.rsvp_message("created", rsvp))
@@ -0,0 +1,9 @@
+"""The admin's URLs. They're in a module of their own so that the admin, and
+the admin.py of every app, are loaded along with the URLconf, on the first
+request (or App Engine's warmup request), rather than by django.setup()."""
+from django.contrib import admin
+
+admin.autodiscover()
+
+app_name = "admin"
+urlpatterns = admin.site.get_urls()
@@ -0,0 +1,9 @@
+from django.apps import AppConfig
+
+
+class PlannerConfig(AppConfig):
+    name = "planner"
+
+    def ready(self):
+        # Put the query timer on every database connection as it's opened.
+        from . import metrics  # noqa: F401
@@ -9,8 +9,12 @@ https://docs.djangoproject.com/en/3.2/howto/deployment/asgi/
 
 import os
 
-from django.core.asgi import get_asgi_application
+import django
+
+from planner.handlers import ThreadPoolASGIHandler
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "planner.settings")
 
-application = get_asgi_application()
+# The same as get_asgi_application(), but with our handler. See planner/handlers.py.
+django.setup(set_prefix=False)
+application = ThreadPoolASGIHandler()
@@ -0,0 +1,114 @@
+"""Loading the production settings payload without slowing down startup.
+
+In production the settings (SECRET_KEY, DATABASE_URL, ...) come from a secret
+in Secret Manager. Fetching it means importing the Secret Manager client, which
+is slow to import, and a network round trip, both on every process start. So
+the payload is cached in a local file for SETTINGS_CACHE_TTL seconds, and the
+client is only imported when the cache can't be used.
+
+Where the payload comes from can be swapped out by pointing SETTINGS_PROVIDER
+at any callable that takes the secret's name and returns the payload, e.g.
+"planner.bootstrap.file_provider" to read it from SETTINGS_PAYLOAD_FILE.
+
+This runs while settings are being imported, so it can only use the standard
+library and Django helpers that don't need settings.
+"""
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+from typing import Callable, Optional
+
+from django.utils.module_loading import import_string
+
+Provider = Callable[[str], str]
+
+DEFAULT_CACHE_PATH = os.path.join(tempfile.gettempdir(), "smolparty-settings.json")
+DEFAULT_CACHE_TTL = 300
+
+logger = logging.getLogger(__name__)
+
+
+def secret_manager_provider(name: str) -> str:
+    """Fetch the payload from Secret Manager."""
+    from google.cloud import secretmanager
+
+    client = secretmanager.SecretManagerServiceClient()
+    return client.access_secret_version(name=name).payload.data.decode("UTF-8")
+
+
+def file_provider(name: str) -> str:
+    """Read the payload from the file named by SETTINGS_PAYLOAD_FILE, for
+    running production settings without the live service."""
+    with open(os.environ["SETTINGS_PAYLOAD_FILE"], encoding="utf-8") as file:
+        return file.read()
+
+
+def get_provider() -> Provider:
+    path = os.environ.get("SETTINGS_PROVIDER")
+    return import_string(path) if path else secret_manager_provider
+
+
+def digest(name: str, payload: str) -> str:
+    return hashlib.sha256(f"{name}\n{payload}".encode("utf-8")).hexdigest()
+
+
+def read_cache(path: str, name: str, ttl: float) -> Optional[str]:
+    """Return the cached payload for the secret, or None if there isn't one,
+    it's older than `ttl` seconds, or it doesn't match its checksum."""
+    try:
+        with open(path, encoding="utf-8") as file:
+            entry = json.load(file)
+        if entry["name"] != name or time.time() - entry["fetched_at"] > ttl:
+            return None
+        if entry["sha256"] != digest(name, entry["payload"]):
+            logger.warning("Ignoring the settings cache in %s, it's corrupt", path)
+            return None
+        return entry["payload"]
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def write_cache(path: str, name: str, payload: str) -> None:
+    """Cache the payload, readable only by us since it's full of secrets. It's
+    written to a temporary file and moved into place so that other processes
+    starting at the same time never see half of it."""
+    entry = {
+        "name": name,
+        "fetched_at": time.time(),
+        "sha256": digest(name, payload),
+        "payload": payload,
+    }
+    try:
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".", prefix=".settings-")
+        with os.fdopen(fd, "w", encoding="utf-8") as file:
+            json.dump(entry, file)
+        os.replace(temp_path, path)
+    except OSError:
+        # Not being able to cache only makes the next start slower.
+        logger.warning("Couldn't cache the settings in %s", path, exc_info=True)
+
+
+def load_settings_payload(
+    name: str,
+    provider: Optional[Provider] = None,
+    cache_path: Optional[str] = None,
+    ttl: Optional[float] = None,
+) -> str:
+    """Get the settings payload for the secret called `name`, from the cache if
+    it's fresh and from `provider` (SETTINGS_PROVIDER by default) if not.
+    An empty `cache_path` or a `ttl` of 0 turns the cache off."""
+    if cache_path is None:
+        cache_path = os.environ.get("SETTINGS_CACHE_PATH", DEFAULT_CACHE_PATH)
+    if ttl is None:
+        ttl = float(os.environ.get("SETTINGS_CACHE_TTL", DEFAULT_CACHE_TTL))
+    if not cache_path or ttl <= 0:
+        return (provider or get_provider())(name)
+
+    payload = read_cache(cache_path, name, ttl)
+    if payload is None:
+        payload = (provider or get_provider())(name)
+        write_cache(cache_path, name, payload)
+    return payload
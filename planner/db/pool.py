@@ -0,0 +1,140 @@
+"""A thread-safe pool of raw database connections."""
+import threading
+import time
+from collections import deque
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Deque, Dict, Optional
+
+
+class PoolTimeout(Exception):
+    """No connection became free within the pool's timeout."""
+
+
+@dataclass
+class PoolStats:
+    checkouts: int = 0
+    """Connections handed out, new or reused."""
+    waits: int = 0
+    """Checkouts that had to wait for another thread to give a connection back."""
+    wait_seconds: float = 0.0
+    """Total time spent waiting."""
+    timeouts: int = 0
+    connects: int = 0
+    """New connections opened."""
+    discards: int = 0
+    """Connections closed because they were broken or beyond the pool's size."""
+
+
+class ConnectionPool:
+    """Keeps up to `size` idle connections open for reuse, and lets up to
+    `max_overflow` more be opened when they're all in use. Past that,
+    `checkout` waits up to `timeout` seconds for one to be given back.
+
+    If `validate` is given, idle connections are passed to it before they're
+    reused and are thrown away if it returns False.
+    """
+
+    def __init__(
+        self,
+        size: int,
+        max_overflow: int = 0,
+        timeout: float = 30.0,
+        validate: Optional[Callable[[Any], bool]] = None,
+    ):
+        self.size = size
+        self.max_overflow = max_overflow
+        self.timeout = timeout
+        self.validate = validate
+        self.stats = PoolStats()
+        self._idle: Deque[Any] = deque()
+        self._open = 0
+        self._condition = threading.Condition()
+
+    def checkout(self, connect: Callable[[], Any]) -> Any:
+        """Get a connection, reusing an idle one if there is one and calling
+        `connect` to open a new one if not."""
+        deadline = time.monotonic() + self.timeout
+        while True:
+            connection = self._reserve(deadline)
+            if connection is None:
+                try:
+                    connection = connect()
+                except BaseException:
+                    self._release()
+                    raise
+                with self._condition:
+                    self.stats.checkouts += 1
+                    self.stats.connects += 1
+                return connection
+            if self.validate is None or self.validate(connection):
+                with self._condition:
+                    self.stats.checkouts += 1
+                return connection
+            self.discard(connection)
+
+    def _reserve(self, deadline: float) -> Optional[Any]:
+        """Take an idle connection, or make room for a new one and return None."""
+        with self._condition:
+            started = time.monotonic()
+            waited = False
+            while not self._idle and self._open >= self.size + self.max_overflow:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.stats.timeouts += 1
+                    raise PoolTimeout(
+                        f"No database connection was free after {self.timeout} seconds"
+                    )
+                waited = True
+                self._condition.wait(remaining)
+            if waited:
+                self.stats.waits += 1
+                self.stats.wait_seconds += time.monotonic() - started
+            # Take the most recently used connection, so the extra ones opened
+            # during a burst sit idle and get closed first.
+            if self._idle:
+                return self._idle.pop()
+            self._open += 1
+            return None
+
+    def checkin(self, connection: Any) -> None:
+        """Give back a connection that's ready to be reused."""
+        with self._condition:
+            if len(self._idle) < self.size:
+                self._idle.append(connection)
+                self._condition.notify()
+                return
+        self.discard(connection)
+
+    def discard(self, connection: Any) -> None:
+        """Close a checked out connection instead of giving it back."""
+        try:
+            connection.close()
+        except Exception:
+            pass
+        with self._condition:
+            self.stats.discards += 1
+        self._release()
+
+    def _release(self) -> None:
+        with self._condition:
+            self._open -= 1
+            self._condition.notify()
+
+    def close_idle(self) -> None:
+        """Close every connection that isn't checked out."""
+        with self._condition:
+            idle = list(self._idle)
+            self._idle.clear()
+        for connection in idle:
+            self.discard(connection)
+
+    def metrics(self) -> Dict[str, Any]:
+        """The counters from `stats`, plus how many connections are open, idle
+        and in use right now."""
+        with self._condition:
+            return {
+                **asdict(self.stats),
+                "open": self._open,
+                "idle": len(self._idle),
+                "in_use": self._open - len(self._idle),
+            }
@@ -0,0 +1,130 @@
+"""Connection health checks and pooling for Django database backends.
+
+Django 3.2 opens a new connection for every request unless CONN_MAX_AGE is set,
+and has no health checks for the connections it keeps (CONN_HEALTH_CHECKS only
+arrived in Django 4.1). `PooledDatabaseWrapperMixin` adds both, configured
+with two extra keys in a DATABASES entry:
+
+    "HEALTH_CHECKS": True,
+    "POOL": {"SIZE": 5, "MAX_OVERFLOW": 5, "TIMEOUT": 10},
+
+With HEALTH_CHECKS, a connection that's being reused is pinged before its
+first query in a request and replaced if it's gone away. With a POOL, closing
+a connection gives it back to a pool shared by every thread in the process.
+The next connection any thread opens takes it from there instead of opening a
+new one. That caps how many connections a process holds open however many
+threads it runs, which matters for the ASGI handler, where every request has a
+thread of its own.
+
+The pool is experimental. It's only been tested with stand-in connections, not
+against a real PostgreSQL server, so it stays off unless DB_POOL_SIZE is set.
+"""
+import threading
+from functools import partial
+from typing import Any, Dict, Optional
+
+from django.db import DEFAULT_DB_ALIAS
+
+from .pool import ConnectionPool, PoolTimeout
+
+_pools: Dict[str, ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def pool_metrics() -> Dict[str, Dict[str, Any]]:
+    """The metrics for each database's pool, keyed by alias."""
+    with _pools_lock:
+        pools = dict(_pools)
+    return {alias: pool.metrics() for alias, pool in pools.items()}
+
+
+class PooledDatabaseWrapperMixin:
+    """Adds HEALTH_CHECKS and POOL to a DatabaseWrapper. See the module docstring."""
+
+    # Provided by the DatabaseWrapper this is mixed into.
+    alias: str
+    Database: Any
+
+    def __init__(self, settings_dict, alias=DEFAULT_DB_ALIAS):
+        super().__init__(settings_dict, alias)
+        self.health_check_enabled = settings_dict.get("HEALTH_CHECKS", False)
+        self.health_check_done = False
+        self.pool_options = settings_dict.get("POOL") or {}
+
+    @property
+    def pool(self) -> Optional[ConnectionPool]:
+        """The pool this database's connections come from, once one's been opened."""
+        return _pools.get(self.alias)
+
+    def get_pool(self) -> ConnectionPool:
+        with _pools_lock:
+            if self.alias not in _pools:
+                _pools[self.alias] = ConnectionPool(
+                    size=self.pool_options["SIZE"],
+                    max_overflow=self.pool_options.get("MAX_OVERFLOW", 0),
+                    timeout=self.pool_options.get("TIMEOUT", 30),
+                    validate=self.ping if self.health_check_enabled else None,
+                )
+            return _pools[self.alias]
+
+    def get_new_connection(self, conn_params):
+        if not self.pool_options.get("SIZE"):
+            return super().get_new_connection(conn_params)
+        try:
+            return self.get_pool().checkout(partial(super().get_new_connection, conn_params))
+        except PoolTimeout as e:
+            raise self.Database.OperationalError(str(e)) from e
+
+    def _close(self):
+        pool = self.pool
+        if pool is None or self.connection is None:
+            return super()._close()
+        # Inside an atomic block Django keeps the connection around to roll
+        # back later, so it can't be handed to anybody else.
+        if self.in_atomic_block or not self.reset_for_reuse(self.connection):
+            pool.discard(self.connection)
+        else:
+            pool.checkin(self.connection)
+
+    def reset_for_reuse(self, connection) -> bool:
+        """Roll back anything left open on a raw connection, returning False if
+        it's broken."""
+        try:
+            connection.rollback()
+            return True
+        except self.Database.Error:
+            return False
+
+    def ping(self, connection) -> bool:
+        """Check that a raw connection still works."""
+        try:
+            cursor = connection.cursor()
+            try:
+                cursor.execute("SELECT 1")
+            finally:
+                cursor.close()
+            return True
+        except self.Database.Error:
+            return False
+
+    def connect(self):
+        super().connect()
+        # The connection is brand new, or the pool has just pinged it.
+        self.health_check_done = True
+
+    def close_if_unusable_or_obsolete(self):
+        super().close_if_unusable_or_obsolete()
+        # Called as a request starts and ends, so a connection that's kept
+        # gets checked again the next time it's used.
+        self.health_check_done = False
+
+    def close_if_health_check_failed(self):
+        if self.connection is None or not self.health_check_enabled or self.health_check_done:
+            return
+        if not self.ping(self.connection):
+            self.close()
+        self.health_check_done = True
+
+    def _cursor(self, name=None):
+        self.close_if_health_check_failed()
+        return super()._cursor(name)
@@ -0,0 +1,16 @@
+"""Django's PostgreSQL backend with health checks and pooling. Use it with
+ENGINE "planner.db.postgresql". See planner/db/pooling.py."""
+from django.db.backends.postgresql import base
+
+from ..pooling import PooledDatabaseWrapperMixin
+
+
+class DatabaseWrapper(PooledDatabaseWrapperMixin, base.DatabaseWrapper):
+    def get_new_connection(self, conn_params):
+        connection = super().get_new_connection(conn_params)
+        # A connection from the pool could have been opened by another thread's
+        # wrapper, which is where Django would have recorded this.
+        self.isolation_level = self.settings_dict["OPTIONS"].get(
+            "isolation_level", connection.isolation_level
+        )
+        return connection
@@ -0,0 +1,78 @@
+"""Django's SQLite backend, tuned for serving traffic from a single machine.
+Use it with ENGINE "planner.db.sqlite3" and these extra DATABASES keys:
+
+    "PRAGMAS": {"journal_mode": "WAL", "synchronous": "NORMAL", ...},
+    "TRANSACTION_MODE": "IMMEDIATE",
+    "MAINTENANCE_INTERVAL": 300,
+
+PRAGMAS are run, in order, on every new connection. In WAL mode, readers
+don't wait for writers and writers don't wait for readers. busy_timeout makes
+a writer wait for another one to finish instead of failing with "database is
+locked".
+
+TRANSACTION_MODE "IMMEDIATE" starts atomic blocks with BEGIN IMMEDIATE, which
+takes the write lock up front. A plain BEGIN only takes it at the first write,
+so two transactions that read and then write can each be stuck waiting on the
+other. SQLite fails one of them straight away, without waiting out the busy
+timeout. Django's own atomic blocks are all for writing, so taking the lock
+early costs little.
+
+Every MAINTENANCE_INTERVAL seconds, a connection finishing a request runs a
+passive WAL checkpoint and PRAGMA optimize, so the WAL file doesn't keep
+growing and the query planner's statistics stay current.
+"""
+import logging
+import threading
+import time
+from typing import Dict
+
+from django.db import DatabaseError
+from django.db.backends.sqlite3 import base
+
+logger = logging.getLogger(__name__)
+
+_last_maintenance: Dict[str, float] = {}
+_maintenance_lock = threading.Lock()
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    def get_new_connection(self, conn_params):
+        connection = super().get_new_connection(conn_params)
+        for pragma, value in self.settings_dict.get("PRAGMAS", {}).items():
+            connection.execute(f"PRAGMA {pragma} = {value}")
+        return connection
+
+    def _start_transaction_under_autocommit(self):
+        mode = self.settings_dict.get("TRANSACTION_MODE")
+        self.cursor().execute(f"BEGIN {mode}" if mode else "BEGIN")
+
+    def close_if_unusable_or_obsolete(self):
+        # Runs as each request starts and ends, before a connection that's
+        # done with gets closed.
+        if self.connection is not None and not self.in_atomic_block:
+            self.maintain_if_due()
+        super().close_if_unusable_or_obsolete()
+
+    def maintain_if_due(self) -> None:
+        interval = self.settings_dict.get("MAINTENANCE_INTERVAL")
+        if not interval:
+            return
+        name = str(self.settings_dict["NAME"])
+        now = time.monotonic()
+        with _maintenance_lock:
+            last = _last_maintenance.setdefault(name, now)
+            if now - last < interval:
+                return
+            _last_maintenance[name] = now
+        self.maintain()
+
+    def maintain(self) -> None:
+        """Copy what's in the WAL back into the database where it won't block
+        anybody, and let SQLite refresh its statistics."""
+        try:
+            with self.wrap_database_errors:
+                self.connection.execute("PRAGMA wal_checkpoint(PASSIVE)")
+                self.connection.execute("PRAGMA optimize")
+        except DatabaseError:
+            # It'll be tried again next time, there's no reason to fail the request.
+            logger.warning("SQLite maintenance failed", exc_info=True)
@@ -0,0 +1,116 @@
+"""An ASGI handler that serves sync views concurrently.
+
+Django 3.2 has no async ORM, and under its stock ASGI handler every sync view
+and every middleware hop runs in one shared thread. Requests end up queued
+behind each other's database queries, which makes ASGI slower than a threaded
+WSGI server. `manage.py benchmark concurrency` shows the difference.
+
+This handler gives every request a thread of its own for its sync code, the way
+Django 4 does, so one slow query doesn't hold up every other request. Each
+thread opens its own database connection, which costs more than it saves when
+every query is as quick as SQLite's, so the benchmark can show it behind the
+stock handler. Views written as coroutines don't need a thread at all. They can
+answer with a response that streams from an async iterator, like the live RSVP
+updates in events/live.py, which stops as soon as the client goes away.
+"""
+import asyncio
+from contextvars import ContextVar
+
+from asgiref.sync import ThreadSensitiveContext, sync_to_async
+from django.core.handlers.asgi import ASGIHandler
+from django.db import connections
+
+# The ASGI receive callable for the request being handled, so send_response
+# can tell when the client disconnects.
+_receive: ContextVar = ContextVar("receive")
+
+
+class StatusAndHeaders:
+    """Stands in for a streaming response, so that Django's send_response only
+    sends its status and headers."""
+
+    streaming = True
+
+    def __init__(self, response):
+        self.status_code = response.status_code
+        self.cookies = response.cookies
+        self.items = response.items
+
+    def __iter__(self):
+        return iter(())
+
+    def close(self):
+        pass
+
+
+class ThreadPoolASGIHandler(ASGIHandler):
+    async def __call__(self, scope, receive, send):
+        _receive.set(receive)
+        async with ThreadSensitiveContext():
+            try:
+                await super().__call__(scope, receive, send)
+            finally:
+                # The request's thread goes away with it, so its connections
+                # have to be closed (or given back to the pool) now.
+                await sync_to_async(connections.close_all)()
+
+    async def send_response(self, response, send):
+        if not response.streaming:
+            return await super().send_response(response, send)
+
+        # Django 3.2 reads streaming responses on the event loop, where they
+        # can't run queries, like the calendar feeds and the RSVP export do. It
+        # can't read async ones at all. So Django only sends the status and
+        # headers, and the body is sent from here.
+        async def send_start(message):
+            if message["type"] == "http.response.start":
+                await send(message)
+
+        await super().send_response(StatusAndHeaders(response), send_start)
+        try:
+            if hasattr(response, "async_content"):
+                await self.send_async_body(response.async_content, send)
+            else:
+                await self.send_body(iter(response), send)
+        finally:
+            await sync_to_async(response.close)()
+
+    async def send_body(self, parts, send):
+        """Send a body read from a sync iterator in the request's thread."""
+        next_part = sync_to_async(next)
+        while (part := await next_part(parts, None)) is not None:
+            for chunk, _ in self.chunk_bytes(part):
+                await send({"type": "http.response.body", "body": chunk, "more_body": True})
+        await send({"type": "http.response.body"})
+
+    async def send_async_body(self, content, send):
+        """Send a body read from an async iterator, stopping it as soon as the
+        client disconnects instead of waiting for its next part."""
+        parts = content.__aiter__()
+        disconnected = asyncio.ensure_future(self.wait_for_disconnect(_receive.get()))
+        next_part = None
+        try:
+            while True:
+                next_part = asyncio.ensure_future(parts.__anext__())
+                await asyncio.wait({next_part, disconnected}, return_when=asyncio.FIRST_COMPLETED)
+                if not next_part.done():
+                    return
+                try:
+                    part = next_part.result()
+                except StopAsyncIteration:
+                    break
+                await send({"type": "http.response.body", "body": part, "more_body": True})
+            await send({"type": "http.response.body"})
+        finally:
+            disconnected.cancel()
+            # The iterator can't be closed while it's still working on a part.
+            if next_part is not None and not next_part.done():
+                next_part.cancel()
+                await asyncio.wait({next_part})
+            if hasattr(parts, "aclose"):
+                await parts.aclose()
+
+    @staticmethod
+    async def wait_for_disconnect(receive):
+        while (await receive())["type"] != "http.disconnect":
+            pass
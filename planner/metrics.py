@@ -0,0 +1,181 @@
+"""Where the time goes in a request, per view.
+
+ServerTimingMiddleware (planner/middleware.py) times a sample of requests. It
+adds up the view's wall time, its database queries and its template
+rendering, tells the browser in a Server-Timing header, and records them in
+the histograms here, keyed by URL name. `render_prometheus` turns those into
+the Prometheus text format for the staff-only view at /metrics/.
+
+Queries are timed by `record_query`, which goes on every database connection
+when it's opened and only does anything while a request is being sampled.
+
+Histograms only live in the process that recorded them, so every worker
+reports its own.
+"""
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+from planner.db.pooling import pool_metrics
+
+SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+PREFIX = "smolparty"
+
+POOL_GAUGES = {"open", "idle", "in_use"}
+"""Pool metrics that go up and down. The rest only ever go up."""
+
+
+@dataclass
+class RequestTimings:
+    """What one request has spent its time on so far."""
+
+    queries: int = 0
+    db_seconds: float = 0.0
+    template_seconds: float = 0.0
+
+    def server_timing(self, total: float) -> str:
+        return ", ".join(
+            [
+                f"app;dur={total * 1000:.1f}",
+                f'db;desc="{self.queries} queries";dur={self.db_seconds * 1000:.1f}',
+                f"tpl;dur={self.template_seconds * 1000:.1f}",
+            ]
+        )
+
+
+_current: ContextVar[Optional[RequestTimings]] = ContextVar("request_timings", default=None)
+
+
+def current() -> Optional[RequestTimings]:
+    """The timings for the request being handled, if it's being sampled."""
+    return _current.get()
+
+
+@contextmanager
+def recording(timings: RequestTimings) -> Iterator[RequestTimings]:
+    token = _current.set(timings)
+    try:
+        yield timings
+    finally:
+        _current.reset(token)
+
+
+def record_query(execute, sql, params, many, context):
+    """An execute_wrapper that times queries made while a request is sampled.
+
+    It goes on every connection rather than just for the sampled request, since
+    an async request's queries run on connections in other threads. Those
+    threads get a copy of the request's context, so `current` still finds it.
+    """
+    timings = current()
+    if timings is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.db_seconds += time.perf_counter() - start
+        timings.queries += 1
+
+
+@receiver(connection_created)
+def install_query_timer(sender, connection, **kwargs):
+    # At the front, since execute_wrapper() pops its own wrapper off the end.
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, record_query)
+
+
+class Histogram:
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        """The count at or below each bucket's upper bound, Prometheus style."""
+        total = 0
+        result = []
+        for bound, count in zip([*map(format_number, self.buckets), "+Inf"], self.counts):
+            total += count
+            result.append((bound, total))
+        return result
+
+
+HISTOGRAMS = {
+    "request_duration_seconds": ("Time spent in the view and the middleware.", SECONDS_BUCKETS),
+    "db_queries": ("Database queries made by a request.", QUERY_BUCKETS),
+    "db_duration_seconds": ("Time a request spent running database queries.", SECONDS_BUCKETS),
+    "template_duration_seconds": ("Time a request spent rendering templates.", SECONDS_BUCKETS),
+}
+
+_histograms: Dict[Tuple[str, str], Histogram] = {}
+_lock = threading.Lock()
+
+
+def observe(view: str, timings: RequestTimings, total: float) -> None:
+    """Record a sampled request's timings under its URL name."""
+    values = {
+        "request_duration_seconds": total,
+        "db_queries": timings.queries,
+        "db_duration_seconds": timings.db_seconds,
+        "template_duration_seconds": timings.template_seconds,
+    }
+    with _lock:
+        for name, value in values.items():
+            key = (name, view)
+            if key not in _histograms:
+                _histograms[key] = Histogram(HISTOGRAMS[name][1])
+            _histograms[key].observe(value)
+
+
+def format_number(value: float) -> str:
+    return str(int(value)) if value == int(value) else repr(value)
+
+
+def escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def render_prometheus() -> str:
+    """Every histogram, plus the connection pool counters, in the Prometheus
+    text exposition format."""
+    lines = []
+    with _lock:
+        histograms = sorted(_histograms.items())
+        for name, (help_text, _) in HISTOGRAMS.items():
+            metric = f"{PREFIX}_{name}"
+            lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} histogram"]
+            for (histogram_name, view), histogram in histograms:
+                if histogram_name != name:
+                    continue
+                label = f'view="{escape(view)}"'
+                for bound, count in histogram.cumulative():
+                    lines.append(f'{metric}_bucket{{{label},le="{bound}"}} {count}')
+                lines.append(f"{metric}_sum{{{label}}} {histogram.sum:.6f}")
+                lines.append(f"{metric}_count{{{label}}} {histogram.count}")
+
+    pools = pool_metrics()
+    for key in sorted({key for metrics in pools.values() for key in metrics}):
+        if key in POOL_GAUGES:
+            metric, kind = f"{PREFIX}_db_pool_{key}", "gauge"
+        else:
+            metric, kind = f"{PREFIX}_db_pool_{key}_total", "counter"
+        lines.append(f"# TYPE {metric} {kind}")
+        for alias, metrics in sorted(pools.items()):
+            lines.append(f'{metric}{{alias="{escape(alias)}"}} {metrics[key]}')
+    return "\n".join(lines) + "\n"
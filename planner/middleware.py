@@ -0,0 +1,59 @@
+"""Middleware for the whole project."""
+import asyncio
+import random
+import time
+
+from django.conf import settings
+
+from planner import metrics
+
+
+class ServerTimingMiddleware:
+    """Time a sample of requests: the view and the middleware under this one,
+    the database queries they make and the templates they render. The totals
+    go in a Server-Timing header, which browsers show in their dev tools, and
+    into the histograms in planner/metrics.py.
+
+    SERVER_TIMING_SAMPLE_RATE is the fraction of requests to time. The rest
+    only pay for a context variable lookup per query and template.
+
+    It works under both WSGI and ASGI, so it doesn't force every async request
+    through a thread.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            # Tell the handler to await us, the way Django's MiddlewareMixin does.
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        if random.random() >= settings.SERVER_TIMING_SAMPLE_RATE:
+            return self.get_response(request)
+
+        timings = metrics.RequestTimings()
+        start = time.perf_counter()
+        with metrics.recording(timings):
+            response = self.get_response(request)
+        return self.finish(request, response, timings, time.perf_counter() - start)
+
+    async def __acall__(self, request):
+        if random.random() >= settings.SERVER_TIMING_SAMPLE_RATE:
+            return await self.get_response(request)
+
+        timings = metrics.RequestTimings()
+        start = time.perf_counter()
+        with metrics.recording(timings):
+            response = await self.get_response(request)
+        return self.finish(request, response, timings, time.perf_counter() - start)
+
+    def finish(self, request, response, timings: metrics.RequestTimings, total: float):
+        response["Server-Timing"] = timings.server_timing(total)
+        match = request.resolver_match
+        metrics.observe(match.view_name if match else "unmatched", timings, total)
+        return response
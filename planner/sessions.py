@@ -0,0 +1,72 @@
+"""A session engine that keeps small sessions in a signed cookie, and only puts
+the ones that don't fit in the session table.
+
+Most guests only ever own a few events and RSVPs, so their whole session fits
+in the cookie and loading it doesn't touch the database. A session moves into
+the session table, like with the db engine, once it grows past COOKIE_BUDGET
+bytes, when a user logs in, or when something needs a key for it that doesn't
+change with every save (see STABLE_KEY). The cookie then only holds its key.
+Sessions never move back out of the table, so nothing that refers to one by its
+key, like a calendar feed, loses it.
+
+Sessions in the cookie can't be revoked, which is why logged in users don't get
+one: logging out deletes their row. They also can't be pruned, but they expire
+after SESSION_COOKIE_AGE like any other session.
+"""
+from typing import Optional
+
+from django.conf import settings
+from django.contrib.auth import SESSION_KEY as USER_KEY
+from django.contrib.sessions.backends import db
+from django.core import signing
+
+COOKIE_BUDGET = 3000
+"""The most bytes a session can take up in the cookie. Browsers only promise
+4096 bytes per cookie, including its name and attributes."""
+
+STABLE_KEY = "_stable_key"
+"""Set this in a session to keep it in the session table, so its key stays the
+same from one request to the next."""
+
+SALT = "planner.sessions"
+
+
+def in_cookie(session_key: Optional[str]) -> bool:
+    """Whether the key is a whole session rather than the key of a row. Signed
+    values always contain a ':', which the keys of rows never do."""
+    return session_key is not None and ":" in session_key
+
+
+class SessionStore(db.SessionStore):
+    def load(self):
+        if not in_cookie(self.session_key):
+            return super().load()
+        try:
+            return signing.loads(
+                self.session_key,
+                salt=SALT,
+                serializer=self.serializer,
+                max_age=settings.SESSION_COOKIE_AGE,
+            )
+        except Exception:
+            # Tampered with, or too old. Either way, start over.
+            self._session_key = None
+            return {}
+
+    def save(self, must_create=False):
+        data = self._get_session(no_load=must_create)
+        if self.session_key is None or in_cookie(self.session_key):
+            if USER_KEY not in data and STABLE_KEY not in data:
+                signed = signing.dumps(data, salt=SALT, serializer=self.serializer, compress=True)
+                if len(signed) <= COOKIE_BUDGET:
+                    self._session_key = signed
+                    return
+            # Moving into the table, where it gets a key of its own.
+            self._session_key = None
+        super().save(must_create=must_create)
+
+    def delete(self, session_key=None):
+        if session_key is None:
+            session_key = self.session_key
+        if not in_cookie(session_key):
+            super().delete(session_key)
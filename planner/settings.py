@@ -17,7 +17,8 @@ import logging
 import os
 
 import environ
-from google.cloud import secretmanager
+
+from planner.bootstrap import load_settings_payload
 
 # If GOOGLE_CLOUD_PROJECT is set, we can can assume we're deployed in production
 LOCAL = not bool(os.environ.get("GOOGLE_CLOUD_PROJECT", None))
@@ -42,16 +43,18 @@ if LOCAL:
 
 else:
     logging.info("GOOGLE_CLOUD_PROJECT is set; I assume we're running in production")
-    # Pull secrets from Secret Manager
+    # Pull secrets from Secret Manager, or a recent copy of them. See planner/bootstrap.py.
     project_id = os.environ.get("GOOGLE_CLOUD_PROJECT")
-    client = secretmanager.SecretManagerServiceClient()
     settings_name = os.environ.get("SETTINGS_NAME", "django_settings")
     name = f"projects/{project_id}/secrets/{settings_name}/versions/latest"
-    payload = client.access_secret_version(name=name).payload.data.decode("UTF-8")
-    env.read_env(io.StringIO(payload))
+    env.read_env(io.StringIO(load_settings_payload(name)))
 
 SECRET_KEY = env("SECRET_KEY")
 
+# Identifies the deployed version of the app. App Engine sets GAE_VERSION for us.
+# It goes into ETags so that pages rendered by an older deploy aren't reused.
+RELEASE = env("GAE_VERSION", default="dev")
+
 # SECURITY WARNING: App Engine's security features ensure that it is safe to
 # have ALLOWED_HOSTS = ['*'] when the app is deployed. If you deploy a Django
 # app not on App Engine, make sure to set an appropriate host here.
@@ -62,7 +65,9 @@ ALLOWED_HOSTS = ["*"]
 INSTALLED_APPS = [
     "planner",
     "events.apps.EventsConfig",
-    "django.contrib.admin",
+    # Leaves finding every app's admin.py to planner/admin_urls.py, so it
+    # happens when the URLconf is loaded rather than at startup.
+    "django.contrib.admin.apps.SimpleAdminConfig",
     "django.contrib.auth",
     "django.contrib.contenttypes",
     "django.contrib.sessions",
@@ -72,6 +77,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # First, so the timings it reports include all the other middleware.
+    "planner.middleware.ServerTimingMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -85,7 +92,8 @@ ROOT_URLCONF = "planner.urls"
 
 TEMPLATES = [
     {
-        "BACKEND": "django.template.backends.django.DjangoTemplates",
+        # Django's backend, with rendering timed for ServerTimingMiddleware.
+        "BACKEND": "planner.template_backend.DjangoTemplates",
         "DIRS": [],
         "APP_DIRS": True,
         "OPTIONS": {
@@ -105,6 +113,25 @@ WSGI_APPLICATION = "planner.wsgi.application"
 # Use django-environ to parse the connection string
 DATABASES = {"default": env.db()}
 
+# Reuse PostgreSQL connections instead of paying for a new one (and its TLS
+# handshake) on every request. DB_CONN_MAX_AGE keeps each thread's connection
+# open for that many seconds. DB_POOL_SIZE > 0 instead shares a pool of that many
+# connections between all of a process's threads, in which case leave
+# DB_CONN_MAX_AGE at 0 so connections go back to the pool after each request.
+# The pool is experimental and off by default, as it hasn't been tested against
+# a real PostgreSQL server yet. See planner/db/pooling.py.
+if DATABASES["default"]["ENGINE"] == "django.db.backends.postgresql":
+    DATABASES["default"].update(
+        ENGINE="planner.db.postgresql",
+        CONN_MAX_AGE=env.int("DB_CONN_MAX_AGE", default=0),
+        HEALTH_CHECKS=env.bool("DB_HEALTH_CHECKS", default=True),
+        POOL={
+            "SIZE": env.int("DB_POOL_SIZE", default=0),
+            "MAX_OVERFLOW": env.int("DB_POOL_MAX_OVERFLOW", default=5),
+            "TIMEOUT": env.float("DB_POOL_TIMEOUT", default=10),
+        },
+    )
+
 # This part shouldn't be necessary because we're already setting the DB URL with the placeholder?
 if LOCAL:
     DATABASES = {
@@ -114,6 +141,78 @@ if LOCAL:
         }
     }
 
+    # SQLite is set up to take concurrent traffic on a single machine: WAL
+    # journaling, waiting on busy writers and taking the write lock as
+    # transactions begin. Set SQLITE_TUNED to false for a plain SQLite
+    # database. See planner/db/sqlite3/base.py.
+    if env.bool("SQLITE_TUNED", default=True):
+        DATABASES["default"].update(
+            ENGINE="planner.db.sqlite3",
+            CONN_MAX_AGE=env.int("DB_CONN_MAX_AGE", default=0),
+            PRAGMAS={
+                "journal_mode": "WAL",
+                "synchronous": "NORMAL",
+                "busy_timeout": env.int("SQLITE_BUSY_TIMEOUT_MS", default=5000),
+                "mmap_size": env.int("SQLITE_MMAP_SIZE", default=256 * 1024 * 1024),
+                # Negative sizes are in KiB rather than pages.
+                "cache_size": -env.int("SQLITE_CACHE_SIZE_KB", default=64 * 1024),
+                "temp_store": "MEMORY",
+            },
+            TRANSACTION_MODE="IMMEDIATE",
+            MAINTENANCE_INTERVAL=env.int("SQLITE_MAINTENANCE_INTERVAL", default=300),
+        )
+
+# Accept secrets made with the old SHA-256 scheme so existing edit links keep
+# working. See events/secret_utils.py.
+SECRETS_ACCEPT_LEGACY = env.bool("SECRETS_ACCEPT_LEGACY", default=True)
+
+# Collect new RSVPs arriving within RSVP_COALESCE_WINDOW seconds of each other
+# into a single insert, for when an event link gets shared with a big group.
+# See events/write_buffer.py.
+RSVP_WRITE_COALESCING = env.bool("RSVP_WRITE_COALESCING", default=False)
+RSVP_COALESCE_WINDOW = env.float("RSVP_COALESCE_WINDOW", default=0.05)
+RSVP_COALESCE_MAX_BATCH = env.int("RSVP_COALESCE_MAX_BATCH", default=200)
+
+# Live RSVP updates on event pages, sent as Server-Sent Events. They need the
+# ASGI entry point (planner/asgi.py), so they're off unless you serve that. With
+# them off, pages don't open a stream, and the WSGI entry point answers any that
+# do with a 204 that tells browsers not to bother. A page that lets
+# LIVE_UPDATES_QUEUE_SIZE messages back up gets disconnected. See events/live.py.
+LIVE_UPDATES = env.bool("LIVE_UPDATES", default=False)
+LIVE_UPDATES_QUEUE_SIZE = env.int("LIVE_UPDATES_QUEUE_SIZE", default=100)
+LIVE_UPDATES_HEARTBEAT = env.float("LIVE_UPDATES_HEARTBEAT", default=15)
+LIVE_UPDATES_MAX_AGE = env.float("LIVE_UPDATES_MAX_AGE", default=300)
+LIVE_UPDATES_RETRY_MS = env.int("LIVE_UPDATES_RETRY_MS", default=3000)
+
+# Time this fraction of requests, reporting where the time went in a
+# Server-Timing header and in the histograms at /metrics/. Only staff can see
+# the histograms, along with anything sending "Authorization: Bearer
+# <METRICS_TOKEN>" if that's set. See planner/metrics.py.
+SERVER_TIMING_SAMPLE_RATE = env.float("SERVER_TIMING_SAMPLE_RATE", default=0.1)
+METRICS_TOKEN = env("METRICS_TOKEN", default="")
+
+# Cache
+# Use django-environ to parse the cache URL. The default in-memory cache is only
+# shared within a single process, so when running several workers set CACHE_URL
+# to something shared like "filecache:///var/tmp/smolparty" or "pymemcache://host:11211".
+CACHES = {"default": env.cache("CACHE_URL", default="locmemcache://")}
+# Whether every worker sees the same cache. Anything kept in a per-process cache
+# can go stale as soon as another worker changes it.
+SHARED_CACHE = CACHES["default"]["BACKEND"] not in (
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+)
+
+# How long to keep rendered event pages around, and how long a worker gets to
+# rebuild one before the others stop waiting on it (in seconds). Changes only
+# invalidate the pages in the worker's own cache unless it's shared, so without
+# CACHE_URL the other workers' copies are only kept for a few seconds.
+EVENT_PAGE_CACHE_ALIAS = "default"
+EVENT_PAGE_CACHE_TIMEOUT = env.int(
+    "EVENT_PAGE_CACHE_TIMEOUT", default=60 * 60 * 24 if SHARED_CACHE else 10
+)
+EVENT_PAGE_CACHE_LOCK_TIMEOUT = 5
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {"NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator"},
@@ -130,9 +229,12 @@ USE_L10N = True
 USE_TZ = True
 
 # Static files (CSS, JavaScript, Images)
-STATIC_ROOT = "static"
+STATIC_ROOT = os.path.join(BASE_DIR, "static")
 STATIC_URL = "/static/"
 STATICFILES_DIRS = []
+# collectstatic adds a content hash to every file name and writes .gz/.br copies
+# next to them. See planner/storage.py.
+STATICFILES_STORAGE = "planner.storage.CompressedManifestStaticFilesStorage"
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/3.2/ref/settings/#default-auto-field
@@ -140,3 +242,7 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 # Keep sessions running for 100 years
 SESSION_COOKIE_AGE = 315360000
+
+# Keep sessions in a signed cookie while they're small, so most page views don't
+# have to load one from the database. See planner/sessions.py.
+SESSION_ENGINE = env("SESSION_ENGINE", default="planner.sessions")
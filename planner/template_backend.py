@@ -0,0 +1,29 @@
+"""The Django template backend, with rendering timed for planner/metrics.py."""
+import time
+
+from django.template.backends import django as django_backend
+
+from planner import metrics
+
+
+class Template(django_backend.Template):
+    def render(self, context=None, request=None):
+        timings = metrics.current()
+        if timings is None:
+            return super().render(context, request)
+        start = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            timings.template_seconds += time.perf_counter() - start
+
+
+class DjangoTemplates(django_backend.DjangoTemplates):
+    def from_string(self, template_code):
+        return Template(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        try:
+            return Template(self.engine.get_template(template_name), self)
+        except django_backend.TemplateDoesNotExist as exc:
+            django_backend.reraise(exc, self)
@@ -0,0 +1,16 @@
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+
+@override_settings(STATICFILES_STORAGE="django.contrib.staticfiles.storage.StaticFilesStorage")
+class AdminURLTests(TestCase):
+    def test_admin_urls_are_namespaced(self):
+        self.assertEqual(reverse("admin:index"), "/admin/")
+        self.assertEqual(reverse("admin:events_event_changelist"), "/admin/events/event/")
+
+    def test_apps_admins_are_registered(self):
+        user = User.objects.create_superuser("admin", "admin@example.com", "password")
+        self.client.force_login(user)
+        response = self.client.get(reverse("admin:index"))
+        self.assertContains(response, reverse("admin:events_rsvp_changelist"))
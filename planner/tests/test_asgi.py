@@ -0,0 +1,73 @@
+from asgiref.testing import ApplicationCommunicator
+from django.test import TransactionTestCase, override_settings
+from django.urls import reverse
+
+from events import live
+from events.tests.fixtures import make_event
+from planner.handlers import ThreadPoolASGIHandler
+
+
+def http_scope(path: str):
+    return {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "query_string": b"",
+        "headers": [(b"host", b"testserver")],
+        "server": ("testserver", 80),
+        "client": ("127.0.0.1", 12345),
+    }
+
+
+# The requests are handled in threads of their own, which wouldn't see the data
+# a TestCase hasn't committed.
+@override_settings(STATICFILES_STORAGE="django.contrib.staticfiles.storage.StaticFilesStorage")
+class ThreadPoolASGIHandlerTests(TransactionTestCase):
+    def setUp(self):
+        self.event = make_event(3)
+
+    async def get(self, path: str):
+        communicator = ApplicationCommunicator(ThreadPoolASGIHandler(), http_scope(path))
+        await communicator.send_input({"type": "http.request"})
+        start = await communicator.receive_output(timeout=5)
+        body = b""
+        while True:
+            message = await communicator.receive_output(timeout=5)
+            body += message.get("body", b"")
+            if not message.get("more_body"):
+                break
+        await communicator.wait(timeout=5)
+        return start, body
+
+    async def test_serves_sync_views(self):
+        start, body = await self.get(reverse("events:detail", kwargs={"pk": self.event.id}))
+        self.assertEqual(start["status"], 200)
+        self.assertIn((b"Content-Type", b"text/html; charset=utf-8"), start["headers"])
+        self.assertIn(b"Guest 2", body)
+
+    async def test_streams_responses_that_run_queries(self):
+        start, body = await self.get(reverse("events:calendar", kwargs={"pk": self.event.id}))
+        self.assertEqual(start["status"], 200)
+        self.assertIn((b"Content-Type", b"text/calendar; charset=utf-8"), start["headers"])
+        self.assertTrue(body.startswith(b"BEGIN:VCALENDAR"))
+        self.assertIn(b"END:VCALENDAR", body)
+
+    @override_settings(LIVE_UPDATES=True, LIVE_UPDATES_HEARTBEAT=60)
+    async def test_stops_streaming_when_the_client_disconnects(self):
+        path = reverse("events:rsvp_stream", kwargs={"pk": self.event.id})
+        communicator = ApplicationCommunicator(ThreadPoolASGIHandler(), http_scope(path))
+        await communicator.send_input({"type": "http.request"})
+        start = await communicator.receive_output(timeout=5)
+        self.assertEqual(start["status"], 200)
+        retry = await communicator.receive_output(timeout=5)
+        self.assertTrue(retry["body"].startswith(b"retry:"))
+        self.assertEqual(live.hub.subscriber_count(self.event.id), 1)
+
+        # The stream is waiting on its next message, which won't come for a
+        # minute, but it should stop right away.
+        await communicator.send_input({"type": "http.disconnect"})
+        await communicator.wait(timeout=5)
+        self.assertEqual(live.hub.subscriber_count(self.event.id), 0)
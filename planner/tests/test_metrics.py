@@ -0,0 +1,76 @@
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from events.tests.fixtures import make_event
+from planner import metrics
+
+
+@mock.patch.dict(metrics._histograms, clear=True)
+class HistogramTests(SimpleTestCase):
+    def test_prometheus_buckets_are_cumulative(self):
+        timings = metrics.RequestTimings(queries=3, db_seconds=0.002, template_seconds=0.001)
+        metrics.observe('view"1', timings, 0.02)
+        metrics.observe('view"1', metrics.RequestTimings(), 20)
+        lines = metrics.render_prometheus().splitlines()
+
+        self.assertIn("# TYPE smolparty_request_duration_seconds histogram", lines)
+        label = 'view="view\\"1"'
+        for bound, count in [("0.01", 0), ("0.025", 1), ("10", 1), ("+Inf", 2)]:
+            self.assertIn(
+                f'smolparty_request_duration_seconds_bucket{{{label},le="{bound}"}} {count}', lines
+            )
+        self.assertIn(f'smolparty_db_queries_bucket{{{label},le="2"}} 1', lines)
+        self.assertIn(f'smolparty_db_queries_bucket{{{label},le="5"}} 2', lines)
+        self.assertIn(f"smolparty_request_duration_seconds_sum{{{label}}} 20.020000", lines)
+        self.assertIn(f"smolparty_request_duration_seconds_count{{{label}}} 2", lines)
+
+
+@mock.patch.dict(metrics._histograms, clear=True)
+@override_settings(STATICFILES_STORAGE="django.contrib.staticfiles.storage.StaticFilesStorage")
+class ServerTimingTests(TestCase):
+    def setUp(self):
+        caches[settings.EVENT_PAGE_CACHE_ALIAS].clear()
+        self.url = reverse("events:detail", kwargs={"pk": make_event(2).id})
+
+    @override_settings(SERVER_TIMING_SAMPLE_RATE=1)
+    def test_sampled_requests_are_timed(self):
+        header = self.client.get(self.url)["Server-Timing"]
+        self.assertRegex(
+            header, r'^app;dur=[\d.]+, db;desc="\d+ queries";dur=[\d.]+, tpl;dur=[\d.]+$'
+        )
+        self.assertNotIn('desc="0 queries"', header)
+        self.assertEqual(metrics._histograms[("db_queries", "events:detail")].count, 1)
+
+    @override_settings(SERVER_TIMING_SAMPLE_RATE=0)
+    def test_other_requests_are_not(self):
+        self.assertNotIn("Server-Timing", self.client.get(self.url))
+        self.assertEqual(metrics._histograms, {})
+
+
+@override_settings(METRICS_TOKEN="s3cret")
+class MetricsViewTests(TestCase):
+    url = reverse("metrics")
+
+    def test_only_staff_and_the_token_can_read_metrics(self):
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+        self.assertEqual(
+            self.client.get(self.url, HTTP_AUTHORIZATION="Bearer nope").status_code, 403
+        )
+        response = self.client.get(self.url, HTTP_AUTHORIZATION="Bearer s3cret")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "text/plain; version=0.0.4")
+        self.assertEqual(response["Cache-Control"], "no-store")
+
+        self.client.force_login(User.objects.create_user("user"))
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+        self.client.force_login(User.objects.create_user("staff", is_staff=True))
+        self.assertEqual(self.client.get(self.url).status_code, 200)
+
+    @override_settings(METRICS_TOKEN="")
+    def test_no_token_means_staff_only(self):
+        self.assertEqual(self.client.get(self.url, HTTP_AUTHORIZATION="Bearer ").status_code, 403)
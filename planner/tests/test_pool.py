@@ -0,0 +1,59 @@
+import threading
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from planner.db.pool import ConnectionPool, PoolTimeout
+
+
+class ConnectionPoolTests(SimpleTestCase):
+    def connect(self):
+        return mock.Mock(name="connection")
+
+    def test_reuses_connections(self):
+        pool = ConnectionPool(size=2)
+        connection = pool.checkout(self.connect)
+        pool.checkin(connection)
+        self.assertIs(pool.checkout(self.connect), connection)
+        self.assertEqual(pool.stats.connects, 1)
+        self.assertEqual(pool.stats.checkouts, 2)
+
+    def test_overflow_is_closed_when_given_back(self):
+        pool = ConnectionPool(size=1, max_overflow=1)
+        first, second = pool.checkout(self.connect), pool.checkout(self.connect)
+        pool.checkin(first)
+        pool.checkin(second)
+        second.close.assert_called_once()
+        self.assertEqual(pool.metrics()["open"], 1)
+        self.assertEqual(pool.metrics()["idle"], 1)
+
+    def test_times_out_when_full(self):
+        pool = ConnectionPool(size=1, timeout=0.01)
+        pool.checkout(self.connect)
+        with self.assertRaises(PoolTimeout):
+            pool.checkout(self.connect)
+        self.assertEqual(pool.stats.timeouts, 1)
+
+    def test_waits_for_a_connection_to_be_given_back(self):
+        pool = ConnectionPool(size=1, timeout=5)
+        connection = pool.checkout(self.connect)
+        timer = threading.Timer(0.05, pool.checkin, [connection])
+        timer.start()
+        self.assertIs(pool.checkout(self.connect), connection)
+        timer.join()
+        self.assertEqual(pool.stats.waits, 1)
+
+    def test_replaces_connections_that_fail_validation(self):
+        pool = ConnectionPool(size=1, validate=lambda connection: False)
+        broken = pool.checkout(self.connect)
+        pool.checkin(broken)
+        self.assertIsNot(pool.checkout(self.connect), broken)
+        broken.close.assert_called_once()
+        self.assertEqual(pool.metrics()["open"], 1)
+
+    def test_frees_the_slot_when_connecting_fails(self):
+        pool = ConnectionPool(size=1, timeout=0.01)
+        with self.assertRaises(OSError):
+            pool.checkout(mock.Mock(side_effect=OSError))
+        pool.checkout(self.connect)
+        self.assertEqual(pool.metrics()["in_use"], 1)
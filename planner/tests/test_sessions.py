@@ -0,0 +1,53 @@
+import secrets
+
+from django.contrib.auth import SESSION_KEY as USER_KEY
+from django.contrib.sessions.models import Session
+from django.test import TestCase
+
+from planner.sessions import COOKIE_BUDGET, STABLE_KEY, SessionStore, in_cookie
+
+
+class SessionStoreTests(TestCase):
+    def save(self, **data) -> SessionStore:
+        session = SessionStore()
+        session.update(data)
+        session.save()
+        return session
+
+    def test_small_sessions_stay_in_the_cookie(self):
+        session = self.save(events={"a": 1})
+        self.assertTrue(in_cookie(session.session_key))
+        self.assertFalse(Session.objects.exists())
+        with self.assertNumQueries(0):
+            self.assertEqual(SessionStore(session.session_key)["events"], {"a": 1})
+
+    def test_big_sessions_move_to_the_table_for_good(self):
+        big = secrets.token_hex(COOKIE_BUDGET)
+        session = self.save(events=big)
+        self.assertFalse(in_cookie(session.session_key))
+        self.assertEqual(SessionStore(session.session_key)["events"], big)
+
+        key = session.session_key
+        session["events"] = "small"
+        session.save()
+        self.assertEqual(session.session_key, key)
+
+    def test_stable_and_logged_in_sessions_go_to_the_table(self):
+        for key in [STABLE_KEY, USER_KEY]:
+            with self.subTest(key=key):
+                session = self.save(**{key: "1"})
+                self.assertFalse(in_cookie(session.session_key))
+                self.assertTrue(Session.objects.filter(pk=session.session_key).exists())
+
+    def test_tampered_cookies_are_ignored(self):
+        key = self.save(events={"a": 1}).session_key
+        session = SessionStore(key[:-1] + ("B" if key.endswith("A") else "A"))
+        self.assertEqual(dict(session), {})
+        self.assertIsNone(session.session_key)
+
+    def test_deleting_a_cookie_session_leaves_the_table_alone(self):
+        stored = self.save(**{STABLE_KEY: True})
+        cookie = self.save(events={"a": 1})
+        cookie.flush()
+        self.assertIsNone(cookie.session_key)
+        self.assertTrue(Session.objects.filter(pk=stored.session_key).exists())
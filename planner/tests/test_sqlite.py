@@ -0,0 +1,59 @@
+import os
+import sqlite3
+import tempfile
+from unittest import mock
+
+from django.db import connection
+from django.test import SimpleTestCase
+
+from planner.db.sqlite3.base import DatabaseWrapper
+
+
+class TunedSQLiteTests(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.name = os.path.join(directory.name, "db.sqlite3")
+        settings_dict = {
+            **connection.settings_dict,
+            "ENGINE": "planner.db.sqlite3",
+            "NAME": self.name,
+            "PRAGMAS": {"journal_mode": "WAL", "busy_timeout": 1234},
+            "TRANSACTION_MODE": "IMMEDIATE",
+            "MAINTENANCE_INTERVAL": 300,
+        }
+        self.wrapper = DatabaseWrapper(settings_dict, alias="tuned")
+        self.addCleanup(self.wrapper.close)
+
+    def pragma(self, name: str):
+        with self.wrapper.cursor() as cursor:
+            cursor.execute(f"PRAGMA {name}")
+            return cursor.fetchone()[0]
+
+    def test_pragmas_are_run_on_new_connections(self):
+        self.assertEqual(self.pragma("journal_mode"), "wal")
+        self.assertEqual(self.pragma("busy_timeout"), 1234)
+
+    def test_transactions_take_the_write_lock_as_they_begin(self):
+        self.wrapper.ensure_connection()
+        self.wrapper.set_autocommit(False, force_begin_transaction_with_broken_autocommit=True)
+        self.addCleanup(self.wrapper.rollback)
+        self.assertTrue(self.wrapper.connection.in_transaction)
+
+        # Nothing has been written yet, but nobody else can start writing.
+        other = sqlite3.connect(self.name, timeout=0)
+        self.addCleanup(other.close)
+        with self.assertRaisesRegex(sqlite3.OperationalError, "locked"):
+            other.execute("BEGIN IMMEDIATE")
+
+    def test_maintenance_runs_once_per_interval(self):
+        self.wrapper.ensure_connection()
+        with mock.patch.object(DatabaseWrapper, "maintain") as maintain:
+            with mock.patch("time.monotonic", return_value=1000):
+                self.wrapper.maintain_if_due()
+                self.wrapper.maintain_if_due()
+            self.assertEqual(maintain.call_count, 0)
+            with mock.patch("time.monotonic", return_value=1300):
+                self.wrapper.maintain_if_due()
+                self.wrapper.maintain_if_due()
+            self.assertEqual(maintain.call_count, 1)
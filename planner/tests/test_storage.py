@@ -0,0 +1,33 @@
+import gzip
+import os
+import tempfile
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.test import SimpleTestCase
+
+from planner.storage import CompressedManifestStaticFilesStorage
+
+SCRIPT = b'const url = "http://example.com"; // comment\nconst s = `\n// not a comment\n`;\n'
+
+
+class CompressedManifestStaticFilesStorageTests(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.storage = CompressedManifestStaticFilesStorage(location=directory.name)
+        self.storage.save("app.js", ContentFile(SCRIPT * 20))
+
+    def test_files_are_precompressed_but_not_rewritten(self):
+        processed = [
+            name for _, name, _ in self.storage.post_process({"app.js": (self.storage, "app.js")})
+        ]
+        hashed_name = self.storage.stored_name("app.js")
+        self.assertIn(hashed_name + ".gz", processed)
+        with self.storage.open(hashed_name) as f:
+            self.assertEqual(f.read(), SCRIPT * 20)
+        with self.storage.open(hashed_name + ".gz") as f:
+            self.assertEqual(gzip.decompress(f.read()), SCRIPT * 20)
+
+    def test_static_root_does_not_depend_on_the_working_directory(self):
+        self.assertTrue(os.path.isabs(settings.STATIC_ROOT))
@@ -13,15 +13,18 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+
 from django.conf import settings
-from django.conf.urls.static import static
-from django.contrib import admin
 from django.urls import include, path, re_path
 
 from . import views
 
 urlpatterns = [
     path("e/", include("events.urls")),
-    path("admin/", admin.site.urls),
+    path("admin/", include("planner.admin_urls")),
     re_path(r"^$", views.index, name="index"),
-] + static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
+    # App Engine's warmup request, see inbound_services in app.yaml.
+    path("_ah/warmup", views.warmup, name="warmup"),
+    path("metrics/", views.metrics, name="metrics"),
+    path(f"{settings.STATIC_URL.lstrip('/')}<path:path>", views.static, name="static"),
+]
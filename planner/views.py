@@ -1,5 +1,113 @@
+import hmac
+import mimetypes
+import os
+import uuid
+from functools import lru_cache
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.exceptions import PermissionDenied, SuspiciousFileOperation
+from django.db import connection
+from django.http import FileResponse, Http404, HttpResponse
 from django.shortcuts import render
+from django.template.loader import get_template
+from django.urls import reverse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date
+
+from events.secret_utils import uuid_to_secret
+from planner.metrics import render_prometheus
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+"""Hashed files never change, so clients can keep them for a year without asking."""
+
+STATIC_CACHE_CONTROL = "public, max-age=300"
+
+WARM_TEMPLATES = [
+    "events/event/detail.html",
+    "events/rsvp/list.html",
+    "events/header.html",
+    "events/footer.html",
+    "events/rsvp/create_update.html",
+    "planner/index.html",
+]
+"""Templates to compile before an instance takes traffic. Includes are looked
+up when a page is rendered, so they're listed too."""
+
+PRECOMPRESSED = [("br", ".br"), ("gzip", ".gz")]
+"""Content encodings written by collectstatic, in order of preference."""
+
+
+@lru_cache(maxsize=1)
+def hashed_static_names():
+    """The fingerprinted names from the staticfiles manifest."""
+    return frozenset(getattr(staticfiles_storage, "hashed_files", {}).values())
+
+
+def warmup(req):
+    """Get an instance ready for traffic. App Engine requests this before it
+    sends anything else to a new instance, so the first guest doesn't have to
+    wait for all of this."""
+    reverse("events:detail", args=[uuid.uuid4()])
+    for name in WARM_TEMPLATES:
+        get_template(name)
+    hashed_static_names()
+    uuid_to_secret(uuid.uuid4())
+    connection.ensure_connection()
+    return HttpResponse(status=204)
+
+
+def metrics(req):
+    """The request histograms from planner/metrics.py, for Prometheus to scrape.
+    Only for staff, or for a scraper with the METRICS_TOKEN."""
+    authorization = req.META.get("HTTP_AUTHORIZATION", "")
+    has_token = settings.METRICS_TOKEN and hmac.compare_digest(
+        authorization.encode(), f"Bearer {settings.METRICS_TOKEN}".encode()
+    )
+    if not (has_token or req.user.is_staff):
+        raise PermissionDenied
+    response = HttpResponse(render_prometheus(), content_type="text/plain; version=0.0.4")
+    response["Cache-Control"] = "no-store"
+    return response
 
 
 def index(req):
     return render(req, "planner/index.html")
+
+
+def static(req, path):
+    """Serve a file from STATIC_ROOT, using the precompressed copy that
+    collectstatic wrote if the client accepts it.
+
+    App Engine serves /static/ itself, so this only handles requests when the
+    app runs somewhere else.
+    """
+    try:
+        full_path = safe_join(settings.STATIC_ROOT, path)
+    except SuspiciousFileOperation:
+        raise Http404("Not found")
+    if not os.path.isfile(full_path):
+        raise Http404("Not found")
+
+    stat = os.stat(full_path)
+    response = get_conditional_response(req, last_modified=int(stat.st_mtime))
+    if response is None:
+        accept_encoding = req.META.get("HTTP_ACCEPT_ENCODING", "")
+        accepted = {encoding.split(";")[0].strip() for encoding in accept_encoding.split(",")}
+        content_type, _ = mimetypes.guess_type(full_path)
+        serve_path, content_encoding = full_path, None
+        for encoding, suffix in PRECOMPRESSED:
+            if encoding in accepted and os.path.isfile(full_path + suffix):
+                serve_path, content_encoding = full_path + suffix, encoding
+                break
+        response = FileResponse(open(serve_path, "rb"))
+        response["Content-Type"] = content_type or "application/octet-stream"
+        if content_encoding:
+            response["Content-Encoding"] = content_encoding
+        response["Last-Modified"] = http_date(stat.st_mtime)
+
+    patch_vary_headers(response, ["Accept-Encoding"])
+    is_hashed = path in hashed_static_names()
+    response["Cache-Control"] = IMMUTABLE_CACHE_CONTROL if is_hashed else STATIC_CACHE_CONTROL
+    return response